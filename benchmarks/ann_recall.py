@@ -0,0 +1,80 @@
+"""Recall versus throughput of the IVF approximate index against exact local search.
+
+Runs offline over synthetic clustered vectors::
+
+    python benchmarks/ann_recall.py --items 200000 --lists 512
+
+For every `n_probe` setting it reports recall@k (the share of the exact top-k that the IVF index returns)
+and queries per second, next to the exact baseline.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from steamship.data.embeddings import EmbeddedItem
+from steamship.data.local_index import IvfIndex, LocalEmbeddingIndex, Metric
+
+
+def clustered_vectors(n: int, dimensionality: int, clusters: int, rng) -> np.ndarray:
+    centers = rng.normal(size=(clusters, dimensionality)) * 2
+    labels = rng.integers(clusters, size=n)
+    return (centers[labels] + rng.normal(size=(n, dimensionality))).astype(np.float32)
+
+
+def recall(approximate: np.ndarray, exact: np.ndarray) -> float:
+    hits = sum(len(set(a) & set(e)) for a, e in zip(approximate.tolist(), exact.tolist()))
+    return hits / exact.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dimensionality", type=int, default=128)
+    parser.add_argument("--clusters", type=int, default=1000)
+    parser.add_argument("--lists", type=int, default=256)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument(
+        "--chunk", type=int, default=10_000, help="Items added per incremental step."
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = clustered_vectors(args.items, args.dimensionality, args.clusters, rng)
+    queries = clustered_vectors(args.queries, args.dimensionality, args.clusters, rng)
+    items = [EmbeddedItem(id=str(i)) for i in range(args.items)]
+
+    exact = LocalEmbeddingIndex(metric=Metric.COSINE)
+    exact.add_vectors(vectors, items)
+    start = time.perf_counter()
+    expected, _ = exact.search_vectors(queries, args.k)
+    exact_qps = args.queries / (time.perf_counter() - start)
+
+    approximate = LocalEmbeddingIndex(metric=Metric.COSINE, ann=IvfIndex(n_lists=args.lists))
+    start = time.perf_counter()
+    for offset in range(0, args.items, args.chunk):
+        approximate.add_vectors(
+            vectors[offset : offset + args.chunk], items[offset : offset + args.chunk]
+        )
+    build_s = time.perf_counter() - start
+
+    print(
+        f"{args.items} items x {args.dimensionality} dims, {args.queries} queries, k={args.k}, "
+        f"{args.lists} lists (built incrementally in {build_s:.1f}s)"
+    )
+    print(f"{'n_probe':>8} {'recall@k':>10} {'queries/s':>12}")
+    print(f"{'exact':>8} {1.0:>10.3f} {exact_qps:>12.1f}")
+    n_probe = 1
+    while n_probe <= args.lists:
+        approximate.ann.n_probe = n_probe
+        start = time.perf_counter()
+        rows, _ = approximate.search_vectors(queries, args.k)
+        qps = args.queries / (time.perf_counter() - start)
+        print(f"{n_probe:>8} {recall(rows, expected):>10.3f} {qps:>12.1f}")
+        n_probe *= 2
+
+
+if __name__ == "__main__":
+    main()
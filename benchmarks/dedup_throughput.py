@@ -0,0 +1,54 @@
+"""Throughput and duplicate detection rate of the near-duplicate filters used before index insertion.
+
+Runs offline over synthetic documents, a share of which are lightly edited copies of boilerplate::
+
+    python benchmarks/dedup_throughput.py --documents 20000 --duplicate-share 0.3
+"""
+
+import argparse
+import random
+import time
+
+from steamship.utils.dedup import MinHashDeduplicator, SimHashDeduplicator
+
+
+def documents(n: int, duplicate_share: float, words_per_document: int, rng: random.Random):
+    vocabulary = [f"word{i}" for i in range(20000)]
+    templates = [
+        " ".join(rng.choice(vocabulary) for _ in range(words_per_document)) for _ in range(20)
+    ]
+    for _ in range(n):
+        if rng.random() < duplicate_share:
+            words = rng.choice(templates).split()
+            words[rng.randrange(len(words))] = rng.choice(vocabulary)  # A one-word edit
+            yield True, " ".join(words)
+        else:
+            yield False, " ".join(rng.choice(vocabulary) for _ in range(words_per_document))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=10_000)
+    parser.add_argument("--duplicate-share", type=float, default=0.3)
+    parser.add_argument("--words", type=int, default=100, help="Words per document.")
+    args = parser.parse_args()
+
+    corpus = list(documents(args.documents, args.duplicate_share, args.words, random.Random(0)))
+    print(
+        f"{args.documents} documents of {args.words} words, {args.duplicate_share:.0%} near-duplicates"
+    )
+    print(f"{'deduplicator':<28} {'docs/s':>10} {'flagged':>9}")
+    for label, deduplicator in [
+        ("simhash (distance 3)", SimHashDeduplicator(max_distance=3)),
+        ("minhash (0.8, 64 perm)", MinHashDeduplicator(threshold=0.8)),
+        ("minhash (0.8, 128 perm)", MinHashDeduplicator(threshold=0.8, num_perm=128)),
+    ]:
+        start = time.perf_counter()
+        for position, (_, text) in enumerate(corpus):
+            deduplicator.canonical(position, text)
+        rate = args.documents / (time.perf_counter() - start)
+        print(f"{label:<28} {rate:>10.0f} {deduplicator.stats.duplicates:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Compares `LocalEmbeddingIndex.search` with the remote `EmbeddingIndex.search`.
+
+Run with a configured Steamship profile and an embedder plugin, e.g.::
+
+    python benchmarks/local_search.py --plugin-handle test-embedder --items 1000 --queries 200
+
+The script creates a temporary index, fills it with synthetic sentences, then times the same queries against
+the engine and against a local copy of the index. Without `--plugin-handle` only the local engine is measured,
+over random vectors.
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from steamship import PluginInstance, Steamship
+from steamship.data.embeddings import EmbeddedItem
+from steamship.data.local_index import LocalEmbeddingIndex, Metric
+
+WORDS = ["pizza", "ship", "cheese", "water", "dolphin", "apple", "orange", "code", "run", "bike"]
+
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(5))
+
+
+def _timed(label: str, n_queries: int, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:10.1f} ms  {n_queries / elapsed:10.1f} queries/s")
+    return result
+
+
+def bench_synthetic(n_items: int, n_queries: int, dimensionality: int, k: int):
+    rng = np.random.default_rng(0)
+    index = LocalEmbeddingIndex(metric=Metric.COSINE)
+    index.add_vectors(
+        rng.normal(size=(n_items, dimensionality)).astype(np.float32),
+        [EmbeddedItem(id=str(i)) for i in range(n_items)],
+    )
+    queries = rng.normal(size=(n_queries, dimensionality)).astype(np.float32)
+    print(f"Synthetic: {n_items} items x {dimensionality} dims, {n_queries} queries, k={k}")
+    _timed(
+        "local (one query at a time)",
+        n_queries,
+        lambda: [index.search_vectors(q, k) for q in queries],
+    )
+    _timed("local (batched)", n_queries, lambda: index.search_vectors(queries, k))
+
+
+def bench_remote(client: Steamship, plugin_handle: str, n_items: int, n_queries: int, k: int):
+    rng = random.Random(0)
+    plugin_instance = PluginInstance.create(client, plugin_handle=plugin_handle).data
+    remote = client.create_index(plugin_instance=plugin_instance.handle).data
+    try:
+        remote.insert_many([_sentence(rng) for _ in range(n_items)], reindex=False)
+        remote.embed().wait(max_timeout_s=600)
+        queries = [_sentence(rng) for _ in range(n_queries)]
+
+        local = _timed(
+            "download (list_items)",
+            n_items,
+            lambda: LocalEmbeddingIndex.from_index(remote, plugin_instance=plugin_instance.handle),
+        )
+        query_vectors = _timed("embed queries", n_queries, lambda: local.embed_queries(queries))
+        print(f"Remote vs local: {n_items} items, {n_queries} queries, k={k}")
+        _timed(
+            "remote (one query at a time)",
+            n_queries,
+            lambda: [remote.search(q, k=k) for q in queries],
+        )
+        _timed("remote (batched)", n_queries, lambda: remote.search(queries, k=k))
+        _timed(
+            "local (batched, embedded)",
+            n_queries,
+            lambda: local.search(queries, k=k, query_vectors=query_vectors),
+        )
+    finally:
+        remote.delete()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plugin-handle", help="Embedder plugin used for the remote comparison.")
+    parser.add_argument("--profile", default=None, help="Steamship configuration profile.")
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--dimensionality", type=int, default=384)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.plugin_handle:
+        bench_remote(
+            Steamship(profile=args.profile), args.plugin_handle, args.items, args.queries, args.k
+        )
+    else:
+        bench_synthetic(args.items, args.queries, args.dimensionality, args.k)
+
+
+if __name__ == "__main__":
+    main()
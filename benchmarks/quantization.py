@@ -0,0 +1,83 @@
+"""Memory saved versus recall lost by quantizing the vectors of a local index.
+
+Runs offline over synthetic clustered vectors::
+
+    python benchmarks/quantization.py --items 200000 --dimensionality 384
+
+For scalar (int8) and product quantization, with and without exact re-ranking, it reports the memory held
+by the index, recall@k against exact float32 search, and queries per second.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from steamship.data.embeddings import EmbeddedItem
+from steamship.data.local_index import (
+    LocalEmbeddingIndex,
+    Metric,
+    ProductQuantizer,
+    ScalarQuantizer,
+)
+
+
+def clustered_vectors(n: int, dimensionality: int, clusters: int, rng) -> np.ndarray:
+    centers = rng.normal(size=(clusters, dimensionality)) * 2
+    labels = rng.integers(clusters, size=n)
+    return (centers[labels] + rng.normal(size=(n, dimensionality))).astype(np.float32)
+
+
+def recall(approximate: np.ndarray, exact: np.ndarray) -> float:
+    hits = sum(len(set(a) & set(e)) for a, e in zip(approximate.tolist(), exact.tolist()))
+    return hits / exact.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dimensionality", type=int, default=128)
+    parser.add_argument("--clusters", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank", type=int, default=100, help="Candidates re-scored exactly.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = clustered_vectors(args.items, args.dimensionality, args.clusters, rng)
+    queries = clustered_vectors(args.queries, args.dimensionality, args.clusters, rng)
+    items = [EmbeddedItem(id=str(i)) for i in range(args.items)]
+
+    def _measure(label: str, index: LocalEmbeddingIndex, expected=None):
+        start = time.perf_counter()
+        index.add_vectors(vectors, items)
+        build_s = time.perf_counter() - start
+        start = time.perf_counter()
+        rows, _ = index.search_vectors(queries, args.k)
+        qps = args.queries / (time.perf_counter() - start)
+        rec = 1.0 if expected is None else recall(rows, expected)
+        print(
+            f"{label:<24} {index.nbytes / 2**20:>10.1f} {rec:>10.3f} {qps:>12.1f} {build_s:>9.1f}"
+        )
+        return rows
+
+    print(f"{args.items} items x {args.dimensionality} dims, {args.queries} queries, k={args.k}")
+    print(f"{'storage':<24} {'MiB':>10} {'recall@k':>10} {'queries/s':>12} {'build s':>9}")
+    expected = _measure("float32", LocalEmbeddingIndex(metric=Metric.COSINE))
+    candidates = [("int8", lambda: ScalarQuantizer())]
+    for n_subvectors in (8, 16, 32):
+        if args.dimensionality % n_subvectors == 0:
+            candidates.append(
+                (f"pq{n_subvectors}", lambda m=n_subvectors: ProductQuantizer(n_subvectors=m))
+            )
+    for label, quantizer in candidates:
+        for rerank in (0, args.rerank):
+            _measure(
+                label + (f" + rerank {rerank}" if rerank else ""),
+                LocalEmbeddingIndex(metric=Metric.COSINE, quantizer=quantizer(), rerank=rerank),
+                expected,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,34 @@
 from __future__ import annotations
 
+import copy
 import json
 import logging
 import typing
 from abc import ABC
 from inspect import isclass
-from typing import Any, Dict, Type, TypeVar, Union
+from typing import Any, Dict, Optional, Tuple, Type, TypeVar, Union
 
 import inflection
 import requests
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from steamship.base.configuration import CamelModel, Configuration
 from steamship.base.error import SteamshipError
 from steamship.base.mime_types import MimeTypes
 from steamship.base.request import Request
 from steamship.base.response import Response, Task
+from steamship.base.tasks import TaskState
 from steamship.base.utils import to_camel
+from steamship.utils.cache import LRUCache
 from steamship.utils.url import Verb, is_local
 
 _logger = logging.getLogger(__name__)
 
 T = TypeVar("T", bound=Response)  # TODO (enias): Do we need this?
 
+# Operations whose responses `Client.enable_conditional_requests` caches and revalidates.
+CONDITIONAL_OPERATION_SUFFIXES = ("/get", "/list")
+
 
 class Client(CamelModel, ABC):
     """Client base.py class.
@@ -31,6 +37,8 @@ class Client(CamelModel, ABC):
     """
 
     config: Configuration
+    _search_cache: Optional[LRUCache] = PrivateAttr(default=None)
+    _conditional_cache: Optional[LRUCache] = PrivateAttr(default=None)
 
     def __init__(
         self,
@@ -61,6 +69,52 @@ class Client(CamelModel, ABC):
         )
         super().__init__(config=config)
 
+    @property
+    def search_cache(self) -> Optional[LRUCache]:
+        """The cache of `EmbeddingIndex.search` results, or None if search caching is disabled."""
+        return self._search_cache
+
+    def enable_search_cache(
+        self, max_entries: int = 1024, ttl_seconds: float = 60, max_bytes: int = None
+    ) -> LRUCache:
+        """Caches the results of `EmbeddingIndex.search` issued through this client.
+
+        Entries are keyed by index, query, `k` and `include_metadata`, expire after `ttl_seconds`, and are
+        invalidated when this client inserts into, embeds, snapshots or deletes their index. Changes made
+        by other clients are only picked up once entries expire. Use `search_cache.stats()` for hit rates
+        and memory use.
+        """
+        self._search_cache = LRUCache(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+            max_bytes=max_bytes,
+            size_of=lambda results: len(results.json(by_alias=True, exclude_none=True)),
+        )
+        return self._search_cache
+
+    def disable_search_cache(self) -> None:
+        self._search_cache = None
+
+    @property
+    def conditional_cache(self) -> Optional[LRUCache]:
+        """The cache of revalidated responses, or None if conditional requests are disabled."""
+        return self._conditional_cache
+
+    def enable_conditional_requests(self, max_entries: int = 1024) -> LRUCache:
+        """Revalidates the responses of repeated `get` and `list` calls instead of transferring them again.
+
+        The data of a response is kept, keyed by operation, space and payload, when the engine sends an
+        `ETag` or `Last-Modified` header with it. Repeating the call sends `If-None-Match` or
+        `If-Modified-Since`, and if the engine answers HTTP 304 the kept data is parsed again without a body
+        being transferred, so every call receives an object of its own. Use `conditional_cache.stats()` for
+        hit rates.
+        """
+        self._conditional_cache = LRUCache(max_entries=max_entries)
+        return self._conditional_cache
+
+    def disable_conditional_requests(self) -> None:
+        self._conditional_cache = None
+
     def _url(
         self,
         is_app_call: bool = False,
@@ -189,6 +243,19 @@ class Client(CamelModel, ABC):
         result["file"] = file
         return result
 
+    def _parse_data(self, expect: Optional[Type], data: Any) -> Tuple[Type, Any]:
+        """Parses the `data` of a response into `expect`, returning the type of the result and the result."""
+        if expect is None:
+            return type(data), data
+        if hasattr(expect, "from_dict"):
+            return expect, expect.from_dict(data, client=self)
+        # elif get_origin(expect) and issubclass(get_origin(expect), List):
+        #     if issubclass(expect.__args__[0], BaseModel):
+        #         parse_obj_as(expect, self._add_client_to_response( response_data["data"]))
+        if issubclass(expect, BaseModel):
+            return expect, expect.parse_obj(self._add_client_to_response(expect, data))
+        raise RuntimeError(f"obj of type {expect} does not have a from_dict method")
+
     def _add_client_to_response(self, expect: Type, response_data: Any):
         if isinstance(response_data, dict):
             self._add_client_to_object(expect, response_data)
@@ -238,6 +305,8 @@ class Client(CamelModel, ABC):
         app_id: str = None,
         app_instance_id: str = None,  # TODO (Enias): Where is the app_version_id ?
         as_background_task: bool = False,
+        stream: bool = False,
+        extra_headers: Dict[str, str] = None,
     ) -> Union[Any, Response[T]]:
         """Post to the Steamship API.
 
@@ -252,6 +321,10 @@ class Client(CamelModel, ABC):
 
         For the Python client we return the contents of the `data` field if present, and we raise an exception
         if the `error` field is filled in.
+
+        With `stream`, a successful response body is not read: the `data` of the returned response is the
+        underlying `requests.Response`, which the caller must consume and close. `extra_headers` are sent on top
+        of the headers the client sets itself, e.g. a `Range` header.
         """
         if space is not None:
             space_id = getattr(space, "id", None) if space_id is None else space_id
@@ -273,17 +346,41 @@ class Client(CamelModel, ABC):
             as_background_task=as_background_task,
         )
 
+        if extra_headers:
+            headers.update(extra_headers)
+
         data = self._prepare_data(payload=payload)
 
+        cache_key, cached = None, None
+        if (
+            self._conditional_cache is not None
+            and operation.endswith(CONDITIONAL_OPERATION_SUFFIXES)
+            and not (is_app_call or file is not None or raw_response or stream)
+        ):
+            cache_key = (
+                verb,
+                operation,
+                space_id,
+                space_handle,
+                json.dumps(data, sort_keys=True, default=str),
+            )
+            cached = self._conditional_cache.get(cache_key)
+            if cached is not None:
+                etag, last_modified, _, _ = cached
+                if etag is not None:
+                    headers["If-None-Match"] = etag
+                if last_modified is not None:
+                    headers["If-Modified-Since"] = last_modified
+
         logging.info(f"Steamship Client making {verb} to {url}")
         if verb == Verb.POST:
             if file is not None:
                 files = self._prepare_multipart_data(data, file)
-                resp = requests.post(url, files=files, headers=headers)
+                resp = requests.post(url, files=files, headers=headers, stream=stream)
             else:
-                resp = requests.post(url, json=data, headers=headers)
+                resp = requests.post(url, json=data, headers=headers, stream=stream)
         elif verb == Verb.GET:
-            resp = requests.get(url, params=data, headers=headers)
+            resp = requests.get(url, params=data, headers=headers, stream=stream)
         else:
             raise Exception(f"Unsupported verb: {verb}")
 
@@ -292,12 +389,23 @@ class Client(CamelModel, ABC):
         if debug is True:
             logging.debug(f"Got response {resp}")
 
-        response_data = self._response_data(resp, raw_response=raw_response)
+        if cached is not None and resp.status_code == 304:
+            # Parsed afresh on every hit, since callers post-process the objects they receive in place.
+            _, _, cached_expect, cached_data = cached
+            cached_expect, data = self._parse_data(cached_expect, copy.deepcopy(cached_data))
+            return Response(expect=cached_expect, data_=data, client=self)
+
+        if stream and resp.ok:
+            return Response(expect=requests.Response, data_=resp, client=self)
+
+        # A failed streaming call carries an error document rather than the requested bytes.
+        response_data = self._response_data(resp, raw_response=raw_response and not stream)
 
         logging.debug(f"Response JSON {response_data}")
 
         task = None
         error = None
+        cacheable = None
 
         if isinstance(response_data, dict):
             if "status" in response_data:
@@ -311,21 +419,10 @@ class Client(CamelModel, ABC):
                         logging.error(f"Client received error from server: {error}")
 
             if "data" in response_data:
-                if expect is not None:
-                    if hasattr(expect, "from_dict"):
-                        data = expect.from_dict(response_data["data"], client=self)
-                    # elif get_origin(expect) and issubclass(get_origin(expect), List):
-                    #     if issubclass(expect.__args__[0], BaseModel):
-                    #         parse_obj_as(expect, self._add_client_to_response( response_data["data"]))
-                    elif issubclass(expect, BaseModel):
-                        data = expect.parse_obj(
-                            self._add_client_to_response(expect, response_data["data"])
-                        )
-                    else:
-                        raise RuntimeError(f"obj of type {expect} does not have a from_dict method")
-                else:
-                    data = response_data["data"]
-                    expect = type(data)
+                if cache_key is not None:
+                    # The raw data, since parsing adds the client to it
+                    cacheable = (expect, copy.deepcopy(response_data["data"]))
+                expect, data = self._parse_data(expect, response_data["data"])
             else:
                 data = response_data
 
@@ -337,6 +434,16 @@ class Client(CamelModel, ABC):
         if ret.task is None and ret.data is None and ret.error is None:
             raise Exception("No data, task status, or error found in response")
 
+        if (
+            cacheable is not None
+            and resp.status_code == 200
+            and error is None
+            and (task is None or task.state == TaskState.succeeded)
+        ):
+            etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+            if etag is not None or last_modified is not None:
+                self._conditional_cache.put(cache_key, (etag, last_modified, *cacheable))
+
         return ret
 
     def post(
@@ -356,6 +463,8 @@ class Client(CamelModel, ABC):
         app_id: str = None,
         app_instance_id: str = None,
         as_background_task: bool = False,
+        stream: bool = False,
+        extra_headers: Dict[str, str] = None,
     ) -> Union[Any, Response[T]]:
         return self.call(
             verb="POST",
@@ -374,6 +483,8 @@ class Client(CamelModel, ABC):
             app_id=app_id,
             app_instance_id=app_instance_id,
             as_background_task=as_background_task,
+            stream=stream,
+            extra_headers=extra_headers,
         )
 
     def get(
@@ -393,6 +504,8 @@ class Client(CamelModel, ABC):
         app_id: str = None,
         app_instance_id: str = None,
         as_background_task: bool = False,
+        stream: bool = False,
+        extra_headers: Dict[str, str] = None,
     ) -> Union[Any, Response[T]]:
         return self.call(
             verb="GET",
@@ -411,4 +524,6 @@ class Client(CamelModel, ABC):
             app_id=app_id,
             app_instance_id=app_instance_id,
             as_background_task=as_background_task,
+            stream=stream,
+            extra_headers=extra_headers,
         )
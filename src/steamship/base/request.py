@@ -15,3 +15,14 @@ class GetRequest(Request):
 class IdentifierRequest(Request):
     id: str = None
     handle: str = None
+
+
+class PageRequest(Request):
+    """A request for one page of a listing.
+
+    `page_size` bounds the number of results returned; `page_token` is the `next_page_token` of the previous
+    page, or None for the first page.
+    """
+
+    page_size: int = None
+    page_token: str = None
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Set, Type, TypeVar
+from typing import Any, Dict, Iterator, List, Optional, Set, Type, TypeVar
 
 from pydantic import BaseModel
 
 from steamship.base.base import IResponse
 from steamship.base.configuration import CamelModel
 from steamship.base.metadata import metadata_to_str, str_to_metadata
-from steamship.base.request import Request
+from steamship.base.request import PageRequest, Request
+from steamship.utils.pagination import DEFAULT_PAGE_SIZE, paginate
 
 T = TypeVar("T")
 
@@ -21,7 +22,7 @@ class CreateTaskCommentRequest(Request):
     upsert: bool = None
 
 
-class ListTaskCommentRequest(Request):
+class ListTaskCommentRequest(PageRequest):
     task_id: str = None
     external_id: str = None
     external_type: str = None
@@ -84,12 +85,16 @@ class TaskComment(CamelModel):
         external_id: str = None,
         external_type: str = None,
         external_group: str = None,
+        page_size: int = None,
+        page_token: str = None,
     ) -> IResponse[TaskCommentList]:
         req = ListTaskCommentRequest(
             taskId=task_id,
             external_id=external_id,
             external_type=external_type,
             externalGroup=external_group,
+            page_size=page_size,
+            page_token=page_token,
         )
         return client.post(
             "task/comment/list",
@@ -97,6 +102,31 @@ class TaskComment(CamelModel):
             expect=TaskCommentList,
         )
 
+    @staticmethod
+    def iter_list(
+        client: Any,
+        task_id: str = None,
+        external_id: str = None,
+        external_type: str = None,
+        external_group: str = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Iterator[TaskComment]:
+        """Lazily yields the comments of `TaskComment.list`, fetching `page_size` of them at a time."""
+
+        def _fetch_page(page_token: Optional[str]):
+            data = TaskComment.list(
+                client,
+                task_id=task_id,
+                external_id=external_id,
+                external_type=external_type,
+                external_group=external_group,
+                page_size=page_size,
+                page_token=page_token,
+            ).data
+            return data.comments, data.next_page_token
+
+        return paginate(_fetch_page)
+
     def delete(self) -> IResponse[TaskComment]:
         req = DeleteTaskCommentRequest(id=self.id)
         return self.client.post(
@@ -109,6 +139,7 @@ class TaskComment(CamelModel):
 class TaskCommentList(CamelModel):
     # TODO (enias): Not needed
     comments: List[TaskComment]
+    next_page_token: str = None
 
 
 class TaskState:
@@ -10,6 +10,7 @@ from steamship.base.tasks import TaskComment, TaskCommentList
 from steamship.data import File
 from steamship.data.app_instance import AppInstance
 from steamship.data.embeddings import EmbedAndSearchRequest, EmbeddingIndex, QueryResults
+from steamship.data.local_index.embedding_cache import EmbeddingCache
 from steamship.data.operations.tagger import TagRequest, TagResponse
 from steamship.data.space import Space
 
@@ -97,7 +98,24 @@ class Steamship(Client):
         space_id: str = None,
         space_handle: str = None,
         space: Space = None,
+        embedding_cache: EmbeddingCache = None,
     ) -> Response[QueryResults]:
+        """Returns the `k` of `docs` most similar to `query`, as embedded by `plugin_instance`.
+
+        With an `embedding_cache`, the search runs client-side: only the query and the documents missing from
+        the cache are embedded, and the returned response is already complete.
+        """
+        if embedding_cache is not None:
+            return embedding_cache.embed_and_search(
+                self,
+                query,
+                docs,
+                plugin_instance,
+                k=k,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            )
         req = EmbedAndSearchRequest(query=query, docs=docs, plugin_instance=plugin_instance, k=k)
         return self.post(
             "plugin/instance/embeddingSearch",
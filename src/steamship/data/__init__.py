@@ -4,9 +4,12 @@ from .app_version import AppVersion
 from .block import Block
 from .embeddings import EmbeddingIndex
 from .file import File
+from .local_index import LocalEmbeddingIndex
+from .pipeline import FilePipeline
 from .plugin import Plugin
 from .plugin_instance import PluginInstance
 from .plugin_version import PluginVersion
+from .sharded_embeddings import ShardedEmbeddingIndex
 from .space import Space
 from .tags import DocTag, Tag, TagKind, TextTag
 
@@ -17,9 +20,12 @@ __all__ = [
     "Block",
     "EmbeddingIndex",
     "File",
+    "FilePipeline",
+    "LocalEmbeddingIndex",
     "Plugin",
     "PluginInstance",
     "PluginVersion",
+    "ShardedEmbeddingIndex",
     "Space",
     "DocTag",
     "Tag",
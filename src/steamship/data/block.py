@@ -1,14 +1,15 @@
 from __future__ import annotations
 
-from typing import Any, List, Optional
+from typing import Any, Iterator, List, Optional
 
 from steamship.base import Client, Request, Response
 from steamship.base.configuration import CamelModel
-from steamship.base.request import IdentifierRequest
+from steamship.base.request import IdentifierRequest, PageRequest
 from steamship.data.tags.tag import Tag
+from steamship.utils.pagination import DEFAULT_PAGE_SIZE, paginate
 
 
-class BlockQueryRequest(Request):
+class BlockQueryRequest(PageRequest):
     tag_filter_query: str
 
 
@@ -100,9 +101,13 @@ class Block(CamelModel):
         space_id: str = None,
         space_handle: str = None,
         space: Any = None,
+        page_size: int = None,
+        page_token: str = None,
     ) -> Response[BlockQueryResponse]:
         # TODO: Is this a static method?
-        req = BlockQueryRequest(tag_filter_query=tag_filter_query)
+        req = BlockQueryRequest(
+            tag_filter_query=tag_filter_query, page_size=page_size, page_token=page_token
+        )
         res = client.post(
             "block/query",
             payload=req,
@@ -113,9 +118,35 @@ class Block(CamelModel):
         )
         return res
 
+    @staticmethod
+    def iter_query(
+        client: Client,
+        tag_filter_query: str,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Iterator[Block]:
+        """Lazily yields the blocks matching `tag_filter_query`, fetching `page_size` of them at a time."""
+
+        def _fetch_page(page_token: Optional[str]):
+            data = Block.query(
+                client,
+                tag_filter_query,
+                page_size=page_size,
+                page_token=page_token,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            ).data
+            return data.blocks, data.next_page_token
+
+        return paginate(_fetch_page)
+
 
 class BlockQueryResponse(Response):
     blocks: List[Block]
+    next_page_token: str = None
 
 
 Block.ListResponse.update_forward_refs()
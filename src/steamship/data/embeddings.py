@@ -1,13 +1,39 @@
 from __future__ import annotations
 
+import contextlib
+import itertools
 import json
-from typing import Any, Dict, List, Optional, Type, Union
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
-from steamship.base import Client, Request, Response, metadata_to_str
+from steamship.base import Client, Request, Response, SteamshipError, TaskState, metadata_to_str
 from steamship.base.configuration import CamelModel
-from steamship.data.search import Hit
+from steamship.base.request import PageRequest
+from steamship.data.search import Hit, decode_hit_metadata
+from steamship.data.snapshot_policy import SnapshotPolicy, _is_finished
+from steamship.utils.batching import batched, map_concurrently
+from steamship.utils.dedup import Deduplicator
+from steamship.utils.pagination import DEFAULT_PAGE_SIZE, paginate
+from steamship.utils.signed_urls import stream_from_signed_url
+from steamship.utils.vectors import (
+    EmbeddingEncoding,
+    decode_embedding,
+    encode_embedding,
+    import_numpy,
+)
+
+# Defaults for splitting `EmbeddingIndex.insert_many` into several `embedding-index/item/create` requests.
+# The byte limit stays comfortably below the request body limit of the API tier.
+DEFAULT_INSERT_BATCH_SIZE = 1000
+DEFAULT_INSERT_BATCH_BYTES = 4 * 1024 * 1024
+
+# Number of queries sent per `embedding-index/search` request by `EmbeddingIndex.search_many`.
+DEFAULT_SEARCH_BATCH_SIZE = 100
 
 
 class EmbedAndSearchRequest(Request):
@@ -28,6 +54,25 @@ class QueryResult(CamelModel):
 class QueryResults(Request):
     items: List[QueryResult] = None
 
+    @property
+    def scores(self) -> Any:
+        """The scores of the results as a float32 NumPy array, in result order; NaN where a score is missing."""
+        np = import_numpy()
+        return np.array(
+            [np.nan if item.score is None else item.score for item in self.items or []],
+            dtype=np.float32,
+        )
+
+    def decode_metadata(self, schema: Type = None) -> List[Any]:
+        """Returns the metadata of the hits, in result order, as instances of `schema` if given.
+
+        `schema` may be a pydantic model or a dataclass. Metadata is otherwise decoded lazily, when
+        `Hit.metadata` is first read.
+        """
+        return decode_hit_metadata(
+            [item.value if item.value is not None else Hit() for item in self.items or []], schema
+        )
+
 
 class EmbeddedItem(CamelModel):
     id: str = None
@@ -39,10 +84,11 @@ class EmbeddedItem(CamelModel):
     external_id: str = None
     external_type: str = None
     metadata: Any = None
-    embedding: List[float] = None
+    embedding: Union[List[float], Any] = None  # A list of floats or a float32 numpy.ndarray
 
-    def clone_for_insert(self) -> EmbeddedItem:
-        """Produces a clone with a string representation of the metadata"""
+    def clone_for_insert(self, embedding_encoding: EmbeddingEncoding = None) -> EmbeddedItem:
+        """Produces a clone with a string representation of the metadata and a wire representation of the
+        embedding."""
         ret = EmbeddedItem(
             id=self.id,
             index_id=self.index_id,
@@ -53,7 +99,7 @@ class EmbeddedItem(CamelModel):
             external_id=self.external_id,
             external_type=self.external_type,
             metadata=self.metadata,
-            embedding=self.embedding,
+            embedding=encode_embedding(self.embedding, embedding_encoding),
         )
         if isinstance(ret.metadata, dict) or isinstance(ret.metadata, list):
             ret.metadata = json.dumps(ret.metadata)
@@ -80,6 +126,9 @@ class IndexInsertRequest(Request):
     external_type: str = None
     metadata: Any = None
     reindex: bool = True
+    embedding_encoding: EmbeddingEncoding = (
+        None  # Encoding of the embeddings of `items`; JSON when None
+    )
 
 
 class IndexItemId(CamelModel):
@@ -91,6 +140,15 @@ class IndexInsertResponse(Response):
     item_ids: List[IndexItemId] = None
 
 
+class InsertManyProgress(CamelModel):
+    """Progress report passed to the `on_progress` callback of `EmbeddingIndex.insert_many`."""
+
+    batches_completed: int = 0  # Number of batches acknowledged by the engine, in any order
+    items_completed: int = 0  # Number of items in those batches
+    acknowledged_batches: int = 0  # Length of the contiguous prefix of acknowledged batches.
+    # Passing `acknowledged_batches` as `resume_from_batch` resumes an interrupted insert.
+
+
 class IndexEmbedRequest(Request):
     id: str
 
@@ -117,23 +175,66 @@ class IndexSnapshotResponse(Response):
     snapshot_id: str
 
 
-class ListSnapshotsRequest(Request):
+class ListSnapshotsRequest(PageRequest):
     id: str = None
 
 
 class ListSnapshotsResponse(Response):
     snapshots: List[IndexSnapshotResponse]
+    next_page_token: str = None
 
 
-class ListItemsRequest(Request):
+class ListItemsRequest(PageRequest):
     id: str = None
     file_id: str = None
     block_id: str = None
     span_id: str = None
+    embedding_encoding: EmbeddingEncoding = None  # Requested encoding of the returned embeddings
+    include_embeddings: bool = None  # The items come without their embeddings when False
 
 
 class ListItemsResponse(Response):
     items: List[EmbeddedItem]
+    next_page_token: str = None
+
+
+class ListItemChangesRequest(PageRequest):
+    id: str = None
+    since_snapshot_id: str = None  # Changes after this snapshot; every item when None
+    until_snapshot_id: str = None  # Changes up to and including this snapshot
+    embedding_encoding: EmbeddingEncoding = None  # Requested encoding of the returned embeddings
+
+
+class ListItemChangesResponse(Response):
+    added_items: List[EmbeddedItem] = []  # Items added or replaced, with their embeddings
+    removed_item_ids: List[str] = []
+    next_page_token: str = None
+
+
+class DeleteItemsRequest(Request):
+    id: str
+    item_ids: List[str]
+
+
+class DeleteItemsResponse(Response):
+    item_ids: List[str] = None
+
+
+class ExportSnapshotRequest(Request):
+    id: str = None
+    snapshot_id: str = None  # The latest snapshot when None
+
+
+class ExportSnapshotResponse(Response):
+    snapshot_id: str = None
+    count: int = None
+    dimensionality: int = None
+    # Signed URL of the vectors: a (count, dimensionality) row-major matrix of little-endian float32
+    vectors_url: str = None
+    vectors_sha256: str = None
+    # Signed URL of the items as JSON lines, row-aligned with the vectors and without embeddings
+    items_url: str = None
+    items_sha256: str = None
 
 
 class DeleteSnapshotsRequest(Request):
@@ -148,6 +249,69 @@ class DeleteEmbeddingIndexRequest(Request):
     id: str
 
 
+def _items_for_insert(
+    items: Iterable[Union[EmbeddedItem, str]],
+    embedding_encoding: Optional[EmbeddingEncoding],
+    deduplicator: Optional[Deduplicator],
+) -> Iterator[EmbeddedItem]:
+    """Lazily converts `items` to their wire form, dropping near-duplicates if there is a `deduplicator`."""
+    new_items = (
+        EmbeddedItem(value=item).clone_for_insert()
+        if isinstance(item, str)
+        else item.clone_for_insert(embedding_encoding)
+        for item in items
+    )
+    if deduplicator is None:
+        return new_items
+    return deduplicator.filter(
+        new_items,
+        text_of=lambda item: item.value,
+        key_of=lambda item: item.external_id or item.id or item.value,
+    )
+
+
+def _insert_batches(
+    target: str,
+    insert_batch: Callable[[List[EmbeddedItem]], Response[IndexInsertResponse]],
+    batches: Iterable[List[EmbeddedItem]],
+    max_concurrency: int,
+    resume_from_batch: int,
+    on_progress: Optional[Callable[[InsertManyProgress], None]],
+) -> Dict[int, IndexInsertResponse]:
+    """Inserts and awaits `batches` concurrently, returning the response of each batch by position. `target`
+    names the index in errors."""
+
+    def _insert_and_wait(batch: List[EmbeddedItem]) -> Tuple[int, IndexInsertResponse]:
+        response = insert_batch(batch)
+        response.wait()
+        return len(batch), response.data
+
+    progress = InsertManyProgress(acknowledged_batches=resume_from_batch)
+    completed: Dict[int, IndexInsertResponse] = {}
+    try:
+        for position, (item_count, data) in map_concurrently(
+            _insert_and_wait, batches, max_concurrency=max_concurrency
+        ):
+            completed[position] = data
+            progress.batches_completed += 1
+            progress.items_completed += item_count
+            while progress.acknowledged_batches - resume_from_batch in completed:
+                progress.acknowledged_batches += 1
+            if on_progress is not None:
+                on_progress(progress.copy())
+    except Exception as error:
+        logging.error(
+            f"insert_many into {target} failed after {progress.acknowledged_batches} batches."
+        )
+        raise SteamshipError(
+            message=f"Unable to insert items into {target}.",
+            suggestion=f"Retry with resume_from_batch={progress.acknowledged_batches} to skip the batches "
+            f"which were already inserted.",
+            error=error,
+        )
+    return completed
+
+
 class EmbeddingIndex(CamelModel):
     """A persistent, read-optimized index over embeddings."""
 
@@ -160,6 +324,10 @@ class EmbeddingIndex(CamelModel):
     external_type: str = None
     metadata: str = None
 
+    _snapshot_policy: Optional[SnapshotPolicy] = PrivateAttr(default=None)
+    # Writes posted through this object whose task may still be running
+    _pending_writes: List[Response] = PrivateAttr(default_factory=list)
+
     @classmethod
     def parse_obj(cls: Type[BaseModel], obj: Any) -> BaseModel:
         # TODO (enias): This needs to be solved at the engine side
@@ -169,6 +337,96 @@ class EmbeddingIndex(CamelModel):
             obj = obj["index"]
         return super().parse_obj(obj)
 
+    def _invalidate_search_cache(self) -> None:
+        """Drops the cached search results of this index, if the client caches searches."""
+        cache = self.client.search_cache if self.client is not None else None
+        if cache is not None:
+            cache.invalidate(lambda key: key[0] == self.id)
+
+    def _post_write(self, operation: str, payload: Request, **kwargs) -> Response:
+        """Posts a request which changes the index, invalidating its cached searches before and after.
+
+        A search made while the request is in flight may cache the results from before the write, so the
+        cache is invalidated once more after `post` returns. If the engine answers with a task which is
+        still running, the search cache is bypassed for this index until the task is seen to finish.
+        """
+        self._invalidate_search_cache()
+        ret = self.client.post(operation, payload, **kwargs)
+        self._invalidate_search_cache()
+        if ret.task is not None and ret.task.state not in (TaskState.succeeded, TaskState.failed):
+            self._pending_writes.append(ret)
+        return ret
+
+    def _writes_in_flight(self) -> bool:
+        """Whether a write posted through this object may still be running. Once the last one is seen to
+        finish, the cached searches of the index are invalidated a final time.
+
+        The writes are polled oldest first, and polling stops at the first one still running, so that a
+        search costs at most one status request however many writes are pending, and writes nobody waits on
+        are still dropped once they finish.
+        """
+        if not self._pending_writes:
+            return False
+        # Appends and removals are atomic, so writes posted meanwhile from other threads are kept.
+        for ret in list(self._pending_writes):
+            if not _is_finished(ret):
+                break
+            with contextlib.suppress(ValueError):  # Removed by a concurrent search
+                self._pending_writes.remove(ret)
+        in_flight = bool(self._pending_writes)
+        if not in_flight:
+            self._invalidate_search_cache()
+        return in_flight
+
+    @property
+    def snapshot_policy(self) -> Optional[SnapshotPolicy]:
+        """The automatic snapshot policy of this index object, or None if it is disabled."""
+        return self._snapshot_policy
+
+    def enable_auto_snapshot(
+        self,
+        every_items: Optional[int] = 1000,
+        every_seconds: Optional[float] = None,
+        retain: Optional[int] = 2,
+    ) -> SnapshotPolicy:
+        """Snapshots the index automatically after inserts made through this object.
+
+        A snapshot is started once `every_items` items have been inserted, or once `every_seconds` have
+        passed since the first insert not covered by a snapshot; the time is checked on each insert. Only one
+        snapshot is in flight at a time. Before the next snapshot starts, all but the `retain` most recent
+        snapshots completed by this policy are deleted (`retain=None` keeps them all). Call
+        `flush_snapshots` when an ingest ends.
+        """
+        self._snapshot_policy = SnapshotPolicy(
+            every_items=every_items, every_seconds=every_seconds, retain=retain
+        )
+        return self._snapshot_policy
+
+    def disable_auto_snapshot(self) -> None:
+        self._snapshot_policy = None
+
+    def flush_snapshots(
+        self, space_id: str = None, space_handle: str = None, space: Any = None
+    ) -> None:
+        """Blocks until every insert made through this object is covered by a completed snapshot."""
+        if self._snapshot_policy is not None:
+            self._snapshot_policy.flush(
+                self, space_id=space_id, space_handle=space_handle, space=space
+            )
+
+    def _record_inserts(
+        self,
+        response: Response,
+        count: int,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> None:
+        if self._snapshot_policy is not None:
+            self._snapshot_policy.record_inserts(
+                self, response, count, space_id=space_id, space_handle=space_handle, space=space
+            )
+
     def insert_file(
         self,
         file_id: str,
@@ -193,7 +451,7 @@ class EmbeddingIndex(CamelModel):
             metadata=metadata,
             reindex=reindex,
         )
-        return self.client.post(
+        ret = self._post_write(
             "embedding-index/item/create",
             req,
             expect=IndexInsertResponse,
@@ -201,28 +459,104 @@ class EmbeddingIndex(CamelModel):
             space_handle=space_handle,
             space=space,
         )
+        self._record_inserts(ret, 1, space_id=space_id, space_handle=space_handle, space=space)
+        return ret
 
     def insert_many(
         self,
-        items: List[Union[EmbeddedItem, str]],
+        items: Iterable[Union[EmbeddedItem, str]],
         reindex: bool = True,
+        batch_size: int = DEFAULT_INSERT_BATCH_SIZE,
+        max_batch_bytes: int = DEFAULT_INSERT_BATCH_BYTES,
+        max_concurrency: int = 1,
+        resume_from_batch: int = 0,
+        on_progress: Callable[[InsertManyProgress], None] = None,
+        embedding_encoding: EmbeddingEncoding = None,
+        deduplicator: Deduplicator = None,
         space_id: str = None,
         space_handle: str = None,
         space: Any = None,
     ) -> Response[IndexInsertResponse]:
-        new_items = []
-        for item in items:
-            if isinstance(item, str):
-                new_items.append(EmbeddedItem(value=item))
-            else:
-                new_items.append(item)
+        """Inserts `items` into the index, splitting them into batches of at most `batch_size` items and
+        `max_batch_bytes` serialized bytes.
+
+        Up to `max_concurrency` batches are in flight at once. `items` may be any iterable, including a
+        generator, and is consumed lazily. When everything fits in a single batch the engine's response is
+        returned as-is; otherwise each batch is awaited and the `item_ids` of all batches are merged, in
+        input order, into one `IndexInsertResponse`.
+
+        After every acknowledged batch, `on_progress` receives an `InsertManyProgress`. If a batch fails, the
+        raised `SteamshipError` suggests the `resume_from_batch` value which skips the batches already
+        acknowledged; retrying with the same items and batch settings then continues where it stopped.
+
+        Pre-computed embeddings may be lists or numpy arrays; `embedding_encoding` selects their wire format.
+
+        With a `deduplicator`, items whose value is a near-duplicate of an earlier item (in this call, or in
+        earlier calls with the same deduplicator) are skipped. Items are identified by their external id, id
+        or value, in that order, and `deduplicator.duplicates` maps skipped items to their canonical items.
+        """
+        batches = batched(
+            _items_for_insert(items, embedding_encoding, deduplicator),
+            max_items=batch_size,
+            max_bytes=max_batch_bytes,
+            size_of=lambda item: len(item.json(by_alias=True, exclude_none=True)),
+        )
+        pending = (batch for position, batch in enumerate(batches) if position >= resume_from_batch)
+
+        def _insert_batch(batch: List[EmbeddedItem]) -> Response[IndexInsertResponse]:
+            return self._insert_batch(
+                batch,
+                reindex=reindex,
+                embedding_encoding=embedding_encoding,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            )
+
+        first_batch = next(pending, [])
+        second_batch = next(pending, None)
+        if second_batch is None and resume_from_batch == 0:
+            # Everything fits in one request: preserve the engine's (possibly asynchronous) response.
+            return _insert_batch(first_batch)
 
+        completed: Dict[int, IndexInsertResponse] = {}
+        if first_batch:
+            remaining = [first_batch] if second_batch is None else [first_batch, second_batch]
+            completed = _insert_batches(
+                f"embedding index {self.id}",
+                _insert_batch,
+                itertools.chain(remaining, pending),
+                max_concurrency=max_concurrency,
+                resume_from_batch=resume_from_batch,
+                on_progress=on_progress,
+            )
+        # Otherwise every batch was already acknowledged by a previous run.
+
+        item_ids = []
+        for position in sorted(completed):
+            item_ids.extend((completed[position] and completed[position].item_ids) or [])
+        return Response(
+            expect=IndexInsertResponse,
+            data_=IndexInsertResponse(item_ids=item_ids),
+            client=self.client,
+        )
+
+    def _insert_batch(
+        self,
+        batch: List[EmbeddedItem],
+        reindex: bool,
+        embedding_encoding: Optional[EmbeddingEncoding],
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> Response[IndexInsertResponse]:
         req = IndexInsertRequest(
             index_id=self.id,
-            items=[item.clone_for_insert() for item in new_items],
+            items=batch,
             reindex=reindex,
+            embedding_encoding=embedding_encoding,
         )
-        return self.client.post(
+        ret = self._post_write(
             "embedding-index/item/create",
             req,
             expect=IndexInsertResponse,
@@ -230,6 +564,10 @@ class EmbeddingIndex(CamelModel):
             space_handle=space_handle,
             space=space,
         )
+        self._record_inserts(
+            ret, len(batch), space_id=space_id, space_handle=space_handle, space=space
+        )
+        return ret
 
     def insert(
         self,
@@ -251,7 +589,7 @@ class EmbeddingIndex(CamelModel):
             metadata=metadata_to_str(metadata),
             reindex=reindex,
         )
-        return self.client.post(
+        ret = self._post_write(
             "embedding-index/item/create",
             req,
             expect=IndexInsertResponse,
@@ -259,12 +597,14 @@ class EmbeddingIndex(CamelModel):
             space_handle=space_handle,
             space=space,
         )
+        self._record_inserts(ret, 1, space_id=space_id, space_handle=space_handle, space=space)
+        return ret
 
     def embed(
         self, space_id: str = None, space_handle: str = None, space: Any = None
     ) -> Response[IndexEmbedResponse]:
         req = IndexEmbedRequest(id=self.id)
-        return self.client.post(
+        return self._post_write(
             "embedding-index/embed",
             req,
             expect=IndexEmbedResponse,
@@ -278,7 +618,7 @@ class EmbeddingIndex(CamelModel):
         self, space_id: str = None, space_handle: str = None, space: Any = None
     ) -> Response[IndexSnapshotResponse]:
         req = IndexSnapshotRequest(index_id=self.id)
-        return self.client.post(
+        return self._post_write(
             "embedding-index/snapshot/create",
             req,
             expect=IndexSnapshotResponse,
@@ -290,9 +630,14 @@ class EmbeddingIndex(CamelModel):
 
     # TODO (enias): Can these be generic list operations for all file types?
     def list_snapshots(
-        self, space_id: str = None, space_handle: str = None, space: Any = None
+        self,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+        page_size: int = None,
+        page_token: str = None,
     ) -> Response[ListSnapshotsResponse]:
-        req = ListSnapshotsRequest(id=self.id)
+        req = ListSnapshotsRequest(id=self.id, page_size=page_size, page_token=page_token)
         return self.client.post(
             "embedding-index/snapshot/list",
             req,
@@ -302,6 +647,27 @@ class EmbeddingIndex(CamelModel):
             space=space,
         )
 
+    def iter_snapshots(
+        self,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Iterator[IndexSnapshotResponse]:
+        """Lazily yields the snapshots of the index, fetching `page_size` of them at a time."""
+
+        def _fetch_page(page_token: Optional[str]):
+            data = self.list_snapshots(
+                page_size=page_size,
+                page_token=page_token,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            ).data
+            return data.snapshots, data.next_page_token
+
+        return paginate(_fetch_page)
+
     def list_items(
         self,
         file_id: str = None,
@@ -310,9 +676,29 @@ class EmbeddingIndex(CamelModel):
         space_id: str = None,
         space_handle: str = None,
         space: Any = None,
+        embedding_encoding: EmbeddingEncoding = None,
+        as_numpy: bool = False,
+        page_size: int = None,
+        page_token: str = None,
+        include_embeddings: bool = True,
     ) -> Response[ListItemsResponse]:
-        req = ListItemsRequest(id=self.id, file_id=file_id, block_id=block_id, spanId=span_id)
-        return self.client.post(
+        """Lists the items of the index.
+
+        `embedding_encoding` asks the engine for a compact binary encoding of the embeddings, which are decoded
+        on arrival. With `as_numpy`, each item's embedding is a float32 numpy.ndarray instead of a list.
+        Without `include_embeddings`, only the items' other fields are transferred.
+        """
+        req = ListItemsRequest(
+            id=self.id,
+            file_id=file_id,
+            block_id=block_id,
+            spanId=span_id,
+            embedding_encoding=embedding_encoding,
+            page_size=page_size,
+            page_token=page_token,
+            include_embeddings=None if include_embeddings else False,
+        )
+        ret = self.client.post(
             "embedding-index/item/list",
             req,
             expect=ListItemsResponse,
@@ -320,6 +706,145 @@ class EmbeddingIndex(CamelModel):
             space_handle=space_handle,
             space=space,
         )
+        if ret.data_ is not None and ret.data_.items:
+            for item in ret.data_.items:
+                item.embedding = decode_embedding(item.embedding, embedding_encoding, as_numpy)
+        return ret
+
+    def iter_items(
+        self,
+        file_id: str = None,
+        block_id: str = None,
+        span_id: str = None,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+        embedding_encoding: EmbeddingEncoding = None,
+        as_numpy: bool = False,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        include_embeddings: bool = True,
+    ) -> Iterator[EmbeddedItem]:
+        """Lazily yields the items of `list_items`, fetching `page_size` of them at a time."""
+
+        def _fetch_page(page_token: Optional[str]):
+            data = self.list_items(
+                file_id=file_id,
+                block_id=block_id,
+                span_id=span_id,
+                embedding_encoding=embedding_encoding,
+                as_numpy=as_numpy,
+                page_size=page_size,
+                page_token=page_token,
+                include_embeddings=include_embeddings,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            ).data
+            return data.items, data.next_page_token
+
+        return paginate(_fetch_page)
+
+    def list_changes(
+        self,
+        since_snapshot_id: str = None,
+        until_snapshot_id: str = None,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+        embedding_encoding: EmbeddingEncoding = None,
+        as_numpy: bool = False,
+        page_size: int = None,
+        page_token: str = None,
+    ) -> Response[ListItemChangesResponse]:
+        """Lists the items added to and removed from the index between two snapshots.
+
+        Embeddings are decoded as in `list_items`.
+        """
+        req = ListItemChangesRequest(
+            id=self.id,
+            since_snapshot_id=since_snapshot_id,
+            until_snapshot_id=until_snapshot_id,
+            embedding_encoding=embedding_encoding,
+            page_size=page_size,
+            page_token=page_token,
+        )
+        ret = self.client.post(
+            "embedding-index/item/changes",
+            req,
+            expect=ListItemChangesResponse,
+            space_id=space_id,
+            space_handle=space_handle,
+            space=space,
+        )
+        if ret.data_ is not None and ret.data_.added_items:
+            for item in ret.data_.added_items:
+                item.embedding = decode_embedding(item.embedding, embedding_encoding, as_numpy)
+        return ret
+
+    def delete_items(
+        self,
+        item_ids: List[str],
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> Response[DeleteItemsResponse]:
+        """Removes the items with the given ids from the index."""
+        return self._post_write(
+            "embedding-index/item/delete",
+            DeleteItemsRequest(id=self.id, item_ids=item_ids),
+            expect=DeleteItemsResponse,
+            space_id=space_id,
+            space_handle=space_handle,
+            space=space,
+        )
+
+    def export_snapshot(
+        self,
+        snapshot_id: Optional[str],
+        path: Union[str, Path],
+        chunk_size: int = 1 << 20,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> ExportSnapshotResponse:
+        """Downloads snapshot `snapshot_id` of the index, by default the latest, into the directory `path`.
+
+        The engine exports the snapshot as two artifacts, which are streamed to disk and checked against their
+        SHA-256 checksums: `vectors.f32`, the embeddings as a packed (count, dimensionality) matrix of
+        little-endian float32 which `numpy.fromfile` or `numpy.memmap` can read, and `items.jsonl`, the
+        items without their embeddings in the same order. `snapshot.json` describes the export and is written
+        last. `LocalEmbeddingIndex.from_export` loads an export for local search.
+        """
+        ret = self.client.post(
+            "embedding-index/snapshot/export",
+            ExportSnapshotRequest(id=self.id, snapshot_id=snapshot_id),
+            expect=ExportSnapshotResponse,
+            asynchronous=True,
+            space_id=space_id,
+            space_handle=space_handle,
+            space=space,
+        )
+        ret.wait()
+        export = ret.data
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        _download_verified(
+            export.vectors_url, export.vectors_sha256, directory / "vectors.f32", chunk_size
+        )
+        expected_size = (export.count or 0) * (export.dimensionality or 0) * 4
+        if (directory / "vectors.f32").stat().st_size != expected_size:
+            raise SteamshipError(
+                message=f"The exported vectors of snapshot {export.snapshot_id} do not hold {export.count} "
+                f"vectors of dimensionality {export.dimensionality}."
+            )
+        _download_verified(
+            export.items_url, export.items_sha256, directory / "items.jsonl", chunk_size
+        )
+        with open(directory / "snapshot.json", "w") as f:
+            f.write(
+                export.json(by_alias=True, exclude_none=True, exclude={"vectors_url", "items_url"})
+            )
+        return export
 
     def delete_snapshot(
         self,
@@ -341,7 +866,7 @@ class EmbeddingIndex(CamelModel):
     def delete(
         self, space_id: str = None, space_handle: str = None, space: Any = None
     ) -> Response[EmbeddingIndex]:
-        return self.client.post(
+        return self._post_write(
             "embedding-index/delete",
             DeleteEmbeddingIndexRequest(id=self.id),
             expect=EmbeddingIndex,
@@ -355,10 +880,30 @@ class EmbeddingIndex(CamelModel):
         query: Union[str, List[str]],
         k: int = 1,
         include_metadata: bool = False,
+        use_cache: bool = True,
         space_id: str = None,
         space_handle: str = None,
         space: Any = None,
     ) -> Response[QueryResults]:
+        """Searches the index for the `k` items nearest to `query`, or to each query of a list.
+
+        If the client has a search cache (`Client.enable_search_cache`), results are served from it when
+        possible; pass `use_cache=False` to bypass it.
+        """
+        cache = self.client.search_cache if use_cache and not self._writes_in_flight() else None
+        key = (
+            self.id,
+            tuple(query) if isinstance(query, list) else query,
+            k,
+            include_metadata,
+        )
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return Response(
+                    expect=QueryResults, data_=cached.copy(deep=True), client=self.client
+                )
+
         if isinstance(query, list):
             req = IndexSearchRequest(
                 id=self.id, queries=query, k=k, include_metadata=include_metadata
@@ -376,8 +921,65 @@ class EmbeddingIndex(CamelModel):
             space=space,
         )
 
+        if cache is not None and ret.error is None and ret.data_ is not None:
+            cache.put(key, ret.data_.copy(deep=True))
         return ret
 
+    def search_many(
+        self,
+        queries: Iterable[str],
+        k: int = 1,
+        include_metadata: bool = False,
+        batch_size: int = DEFAULT_SEARCH_BATCH_SIZE,
+        max_concurrency: int = 1,
+        on_batch: Callable[[int, QueryResults], None] = None,
+        use_cache: bool = True,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> Response[QueryResults]:
+        """Searches the index for each of `queries`, sending them `batch_size` at a time.
+
+        Up to `max_concurrency` batches are in flight at once. As each batch completes, `on_batch` receives
+        the position of its first query in `queries` and its `QueryResults`; batches may complete out of
+        order. The returned `QueryResults` hold the hits of every query, in query order, as `search` with a
+        list of queries would.
+        """
+
+        def _search_batch(batch: List[str]) -> QueryResults:
+            response = self.search(
+                batch,
+                k=k,
+                include_metadata=include_metadata,
+                use_cache=use_cache,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            )
+            response.wait()
+            return response.data
+
+        completed: Dict[int, QueryResults] = {}
+        try:
+            for position, results in map_concurrently(
+                _search_batch,
+                batched(queries, max_items=batch_size),
+                max_concurrency=max_concurrency,
+            ):
+                completed[position] = results
+                if on_batch is not None:
+                    on_batch(position * batch_size, results)
+        except Exception as error:
+            raise SteamshipError(
+                message=f"Unable to search embedding index {self.id}.",
+                error=error,
+            )
+
+        items = []
+        for position in sorted(completed):
+            items.extend((completed[position] and completed[position].items) or [])
+        return Response(expect=QueryResults, data_=QueryResults(items=items), client=self.client)
+
     @staticmethod
     def create(
         client: Client,
@@ -409,3 +1011,21 @@ class EmbeddingIndex(CamelModel):
             space=space,
             expect=EmbeddingIndex,
         )
+
+
+def _download_verified(url: str, sha256: Optional[str], path: Path, chunk_size: int) -> None:
+    """Streams `url` to `path`, which is only replaced once the contents match the `sha256` checksum."""
+    with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as f:
+        try:
+            digest = stream_from_signed_url(url, f, chunk_size=chunk_size)
+        except Exception:
+            os.unlink(f.name)
+            raise
+    if sha256 is not None and digest != sha256.lower():
+        os.unlink(f.name)
+        raise SteamshipError(
+            message=f"The download of {path.name} is corrupt: its SHA-256 checksum is {digest}, "
+            f"expected {sha256}.",
+            suggestion="Retry the export.",
+        )
+    os.replace(f.name, path)
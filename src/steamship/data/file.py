@@ -1,19 +1,33 @@
 from __future__ import annotations
 
+import hashlib
 import io
+import itertools
 import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
 from enum import Enum
-from typing import Any, List, Optional, Type, Union
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Type, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
-from steamship.base import Client, Request, Response
+from steamship.base import Client, Request, Response, SteamshipError, TaskState, str_to_metadata
 from steamship.base.binary_utils import flexi_create
 from steamship.base.configuration import CamelModel
-from steamship.base.request import IdentifierRequest
+from steamship.base.request import IdentifierRequest, PageRequest
 from steamship.data.block import Block
 from steamship.data.embeddings import EmbeddingIndex
+from steamship.data.space import SignedUrl
 from steamship.data.tags import Tag
+from steamship.utils.batching import batched, map_concurrently
+from steamship.utils.dedup import Deduplicator
+from steamship.utils.pagination import DEFAULT_PAGE_SIZE, paginate
+from steamship.utils.raw_cache import RawDataCache, default_raw_cache
+from steamship.utils.signed_urls import upload_to_signed_url
 
 
 class FileUploadType(str, Enum):
@@ -23,16 +37,66 @@ class FileUploadType(str, Enum):
         "fileImporter"  # The CreateRequest contains a fileImporter handle that should be used
     )
     BLOCKS = "blocks"  # The CreateRequest contains blocks and tags that should be read in directly
+    UPLOADED = "uploaded"  # The CreateRequest references contents uploaded with a signed URL
 
 
 _logger = logging.getLogger(__name__)
 
+# Metadata key under which `File.index` records the hash of the text an item was embedded from.
+BLOCK_HASH_METADATA_KEY = "blockTextHash"
+
+# Size of the chunks `File.raw(stream=True)` and `File.download` read the contents of a file in.
+DEFAULT_DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Contents larger than this are uploaded by `File.create` straight to storage, rather than through the API.
+DIRECT_UPLOAD_THRESHOLD_BYTES = 32 * 1024 * 1024
+
+# Bounds on the blocks, or tags, `File.create` sends per request.
+DEFAULT_BLOCK_BATCH_SIZE = 1000
+DEFAULT_BLOCK_BATCH_BYTES = 4 * 1024 * 1024
+
+
+class UploadManifestEntry(CamelModel):
+    """A line of the manifest written by `File.create_many`: a path which needs no further upload."""
+
+    path: str
+    sha256: str
+    file_id: str = None  # The file holding the content, unless it is a duplicate of an earlier path
+    duplicate_of: str = None  # The earlier path with the same content
+
+
+class UploadProgress(CamelModel):
+    """Progress report of `File.create_many`."""
+
+    files_uploaded: int = 0
+    files_skipped: int = 0  # Already uploaded, by this run, an earlier run or another client
+    bytes_uploaded: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        done = self.files_uploaded + self.files_skipped
+        return done / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.bytes_uploaded / 1e6 / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def add(self, uploaded_bytes: Optional[int], elapsed_seconds: float) -> None:
+        """Counts a file which was uploaded with `uploaded_bytes` bytes, or skipped if None."""
+        if uploaded_bytes is None:
+            self.files_skipped += 1
+        else:
+            self.files_uploaded += 1
+            self.bytes_uploaded += uploaded_bytes
+        self.elapsed_seconds = elapsed_seconds
+
 
 class FileClearResponse(Response):
     id: str
 
 
-class FileQueryRequest(Request):
+class FileQueryRequest(PageRequest):
     tag_filter_query: str
 
 
@@ -48,6 +112,14 @@ class File(CamelModel):
     blocks: List[Block] = []
     tags: List[Tag] = []
     filename: str = None
+    # False when a projection left blocks or tags out; see `File.get`.
+    _blocks_loaded: bool = PrivateAttr(default=True)
+    _tags_loaded: bool = PrivateAttr(default=True)
+
+    class GetRequest(IdentifierRequest):
+        include_blocks: bool = None
+        include_tags: bool = None
+        tag_kinds: List[str] = None
 
     class CreateRequest(Request):
         value: str = None
@@ -61,6 +133,10 @@ class File(CamelModel):
         blocks: Optional[List[Block.CreateRequest]] = []
         tags: Optional[List[Tag.CreateRequest]] = []
         plugin_instance: str = None
+        handle: str = None
+        upload_filepath: str = (
+            None  # Path in the imports bucket of the contents, for UPLOADED files
+        )
 
         class Config:
             use_enum_values = True
@@ -87,11 +163,21 @@ class File(CamelModel):
         def to_dict(self) -> dict:
             return {"data": self.data_, "mime_type": self.mime_type}
 
-    class ListRequest(Request):
+    class ListRequest(PageRequest):
         corpus_id: str = None
+        include_blocks: bool = None
+        include_tags: bool = None
+        tag_kinds: List[str] = None
 
     class ListResponse(Response):
         files: List[File]
+        next_page_token: str = None
+
+    class AppendRequest(Request):
+        id: str
+        blocks: List[Block.CreateRequest] = []
+        tags: List[Tag.CreateRequest] = []
+        block_offset: int = None  # Position in the file of the first of `blocks`
 
     class RawRequest(Request):
         id: str
@@ -126,6 +212,25 @@ class File(CamelModel):
             space=space,
         )
 
+    @property
+    def blocks_loaded(self) -> bool:
+        """Whether `blocks` holds all the blocks of the file, rather than none because a projection left
+        them out."""
+        return self._blocks_loaded
+
+    @property
+    def tags_loaded(self) -> bool:
+        """Whether `tags`, and the tags of `blocks`, hold all the tags of the file rather than those a
+        projection kept."""
+        return self._tags_loaded
+
+    def _apply_projection(
+        self, include_blocks: bool, include_tags: bool, tag_kinds: Optional[List[str]]
+    ) -> File:
+        self._blocks_loaded = include_blocks
+        self._tags_loaded = include_tags and tag_kinds is None
+        return self
+
     @staticmethod
     def get(
         client: Client,
@@ -134,15 +239,34 @@ class File(CamelModel):
         space_id: str = None,
         space_handle: str = None,
         space: Any = None,
+        include_blocks: bool = True,
+        include_tags: bool = True,
+        tag_kinds: List[str] = None,
     ) -> Response[File]:  # TODO (Enias): Why is this a staticmethod?
-        return client.post(
+        """Gets a file by id or handle.
+
+        By default the file comes with all its blocks and tags. Without `include_blocks` or `include_tags`
+        they are left out, and `tag_kinds` keeps only the tags of those kinds, so that listings which need
+        only the file's own fields don't transfer its contents. See `File.blocks_loaded` and
+        `File.tags_loaded`.
+        """
+        response = client.post(
             "file/get",
-            IdentifierRequest(id=_id, handle=handle),
+            File.GetRequest(
+                id=_id,
+                handle=handle,
+                include_blocks=include_blocks,
+                include_tags=include_tags,
+                tag_kinds=tag_kinds,
+            ),
             expect=File,
             space_id=space_id,
             space_handle=space_handle,
             space=space,
         )
+        if isinstance(response.data_, File):
+            response.data_._apply_projection(include_blocks, include_tags, tag_kinds)
+        return response
 
     @staticmethod
     def create(
@@ -152,31 +276,86 @@ class File(CamelModel):
         content: str = None,
         plugin_instance: str = None,
         mime_type: str = None,
-        blocks: List[Block.CreateRequest] = None,
-        tags: List[Tag.CreateRequest] = None,
+        blocks: Iterable[Block.CreateRequest] = None,
+        tags: Iterable[Tag.CreateRequest] = None,
         corpus_id: str = None,
         space_id: str = None,
         space_handle: str = None,
         space: Any = None,
+        handle: str = None,
+        batch_size: int = DEFAULT_BLOCK_BATCH_SIZE,
+        max_batch_bytes: int = DEFAULT_BLOCK_BATCH_BYTES,
+        max_concurrency: int = 4,
+        direct_upload: bool = None,
     ) -> Response[File]:
+        """Creates a file from a local `filename`, `content`, a `url`, a file importer `plugin_instance`,
+        or `blocks` and `tags`.
 
-        if (
-            filename is None
-            and content is None
-            and url is None
-            and plugin_instance is None
-            and blocks is None
-        ):
-            raise Exception("Either filename, content, url, or plugin Instance must be provided.")
+        With `direct_upload`, the contents of `filename` or `content` are uploaded straight to storage with a
+        signed URL, streaming from disk, and the file is then created from the uploaded object; this avoids
+        passing large uploads through the API. By default this happens for contents larger than
+        `DIRECT_UPLOAD_THRESHOLD_BYTES`.
 
+        `blocks` and `tags` may be any iterables, including generators, and are consumed lazily. They are sent
+        in batches of at most `batch_size` elements and roughly `max_batch_bytes` serialized bytes: the file is
+        created with the first batch, and the remaining batches are appended, up to `max_concurrency` at once.
+        When everything fits in a single batch, the engine's response is returned as-is; otherwise the
+        returned file has `blocks_loaded` and `tags_loaded` False, so `refresh` it to read its contents.
+        """
         if blocks is not None:
-            upload_type = FileUploadType.BLOCKS
-        elif plugin_instance is not None:
+            return File._create_from_blocks(
+                client,
+                blocks,
+                tags,
+                filename=filename,
+                url=url,
+                plugin_instance=plugin_instance,
+                mime_type=mime_type,
+                corpus_id=corpus_id,
+                handle=handle,
+                batch_size=batch_size,
+                max_batch_bytes=max_batch_bytes,
+                max_concurrency=max_concurrency,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            )
+
+        if filename is None and content is None and url is None and plugin_instance is None:
+            raise Exception("Either filename, content, url, or plugin Instance must be provided.")
+
+        if plugin_instance is not None:
             upload_type = FileUploadType.FILE_IMPORTER
         elif content is not None:
+            if direct_upload or (
+                direct_upload is None and _byte_size(content) > DIRECT_UPLOAD_THRESHOLD_BYTES
+            ):
+                return File._create_from_upload(
+                    client,
+                    content=content,
+                    filename=filename,
+                    mime_type=mime_type,
+                    corpus_id=corpus_id,
+                    handle=handle,
+                    space_id=space_id,
+                    space_handle=space_handle,
+                    space=space,
+                )
             # We're still going to use the file upload method for file uploads
             upload_type = FileUploadType.FILE
         elif filename is not None:
+            size = os.path.getsize(filename)
+            if direct_upload or (direct_upload is None and size > DIRECT_UPLOAD_THRESHOLD_BYTES):
+                return File._create_from_upload(
+                    client,
+                    filename=filename,
+                    mime_type=mime_type,
+                    corpus_id=corpus_id,
+                    handle=handle,
+                    space_id=space_id,
+                    space_handle=space_handle,
+                    space=space,
+                )
             with open(filename, "rb") as f:
                 content = f.read()
             upload_type = FileUploadType.FILE
@@ -189,9 +368,8 @@ class File(CamelModel):
             url=url,
             mime_type=mime_type,
             plugin_instance=plugin_instance,
-            blocks=blocks,
-            tags=tags,
             filename=filename,
+            handle=handle,
         )
 
         # Defaulting this here, as opposed to in the Engine, because it is processed by Vapor
@@ -199,15 +377,342 @@ class File(CamelModel):
         return client.post(
             "file/create",
             payload=req,
-            file=(file_part_name, content, "multipart/form-data")
-            if upload_type != FileUploadType.BLOCKS
-            else None,
+            file=(file_part_name, content, "multipart/form-data"),
+            expect=File,
+            space_id=space_id,
+            space_handle=space_handle,
+            space=space,
+        )
+
+    @staticmethod
+    def _create_from_upload(
+        client: Client,
+        content: Union[str, bytes] = None,
+        filename: str = None,
+        mime_type: str = None,
+        corpus_id: str = None,
+        handle: str = None,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> Response[File]:
+        """Uploads `content`, or the file at `filename`, to the imports bucket of the space with a signed URL,
+        then creates the file from the uploaded object."""
+        upload_filepath = f"{uuid.uuid4().hex}/{Path(filename).name if filename else 'unnamed'}"
+        signed_url = client.post(
+            "space/createSignedUrl",
+            payload=SignedUrl.Request(
+                bucket=SignedUrl.Bucket.IMPORTS,
+                filepath=upload_filepath,
+                operation=SignedUrl.Operation.WRITE,
+            ),
+            expect=SignedUrl.Response,
+            space_id=space_id,
+            space_handle=space_handle,
+            space=space,
+        ).data.signed_url
+        if content is not None:
+            data = content.encode("utf-8") if isinstance(content, str) else content
+            upload_to_signed_url(signed_url, _bytes=data)
+        else:
+            upload_to_signed_url(signed_url, filepath=Path(filename))
+
+        req = File.CreateRequest(
+            type=FileUploadType.UPLOADED,
+            corpusId=corpus_id,
+            mime_type=mime_type,
+            filename=filename,
+            handle=handle,
+            upload_filepath=upload_filepath,
+        )
+        return client.post(
+            "file/create",
+            payload=req,
             expect=File,
             space_id=space_id,
             space_handle=space_handle,
             space=space,
         )
 
+    @staticmethod
+    def _create_from_blocks(
+        client: Client,
+        blocks: Iterable[Block.CreateRequest],
+        tags: Optional[Iterable[Tag.CreateRequest]],
+        filename: str,
+        url: str,
+        plugin_instance: str,
+        mime_type: str,
+        corpus_id: str,
+        handle: str,
+        batch_size: int,
+        max_batch_bytes: int,
+        max_concurrency: int,
+        space_id: str,
+        space_handle: str,
+        space: Any,
+    ) -> Response[File]:
+        def _batches(elements: Iterable[Request]) -> Iterator[List[Request]]:
+            return batched(
+                elements,
+                max_items=batch_size,
+                max_bytes=max_batch_bytes,
+                size_of=lambda element: len(element.json(by_alias=True, exclude_none=True)),
+            )
+
+        block_batches, tag_batches = _batches(blocks), _batches(tags or [])
+        response, block_offset = File._create_first_batch(
+            client,
+            block_batches,
+            tag_batches,
+            space_id=space_id,
+            space_handle=space_handle,
+            space=space,
+            type=FileUploadType.BLOCKS,
+            corpusId=corpus_id,
+            url=url,
+            mime_type=mime_type,
+            plugin_instance=plugin_instance,
+            filename=filename,
+            handle=handle,
+        )
+        more_blocks, more_tags = _peeked(block_batches), _peeked(tag_batches)
+        if more_blocks is None and more_tags is None:
+            return response
+
+        response.wait()
+        file = response.data
+        File._append_batches(
+            client,
+            file.id,
+            File._append_requests(file.id, block_offset, more_blocks, more_tags),
+            max_concurrency,
+            space_id=space_id,
+            space_handle=space_handle,
+            space=space,
+        )
+        file = file.copy(update={"blocks": [], "tags": []})
+        return Response(
+            expect=File,
+            data_=file._apply_projection(include_blocks=False, include_tags=False, tag_kinds=None),
+            client=client,
+        )
+
+    @staticmethod
+    def _create_first_batch(
+        client: Client,
+        block_batches: Iterator[List[Block.CreateRequest]],
+        tag_batches: Iterator[List[Tag.CreateRequest]],
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+        **fields: Any,
+    ) -> Tuple[Response[File], int]:
+        """Creates a file with the first of `block_batches` and `tag_batches` and the other `fields` of its
+        `File.CreateRequest`. Returns the response and the number of blocks sent."""
+        first_blocks = next(block_batches, [])
+        req = File.CreateRequest(blocks=first_blocks, tags=next(tag_batches, []), **fields)
+        response = client.post(
+            "file/create",
+            payload=req,
+            expect=File,
+            space_id=space_id,
+            space_handle=space_handle,
+            space=space,
+        )
+        return response, len(first_blocks)
+
+    @staticmethod
+    def _append_requests(
+        file_id: str,
+        block_offset: int,
+        block_batches: Optional[Iterator[List[Block.CreateRequest]]],
+        tag_batches: Optional[Iterator[List[Tag.CreateRequest]]],
+    ) -> List[Iterator[File.AppendRequest]]:
+        """Returns the requests appending `block_batches`, the first at `block_offset`, and those appending
+        `tag_batches`, as two phases."""
+
+        def _block_appends(offset: int) -> Iterator[File.AppendRequest]:
+            for batch in block_batches or []:
+                yield File.AppendRequest(id=file_id, blocks=batch, block_offset=offset)
+                offset += len(batch)
+
+        tag_appends = (File.AppendRequest(id=file_id, tags=batch) for batch in tag_batches or [])
+        return [_block_appends(block_offset), tag_appends]
+
+    @staticmethod
+    def _append_batches(
+        client: Client,
+        file_id: str,
+        phases: Iterable[Iterable[File.AppendRequest]],
+        max_concurrency: int,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> None:
+        """Sends the append requests of each of `phases`, up to `max_concurrency` at once, waiting for every
+        request of a phase to complete before the next phase starts."""
+
+        def _append(append_request: File.AppendRequest) -> None:
+            append_response = client.post(
+                "file/append",
+                payload=append_request,
+                expect=File,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            )
+            append_response.wait()
+            _ = append_response.data  # Raises if the append failed
+
+        appended = 0
+        try:
+            # Tags may point at blocks, so the tag batches are only sent once every block batch has landed.
+            for append_requests in phases:
+                for _ in map_concurrently(_append, append_requests, max_concurrency):
+                    appended += 1
+        except Exception as error:
+            raise SteamshipError(
+                message=f"File {file_id} was created, but appending its blocks and tags failed after "
+                f"{appended} more batches.",
+                suggestion="Delete the file and create it again.",
+                error=error,
+            )
+
+    @staticmethod
+    def create_many(
+        client: Client,
+        paths: Union[str, Path, Iterable[Union[str, Path]]],
+        max_concurrency: int = 8,
+        manifest_path: Union[str, Path] = None,
+        mime_type: str = None,
+        skip_existing: bool = True,
+        on_progress: Callable[[UploadProgress], None] = None,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> UploadProgress:
+        """Uploads many files, up to `max_concurrency` at a time. `paths` may be a directory, whose files are
+        uploaded recursively, or any iterable of paths, which is consumed lazily.
+
+        Each file is stored with the SHA-256 of its content as its handle, so every content is uploaded at
+        most once. A file whose content was already uploaded by this run is skipped. With `skip_existing`,
+        the handle is looked up before uploading, and a file whose handle exists is skipped. Without it, that
+        lookup is saved: a file whose upload fails is then skipped if its handle turns out to exist, rather
+        than aborting the run.
+
+        With a `manifest_path`, every completed path is appended to that JSON lines manifest as an
+        `UploadManifestEntry`; rerunning with the same manifest skips the paths it lists, so an interrupted
+        upload resumes where it stopped. `on_progress` receives an `UploadProgress` after every file, and
+        the final one is returned.
+        """
+        lock = threading.Lock()
+        done = _read_upload_manifest(manifest_path)  # Path -> entry
+        owner_of: Dict[str, str] = {}  # Content hash -> the path uploading or holding it
+        for entry in done.values():
+            owner_of.setdefault(entry.sha256, entry.path)
+        manifest = open(manifest_path, "a") if manifest_path is not None else None
+
+        progress = UploadProgress()
+        started = time.perf_counter()
+
+        def _upload(path: Path) -> UploadProgress:
+            sha256 = _file_hash(path)
+            with lock:
+                owner = owner_of.setdefault(sha256, str(path))
+            if owner != str(path):
+                entry = UploadManifestEntry(path=str(path), sha256=sha256, duplicate_of=owner)
+                uploaded_bytes = None
+            else:
+                entry, uploaded_bytes = File._upload_by_hash(
+                    client,
+                    path,
+                    sha256,
+                    mime_type=mime_type,
+                    skip_existing=skip_existing,
+                    space_id=space_id,
+                    space_handle=space_handle,
+                    space=space,
+                )
+            with lock:
+                if manifest is not None:
+                    manifest.write(entry.json(by_alias=True, exclude_none=True) + "\n")
+                    manifest.flush()
+                progress.add(uploaded_bytes, time.perf_counter() - started)
+                return progress.copy()
+
+        pending = (Path(path) for path in _expand_paths(paths) if str(path) not in done)
+        try:
+            for _, file_progress in map_concurrently(_upload, pending, max_concurrency):
+                if on_progress is not None:
+                    on_progress(file_progress)
+        except Exception as error:
+            raise SteamshipError(
+                message=f"Unable to upload files; {progress.files_uploaded} were uploaded.",
+                suggestion="Rerun with the same manifest_path to resume the upload."
+                if manifest_path is not None
+                else "Pass a manifest_path to make the upload resumable.",
+                error=error,
+            )
+        finally:
+            if manifest is not None:
+                manifest.close()
+        _logger.info(
+            f"Uploaded {progress.files_uploaded} files ({progress.megabytes_per_second:.1f} MB/s, "
+            f"{progress.files_per_second:.1f} files/s); skipped {progress.files_skipped}."
+        )
+        return progress
+
+    @staticmethod
+    def _upload_by_hash(
+        client: Client,
+        path: Path,
+        sha256: str,
+        mime_type: str = None,
+        skip_existing: bool = True,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> Tuple[UploadManifestEntry, Optional[int]]:
+        """Uploads `path` with the handle `sha256` unless a file with that handle exists. Returns its manifest
+        entry and the number of bytes uploaded, or None if it was skipped."""
+
+        def _existing() -> Optional[File]:
+            response = File.get(
+                client,
+                handle=sha256,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+                include_blocks=False,
+                include_tags=False,
+            )
+            return response.data_ if response.error is None else None
+
+        existing = _existing() if skip_existing else None
+        if existing is None:
+            response = File.create(
+                client,
+                filename=str(path),
+                mime_type=mime_type,
+                handle=sha256,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            )
+            response.wait()
+            try:
+                file_id = response.data.id
+            except SteamshipError:
+                # The handle may have been taken meanwhile, or already was without skip_existing.
+                existing = _existing()
+                if existing is None:
+                    raise
+            else:
+                entry = UploadManifestEntry(path=str(path), sha256=sha256, file_id=file_id)
+                return entry, path.stat().st_size
+        return UploadManifestEntry(path=str(path), sha256=sha256, file_id=existing.id), None
+
     @staticmethod
     def list(
         client: Client,
@@ -215,8 +720,22 @@ class File(CamelModel):
         space_id: str = None,
         space_handle: str = None,
         space: Any = None,
+        page_size: int = None,
+        page_token: str = None,
+        include_blocks: bool = True,
+        include_tags: bool = True,
+        tag_kinds: List[str] = None,
     ):
-        req = File.ListRequest(corpusId=corpus_id)
+        """Lists the files of the space, or of `corpus_id`. See `File.get` for `include_blocks`,
+        `include_tags` and `tag_kinds`."""
+        req = File.ListRequest(
+            corpusId=corpus_id,
+            page_size=page_size,
+            page_token=page_token,
+            include_blocks=include_blocks,
+            include_tags=include_tags,
+            tag_kinds=tag_kinds,
+        )
         res = client.post(
             "file/list",
             payload=req,
@@ -225,10 +744,61 @@ class File(CamelModel):
             space_handle=space_handle,
             space=space,
         )
+        if isinstance(res.data_, File.ListResponse):
+            for file in res.data_.files:
+                file._apply_projection(include_blocks, include_tags, tag_kinds)
         return res
 
-    def refresh(self):
-        return File.get(self.client, self.id)
+    @staticmethod
+    def iter_list(
+        client: Client,
+        corpus_id: str = None,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        include_blocks: bool = True,
+        include_tags: bool = True,
+        tag_kinds: List[str] = None,
+    ) -> Iterator[File]:
+        """Lazily yields the files of `File.list`, fetching `page_size` of them at a time."""
+
+        def _fetch_page(page_token: Optional[str]):
+            data = File.list(
+                client,
+                corpus_id=corpus_id,
+                page_size=page_size,
+                page_token=page_token,
+                include_blocks=include_blocks,
+                include_tags=include_tags,
+                tag_kinds=tag_kinds,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            ).data
+            return data.files, data.next_page_token
+
+        return paginate(_fetch_page)
+
+    def refresh(
+        self,
+        include_blocks: bool = True,
+        include_tags: bool = True,
+        tag_kinds: List[str] = None,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ):
+        return File.get(
+            self.client,
+            self.id,
+            space_id=space_id,
+            space_handle=space_handle,
+            space=space,
+            include_blocks=include_blocks,
+            include_tags=include_tags,
+            tag_kinds=tag_kinds,
+        )
 
     @staticmethod
     def query(
@@ -237,9 +807,13 @@ class File(CamelModel):
         space_id: str = None,
         space_handle: str = None,
         space: Any = None,
+        page_size: int = None,
+        page_token: str = None,
     ) -> Response[FileQueryResponse]:
 
-        req = FileQueryRequest(tag_filter_query=tag_filter_query)
+        req = FileQueryRequest(
+            tag_filter_query=tag_filter_query, page_size=page_size, page_token=page_token
+        )
         res = client.post(
             "file/query",
             payload=req,
@@ -250,21 +824,153 @@ class File(CamelModel):
         )
         return res
 
-    def raw(self, space_id: str = None, space_handle: str = None, space: Any = None):
+    @staticmethod
+    def iter_query(
+        client: Client,
+        tag_filter_query: str,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Iterator[File]:
+        """Lazily yields the files matching `tag_filter_query`, fetching `page_size` of them at a time."""
+
+        def _fetch_page(page_token: Optional[str]):
+            data = File.query(
+                client,
+                tag_filter_query,
+                page_size=page_size,
+                page_token=page_token,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            ).data
+            return data.files, data.next_page_token
+
+        return paginate(_fetch_page)
+
+    def raw(
+        self,
+        stream: bool = False,
+        byte_range: Tuple[int, Optional[int]] = None,
+        sha256: str = None,
+        chunk_size: int = DEFAULT_DOWNLOAD_CHUNK_SIZE,
+        cache: RawDataCache = None,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ):
+        """Returns the contents of the file as the `data` of the response.
+
+        With `stream`, `data` is an iterator over chunks of up to `chunk_size` bytes, read as they arrive so that
+        the contents are never held in memory; read it to the end, or close it, to release the connection.
+        `byte_range=(start, end)` reads only the bytes from `start` up to, but not including, `end` (to the end
+        of the file if `end` is None) with an HTTP range request. With `sha256`, the bytes read are checked
+        against that hex checksum and a SteamshipError is raised if they don't match; when streaming, once the
+        last chunk has been read.
+
+        Whole contents are cached in `cache`, by default the one set up with `set_default_raw_cache` or the
+        `STEAMSHIP_RAW_CACHE_DIR` environment variable, if any. A cached copy is read instead of the download
+        when the engine confirms, by its ETag, that it is current.
+        """
         req = File.RawRequest(
             id=self.id,
         )
-        # TODO (enias): Investigate why we do not need a expect here
-        return self.client.post(
-            "file/raw",
-            payload=req,
-            space_id=space_id or self.space_id,
+        cache = cache if cache is not None else default_raw_cache()
+        if cache is None and not stream and byte_range is None and sha256 is None:
+            # TODO (enias): Investigate why we do not need a expect here
+            return self.client.post(
+                "file/raw",
+                payload=req,
+                space_id=space_id or self.space_id,
+                space_handle=space_handle,
+                space=space,
+                raw_response=True,
+            )
+
+        key = f"{self.client.config.api_base}file/{self.id}"
+        cached = cache.open(key) if cache is not None and byte_range is None else None
+        headers = _range_header(byte_range) if byte_range is not None else {}
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+        try:
+            response = self.client.post(
+                "file/raw",
+                payload=req,
+                space_id=space_id or self.space_id,
+                space_handle=space_handle,
+                space=space,
+                raw_response=True,
+                stream=True,
+                extra_headers=headers or None,
+            )
+        except Exception:
+            if cached is not None:
+                cached[1].close()
+            raise
+        resp = response.data if response.error is None else None
+        if cached is not None and resp is not None and resp.status_code == 304:
+            resp.close()
+            contents = cached[1]
+            chunks = _checked(
+                _closing(contents, iter(lambda: contents.read(chunk_size), b"")), sha256
+            )
+        else:
+            if cached is not None:
+                cached[1].close()
+            if resp is None:
+                return response
+            chunks = _iter_body(resp, byte_range, sha256, chunk_size)
+            etag = resp.headers.get("ETag")
+            if cache is not None and byte_range is None and etag:
+                chunks = cache.store(key, etag, chunks)
+        return Response(data_=chunks if stream else b"".join(chunks), client=self.client)
+
+    def download(
+        self,
+        path: Union[str, Path],
+        byte_range: Tuple[int, Optional[int]] = None,
+        sha256: str = None,
+        chunk_size: int = DEFAULT_DOWNLOAD_CHUNK_SIZE,
+        cache: RawDataCache = None,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> Path:
+        """Writes the contents of the file, or the `byte_range` of them, to `path` chunk by chunk.
+
+        The contents are streamed to a temporary file next to `path`, which only replaces `path` once the
+        download has completed and, if `sha256` is given, its checksum matched. See `File.raw`.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        chunks = self.raw(
+            stream=True,
+            byte_range=byte_range,
+            sha256=sha256,
+            chunk_size=chunk_size,
+            cache=cache,
+            space_id=space_id,
             space_handle=space_handle,
             space=space,
-            raw_response=True,
-        )
+        ).data
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as f:
+            try:
+                for chunk in chunks:
+                    f.write(chunk)
+            except Exception:
+                os.unlink(f.name)
+                raise
+        os.replace(f.name, path)
+        return path
 
-    def blockify(self, plugin_instance: str = None):
+    def blockify(
+        self,
+        plugin_instance: str = None,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ):
         from steamship.data.operations.blockifier import BlockifyRequest
         from steamship.plugin.outputs.block_and_tag_plugin_output import BlockAndTagPluginOutput
 
@@ -275,6 +981,9 @@ class File(CamelModel):
             payload=req,
             expect=BlockAndTagPluginOutput,
             asynchronous=True,
+            space_id=space_id,
+            space_handle=space_handle,
+            space=space,
         )
 
     def tag(
@@ -308,15 +1017,35 @@ class File(CamelModel):
         space_id: str = None,
         space_handle: str = None,
         space: Any = None,
+        remove_deleted_blocks: bool = False,
+        deduplicator: Deduplicator = None,
+        match_legacy_items: bool = False,
     ) -> EmbeddingIndex:
+        """Embeds the blocks of this file into an embedding index, creating one if none is given.
+
+        Each item records the ids of its file and block and a hash of the block text. When the file is
+        indexed again, only blocks which are new or whose text changed are embedded; the items of changed
+        blocks are replaced once their replacements are inserted. With `remove_deleted_blocks`, the items of
+        blocks which no longer exist are removed too.
+
+        Earlier versions of this method recorded neither the file id nor the text hash, so their items are
+        not found by the file id lookup. Pass `match_legacy_items` once per file to also replace the items
+        of this file's blocks which lack a file id; this scans every item of the index.
+
+        With a `deduplicator`, blocks whose text is a near-duplicate of another block are not embedded;
+        `deduplicator.duplicates` maps their block ids to the id of the canonical block.
+        """
         # TODO: This should really be done all on the app, but for now we'll do it in the client
         # to facilitate demos.
         from steamship import EmbeddingIndex
-        from steamship.data.embeddings import EmbeddedItem
 
         if index_id is None and e_index is not None:
             index_id = e_index.id
 
+        # We have an index available to us now. Perform the query.
+        blocks = self.refresh(space_id=space_id, space_handle=space_handle, space=space).data.blocks
+
+        indexed = {}  # Block id -> items previously embedded from that block
         if index_id is None and e_index is None:
             e_index = EmbeddingIndex.create(
                 client=self.client,
@@ -326,31 +1055,236 @@ class File(CamelModel):
                 space_handle=space_handle,
                 space=space,
             ).data
-        elif e_index is None:
-            e_index = EmbeddingIndex(client=self.client, id=index_id)
+        else:
+            if e_index is None:
+                e_index = EmbeddingIndex(client=self.client, id=index_id)
+            indexed = self._indexed_items(
+                e_index,
+                {block.id for block in blocks} if match_legacy_items else None,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            )
 
-        # We have an index available to us now. Perform the query.
-        blocks = self.refresh().data.blocks
+        items, stale_item_ids = self._items_to_index(blocks, indexed, deduplicator)
+        if remove_deleted_blocks:
+            stale_item_ids.extend(item.id for previous in indexed.values() for item in previous)
 
-        items = []
-        for block in blocks:
-            item = EmbeddedItem(value=block.text, external_id=block.id, external_type="block")
-            items.append(item)
+        if items:
+            insert_task = e_index.insert_many(
+                items,
+                reindex=reindex,
+                deduplicator=deduplicator,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            )
+            insert_task.wait()
+            if insert_task.error is not None or (
+                insert_task.task is not None and insert_task.task.state != TaskState.succeeded
+            ):
+                raise SteamshipError(
+                    message=f"Unable to index file {self.id}. Its previously indexed items were kept.",
+                    error=insert_task.error,
+                )
+        if stale_item_ids:
+            e_index.delete_items(
+                stale_item_ids, space_id=space_id, space_handle=space_handle, space=space
+            ).wait()
+        _logger.debug(
+            f"Indexed file {self.id}: {len(items)} blocks embedded, {len(stale_item_ids)} items removed."
+        )
+        return e_index
 
-        insert_task = e_index.insert_many(
-            items,
-            reindex=reindex,
+    def _indexed_items(
+        self,
+        e_index: EmbeddingIndex,
+        legacy_block_ids: Optional[Set[str]],
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> Dict[str, List[Any]]:
+        """Maps the id of each block of this file to the items previously embedded from it, fetched without
+        their embeddings. With `legacy_block_ids`, items without a file id whose block is one of those are
+        included as well."""
+        items = e_index.iter_items(
+            file_id=self.id,
             space_id=space_id,
             space_handle=space_handle,
             space=space,
+            include_embeddings=False,
         )
+        if legacy_block_ids is not None:
+            legacy_items = (
+                item
+                for item in e_index.iter_items(
+                    space_id=space_id,
+                    space_handle=space_handle,
+                    space=space,
+                    include_embeddings=False,
+                )
+                if item.file_id is None and item.external_id in legacy_block_ids
+            )
+            items = itertools.chain(items, legacy_items)
 
-        insert_task.wait()
-        return e_index
+        indexed = {}
+        for item in items:
+            if item.external_type == "block" and item.external_id is not None:
+                indexed.setdefault(item.external_id, []).append(item)
+        return indexed
+
+    def _items_to_index(
+        self,
+        blocks: List[Block],
+        indexed: Dict[str, List[Any]],
+        deduplicator: Optional[Deduplicator],
+    ) -> Tuple[List[Any], List[str]]:
+        """Returns the items to embed for the new or changed `blocks` and the ids of the items they replace.
+        The entries of `indexed` for `blocks` are removed, leaving those of deleted blocks."""
+        from steamship.data.embeddings import EmbeddedItem
+
+        items, stale_item_ids = [], []
+        for block in blocks:
+            text_hash = _text_hash(block.text)
+            previous = indexed.pop(block.id, [])
+            if len(previous) == 1 and _indexed_text_hash(previous[0]) == text_hash:
+                if deduplicator is not None:
+                    deduplicator.add(block.id, block.text)
+                continue
+            stale_item_ids.extend(item.id for item in previous)
+            items.append(
+                EmbeddedItem(
+                    value=block.text,
+                    file_id=self.id,
+                    block_id=block.id,
+                    external_id=block.id,
+                    external_type="block",
+                    metadata={BLOCK_HASH_METADATA_KEY: text_hash},
+                )
+            )
+        return items, stale_item_ids
+
+
+def _byte_size(content: Union[str, bytes]) -> int:
+    """The number of bytes uploaded for `content`, which is encoded as UTF-8 if it is a str."""
+    return len(content.encode("utf-8")) if isinstance(content, str) else len(content)
+
+
+def _peeked(batches: Iterator[List[Any]]) -> Optional[Iterator[List[Any]]]:
+    """Returns an iterator over the same batches as `batches`, or None if there are none left."""
+    first = next(batches, None)
+    return None if first is None else itertools.chain([first], batches)
+
+
+def _range_header(byte_range: Tuple[int, Optional[int]]) -> Dict[str, str]:
+    start, end = byte_range
+    if start < 0 or (end is not None and end <= start):
+        raise SteamshipError(
+            message=f"Invalid byte range {byte_range}: expected 0 <= start < end, or end None."
+        )
+    return {"Range": f"bytes={start}-{'' if end is None else end - 1}"}
+
+
+def _iter_body(
+    resp: Any,
+    byte_range: Optional[Tuple[int, Optional[int]]],
+    sha256: Optional[str],
+    chunk_size: int,
+) -> Iterator[bytes]:
+    """Yields the body of a streaming `requests` response in chunks, closing it once done.
+
+    A server which ignores the range request answers with the whole body (HTTP 200 instead of 206); the range
+    is then cut out here, stopping the download as soon as it has been read.
+    """
+    start, end = (0, None)
+    if byte_range is not None and resp.status_code != 206:
+        start, end = byte_range
+    chunks = _closing(resp, resp.iter_content(chunk_size=chunk_size))
+    return _checked(_sliced(chunks, start, end), sha256)
+
+
+def _closing(source: Any, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Passes `chunks` through, closing `source` once done."""
+    with source:
+        yield from chunks
+
+
+def _sliced(chunks: Iterator[bytes], start: int, end: Optional[int]) -> Iterator[bytes]:
+    """Yields the bytes of `chunks` from `start` up to `end`, reading no further than `end`."""
+    position = 0
+    for chunk in chunks:
+        chunk_start, position = position, position + len(chunk)
+        if position <= start:
+            continue
+        yield chunk[max(start - chunk_start, 0) : None if end is None else end - chunk_start]
+        if end is not None and position >= end:
+            break
+
+
+def _checked(chunks: Iterator[bytes], sha256: Optional[str]) -> Iterator[bytes]:
+    """Passes `chunks` through, raising a SteamshipError after the last one if they don't match `sha256`."""
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
+    if sha256 is not None and digest.hexdigest() != sha256.lower():
+        raise SteamshipError(
+            message=f"The downloaded file contents are corrupt: their SHA-256 checksum is "
+            f"{digest.hexdigest()}, expected {sha256}.",
+            suggestion="Retry the download.",
+        )
+
+
+def _expand_paths(
+    paths: Union[str, Path, Iterable[Union[str, Path]]]
+) -> Iterable[Union[str, Path]]:
+    """The files of a directory, recursively and in sorted order, or the given path or paths."""
+    if isinstance(paths, (str, Path)) and Path(paths).is_dir():
+        return (path for path in sorted(Path(paths).rglob("*")) if path.is_file())
+    if isinstance(paths, (str, Path)):
+        return [paths]
+    return paths
+
+
+def _read_upload_manifest(
+    manifest_path: Optional[Union[str, Path]]
+) -> Dict[str, UploadManifestEntry]:
+    """Maps every path listed in the manifest written by `File.create_many` to its entry."""
+    done = {}
+    if manifest_path is not None and Path(manifest_path).exists():
+        with open(manifest_path) as f:
+            for line in f:
+                if line.strip():
+                    entry = UploadManifestEntry.parse_raw(line)
+                    done[entry.path] = entry
+    return done
+
+
+def _file_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _text_hash(text: Optional[str]) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def _indexed_text_hash(item: Any) -> Optional[str]:
+    metadata = item.metadata
+    if isinstance(metadata, str):
+        try:
+            metadata = str_to_metadata(metadata)
+        except ValueError:
+            return None
+    return metadata.get(BLOCK_HASH_METADATA_KEY) if isinstance(metadata, dict) else None
 
 
 class FileQueryResponse(Response):
     files: List[File]
+    next_page_token: str = None
 
 
 File.ListResponse.update_forward_refs()
@@ -0,0 +1,20 @@
+from steamship.utils.vectors import top_k
+
+from .embedding_cache import EmbeddingCache
+from .index import LocalEmbeddingIndex, Metric
+from .ivf import IvfIndex, kmeans
+from .quantization import ProductQuantizer, Quantizer, ScalarQuantizer
+from .query_embedder import PluginQueryEmbedder
+
+__all__ = [
+    "EmbeddingCache",
+    "IvfIndex",
+    "kmeans",
+    "LocalEmbeddingIndex",
+    "Metric",
+    "PluginQueryEmbedder",
+    "ProductQuantizer",
+    "Quantizer",
+    "ScalarQuantizer",
+    "top_k",
+]
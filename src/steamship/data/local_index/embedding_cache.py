@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+from steamship.base import Client, Response
+from steamship.data.embeddings import QueryResult, QueryResults
+from steamship.data.local_index.query_embedder import PluginQueryEmbedder
+from steamship.data.search import Hit
+from steamship.utils.cache import CacheStats, LRUCache
+from steamship.utils.vectors import import_numpy, top_k
+
+
+class EmbeddingCache:
+    """Caches the embeddings of texts, keyed by embedder plugin instance and a hash of the text.
+
+    Embeddings are held in an in-memory LRU bounded by `max_entries` and `max_bytes`. With a `directory`,
+    they are also written to disk, one `.npy` file per text, and read back on a memory miss, so the cache
+    survives restarts and can be shared between processes.
+
+    Passed to `Steamship.embed_and_search`, it makes the search run client-side: documents are embedded once,
+    and later searches over the same documents only embed the query.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = None,
+        max_entries: int = 100_000,
+        max_bytes: int = None,
+    ):
+        self._np = import_numpy()
+        self.directory = Path(directory) if directory is not None else None
+        self._memory = LRUCache(
+            max_entries=max_entries, max_bytes=max_bytes, size_of=lambda vector: vector.nbytes
+        )
+
+    def stats(self) -> CacheStats:
+        """The counters of the in-memory cache; misses include embeddings then found on disk."""
+        return self._memory.stats()
+
+    @staticmethod
+    def _key(plugin_instance: str, text: str) -> Tuple[str, str]:
+        return plugin_instance, hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _path(self, key: Tuple[str, str]) -> Path:
+        plugin_instance, digest = key
+        return self.directory / plugin_instance / digest[:2] / f"{digest}.npy"
+
+    def get(self, plugin_instance: str, text: str) -> Optional[Any]:
+        """Returns the cached embedding of `text` by `plugin_instance`, or None."""
+        key = self._key(plugin_instance, text)
+        vector = self._memory.get(key)
+        if vector is None and self.directory is not None:
+            path = self._path(key)
+            if path.exists():
+                vector = self._np.load(path)
+                self._memory.put(key, vector)
+        return vector
+
+    def put(self, plugin_instance: str, text: str, vector: Any) -> None:
+        key = self._key(plugin_instance, text)
+        vector = self._np.asarray(vector, dtype=self._np.float32)
+        self._memory.put(key, vector)
+        if self.directory is not None:
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so that concurrent readers never see a partial file.
+            with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as f:
+                self._np.save(f, vector)
+            Path(f.name).replace(path)
+
+    def embed(
+        self,
+        texts: List[str],
+        plugin_instance: str,
+        embedder: Callable[[List[str]], Any],
+        extra_texts: List[str] = None,
+    ) -> Tuple[Any, Any]:
+        """Returns the embeddings of `texts`, embedding only those not cached yet, and of `extra_texts`,
+        which are always embedded and never cached.
+
+        Every text that needs embedding is sent to `embedder` in a single call.
+        """
+        np = self._np
+        extra_texts = extra_texts or []
+        vectors = [self.get(plugin_instance, text) for text in texts]
+        missing = list(dict.fromkeys(text for text, v in zip(texts, vectors) if v is None))
+        embedded = embedder(missing + extra_texts) if missing or extra_texts else None
+        if missing:
+            fresh = dict(zip(missing, embedded[: len(missing)]))
+            for text, vector in fresh.items():
+                self.put(plugin_instance, text, vector)
+            vectors = [fresh[text] if v is None else v for text, v in zip(texts, vectors)]
+        extra = embedded[len(missing) :] if extra_texts else None
+        matrix = np.stack(vectors) if vectors else None
+        return matrix, extra
+
+    def embed_and_search(
+        self,
+        client: Client,
+        query: str,
+        docs: List[str],
+        plugin_instance: str,
+        k: int = 1,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> Response[QueryResults]:
+        """Ranks `docs` by cosine similarity to `query`, embedding with `plugin_instance` only what is not
+        cached. Returns the same `QueryResults` as the engine's `embed_and_search`."""
+        np = self._np
+        embedder = PluginQueryEmbedder(
+            client, plugin_instance, space_id=space_id, space_handle=space_handle, space=space
+        )
+        doc_vectors, query_vectors = self.embed(
+            docs, plugin_instance, embedder, extra_texts=[query]
+        )
+        if doc_vectors is None:
+            return Response(expect=QueryResults, data_=QueryResults(items=[]), client=client)
+
+        def _normalized(vectors: Any) -> Any:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            return vectors / np.where(norms == 0, 1, norms)
+
+        scores = _normalized(query_vectors) @ _normalized(doc_vectors).T
+        rows, row_scores = top_k(scores, k)
+        items = [
+            QueryResult(
+                value=Hit(
+                    index=row, index_source="local", value=docs[row], score=score, query=query
+                ),
+                score=score,
+                index=row,
+            )
+            for row, score in zip(rows[0].tolist(), row_scores[0].tolist())
+        ]
+        return Response(expect=QueryResults, data_=QueryResults(items=items), client=client)
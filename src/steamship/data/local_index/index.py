@@ -0,0 +1,654 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from steamship.base import Client, Response, SteamshipError
+from steamship.base.configuration import CamelModel
+from steamship.data.embeddings import (
+    EmbeddedItem,
+    EmbeddingIndex,
+    ExportSnapshotResponse,
+    QueryResult,
+    QueryResults,
+)
+from steamship.data.local_index.ivf import IvfIndex
+from steamship.data.local_index.quantization import Quantizer
+from steamship.data.local_index.query_embedder import PluginQueryEmbedder
+from steamship.data.local_index.store import append_rows, load_matrix, save_matrix
+from steamship.data.search import Hit
+from steamship.utils.batching import batched
+from steamship.utils.pagination import paginate
+from steamship.utils.vectors import EmbeddingEncoding, decode_embedding, import_numpy, top_k
+
+QueryEmbedder = Callable[[List[str]], Any]  # Maps texts to a (len(texts), dimensionality) matrix
+
+
+class Metric:
+    """The similarity used to score items against a query. Higher scores are better."""
+
+    DOT = "dot"  # Inner product of the raw vectors
+    COSINE = "cosine"  # Inner product of the L2-normalized vectors
+
+
+# Removed rows are compacted away once they make up this share of the index.
+COMPACTION_THRESHOLD = 0.25
+
+
+class SyncResult(CamelModel):
+    """Summary of a `LocalEmbeddingIndex.sync`."""
+
+    snapshot_id: str = None  # The snapshot the local index is now in sync with
+    added: int = 0  # Items added or replaced
+    removed: int = 0
+
+
+class LocalEmbeddingIndex:
+    """An in-process, exact nearest-neighbour search engine over the items of an `EmbeddingIndex`.
+
+    Vectors are held in one contiguous float32 matrix and queries are scored in batches with a single matrix
+    product followed by an `argpartition` top-k. `search` mirrors `EmbeddingIndex.search`, returning the same
+    `QueryResults` of `Hit`s, so the two can be swapped for one another.
+
+    Queries are embedded with `query_embedder`, which defaults to the embedder plugin instance of the index.
+    Requires NumPy.
+
+    For large indexes, an `IvfIndex` can be given as `ann`: it is built incrementally as vectors are added
+    and, once trained, replaces exhaustive scoring with approximate search over a few clusters.
+
+    To save memory, a `Quantizer` can be given as `quantizer`. Vectors are kept in full precision until
+    `quantizer.train_size` of them have been added; the quantizer is then trained on them and every vector is
+    stored as a compact code instead, with queries scored against the codes. With `rerank` set, the exact
+    vectors are kept as well and the `rerank` best candidates by approximate score are re-scored exactly,
+    which recovers most of the lost recall at the cost of the memory saved.
+
+    Saved indexes can be loaded with `mmap`, so that worker processes on one host share a single copy of the
+    vectors in the page cache, and extended in place with `append`.
+
+    `sync` keeps a local index up to date with its `EmbeddingIndex` by applying only the items added and
+    removed since the snapshot it last synced with. Removed items are excluded from results immediately and
+    their rows are compacted away in bulk.
+    """
+
+    def __init__(
+        self,
+        dimensionality: int = None,
+        metric: str = Metric.COSINE,
+        query_embedder: QueryEmbedder = None,
+        query_batch_size: int = 256,
+        ann: IvfIndex = None,
+        quantizer: Quantizer = None,
+        rerank: int = 0,
+    ):
+        if metric not in (Metric.DOT, Metric.COSINE):
+            raise SteamshipError(message=f"Unsupported metric: {metric}.")
+        self._np = import_numpy()
+        self.metric = metric
+        self.query_embedder = query_embedder
+        self.query_batch_size = query_batch_size
+        self.ann = ann
+        self.quantizer = quantizer
+        self.rerank = rerank
+        self.dimensionality = dimensionality
+        self.items: List[EmbeddedItem] = []  # Item metadata, row-aligned with the vectors
+        self._vectors = None  # Full-precision vectors, unless a trained quantizer replaced them
+        self._codes = None  # Quantized vectors, once the quantizer is trained
+        self._removed = None  # Boolean mask of removed rows, row-aligned with the vectors
+        self._removed_count = 0
+        self._row_of_id: Dict[str, int] = {}
+        self.snapshot_id: Optional[str] = None  # The snapshot of the remote index last synced with
+
+    def __len__(self) -> int:
+        return len(self.items) - self._removed_count
+
+    @property
+    def vectors(self) -> Any:
+        """The (len(self), dimensionality) float32 matrix of stored vectors; normalized for the cosine metric.
+
+        When a trained quantizer has replaced the exact vectors, they are reconstructed from their codes.
+        """
+        if self._vectors is not None:
+            return self._vectors[: len(self.items)]
+        if self._codes is not None:
+            return self.quantizer.decode(self._codes[: len(self.items)])
+        return self._np.empty((0, self.dimensionality or 0), dtype=self._np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        """The memory allocated for the stored vectors and codes, in bytes."""
+        return sum(buffer.nbytes for buffer in (self._vectors, self._codes) if buffer is not None)
+
+    @staticmethod
+    def from_index(
+        index: EmbeddingIndex,
+        metric: str = Metric.COSINE,
+        query_embedder: QueryEmbedder = None,
+        plugin_instance: str = None,
+        embedding_encoding: EmbeddingEncoding = EmbeddingEncoding.FLOAT32,
+        page_size: int = 1000,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> LocalEmbeddingIndex:
+        """Downloads the items of `index`, page by page, and loads them into a new local index.
+
+        Unless a `query_embedder` is given, queries are embedded by `plugin_instance`, which defaults to the
+        embedder of `index`. The local index records the latest snapshot of `index`, so that a later `sync`
+        only fetches what changed since.
+        """
+        if query_embedder is None:
+            query_embedder = PluginQueryEmbedder(
+                index.client,
+                plugin_instance or index.plugin,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            )
+        local = LocalEmbeddingIndex(metric=metric, query_embedder=query_embedder)
+        # Read the snapshot first: items added while listing are then replayed by the next sync.
+        local.snapshot_id = _latest_snapshot_id(index, space_id, space_handle, space)
+        items = index.iter_items(
+            embedding_encoding=embedding_encoding,
+            as_numpy=True,
+            page_size=page_size,
+            space_id=space_id,
+            space_handle=space_handle,
+            space=space,
+        )
+        for batch in batched(items, max_items=page_size):
+            local.add_items(batch)
+        return local
+
+    @staticmethod
+    def from_export(
+        directory: Union[str, Path],
+        metric: str = Metric.COSINE,
+        query_embedder: QueryEmbedder = None,
+    ) -> LocalEmbeddingIndex:
+        """Loads a snapshot downloaded by `EmbeddingIndex.export_snapshot` into a new local index, which
+        records the exported snapshot so that a later `sync` only fetches what changed since.
+
+        The vectors are memory-mapped read-only, as with `load(mmap=True)`, unless the metric is cosine and
+        they are not already normalized: those are normalized into memory instead.
+        """
+        np = import_numpy()
+        directory = Path(directory)
+        export = ExportSnapshotResponse.parse_file(directory / "snapshot.json")
+        with open(directory / "items.jsonl") as f:
+            items = [EmbeddedItem.parse_raw(line) for line in f if line.strip()]
+        local = LocalEmbeddingIndex(
+            dimensionality=export.dimensionality, metric=metric, query_embedder=query_embedder
+        )
+        if items:
+            vectors = np.memmap(
+                directory / "vectors.f32",
+                dtype="<f4",
+                mode="r",
+                shape=(export.count, export.dimensionality),
+            )
+            local._check_shape(vectors, len(items))
+            if metric == Metric.COSINE and not _is_normalized(vectors):
+                local.add_vectors(vectors, items)
+            else:
+                local._vectors = vectors
+                local._removed = np.zeros(len(items), dtype=np.bool_)
+                local._register_items(items, 0)
+        local.snapshot_id = export.snapshot_id
+        return local
+
+    @staticmethod
+    def for_client(
+        client: Client, plugin_instance: str, metric: str = Metric.COSINE
+    ) -> LocalEmbeddingIndex:
+        """Creates an empty local index whose queries are embedded by `plugin_instance`."""
+        return LocalEmbeddingIndex(
+            metric=metric, query_embedder=PluginQueryEmbedder(client, plugin_instance)
+        )
+
+    def _prepare(self, vectors: Any) -> Any:
+        vectors = self._np.asarray(vectors, dtype=self._np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        if self.metric == Metric.COSINE:
+            norms = self._np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / self._np.where(norms == 0, 1, norms)
+        return vectors
+
+    def add_items(self, items: Iterable[EmbeddedItem]) -> None:
+        """Appends `items`, which must carry embeddings, to the index."""
+        items = list(items)
+        if not items:
+            return
+        missing = [item.id or item.value for item in items if item.embedding is None]
+        if missing:
+            raise SteamshipError(
+                message=f"{len(missing)} items have no embedding, e.g. {missing[0]}.",
+                suggestion="Embed the index (EmbeddingIndex.embed) before loading it locally.",
+            )
+        matrix = self._np.stack([decode_embedding(item.embedding, as_numpy=True) for item in items])
+        self.add_vectors(
+            matrix,
+            [item.copy(update={"embedding": None}) for item in items],
+        )
+
+    def add_vectors(self, vectors: Any, items: List[EmbeddedItem]) -> None:
+        """Appends a (len(items), dimensionality) matrix of vectors with the items they describe."""
+        vectors = self._prepare(vectors)
+        self._check_shape(vectors, len(items))
+
+        size = len(self.items)
+        quantized = self.quantizer is not None and self.quantizer.is_trained
+        if not quantized or self.rerank:
+            self._vectors = self._append(self._vectors, vectors, size)
+        if quantized:
+            self._codes = self._append(self._codes, self.quantizer.encode(vectors), size)
+        self._removed = self._append(
+            self._removed, self._np.zeros(len(items), dtype=self._np.bool_), size
+        )
+        self._register_items(items, size)
+        if self.ann is not None:
+            self.ann.add(vectors, size)
+        if not quantized and self.quantizer is not None:
+            if len(self.items) >= self.quantizer.train_size:
+                self._train_quantizer()
+
+    def _check_shape(self, vectors: Any, count: int) -> None:
+        """Checks that `vectors` holds `count` vectors of the index's dimensionality, which is set by the
+        first vectors added."""
+        if vectors.shape[0] != count:
+            raise SteamshipError(message=f"Received {vectors.shape[0]} vectors for {count} items.")
+        if self.dimensionality is None:
+            self.dimensionality = vectors.shape[1]
+        if vectors.shape[1] != self.dimensionality:
+            raise SteamshipError(
+                message=f"Expected vectors of dimensionality {self.dimensionality}; received {vectors.shape[1]}."
+            )
+
+    def _register_items(self, items: List[EmbeddedItem], first_row: int) -> None:
+        """Records `items` as the rows starting at `first_row`; an id seen before now maps to its new row."""
+        self.items.extend(items)
+        for row, item in enumerate(items, start=first_row):
+            if item.id is not None:
+                self._row_of_id[item.id] = row
+
+    def _append(self, buffer: Optional[Any], rows: Any, size: int) -> Any:
+        """Writes `rows` after the first `size` rows of `buffer`, growing it if needed."""
+        required = size + rows.shape[0]
+        if buffer is None or required > buffer.shape[0]:
+            # Grow geometrically so that repeated appends cost amortized O(1) per row.
+            capacity = required if buffer is None else max(required, 2 * buffer.shape[0])
+            grown = self._np.empty((capacity,) + rows.shape[1:], dtype=rows.dtype)
+            if buffer is not None:
+                grown[:size] = buffer[:size]
+            buffer = grown
+        buffer[size:required] = rows
+        return buffer
+
+    def remove_items(self, item_ids: Iterable[str]) -> int:
+        """Removes the items with the given ids, returning how many were found.
+
+        Rows are only marked as removed, which costs O(1) per item; once removed rows make up
+        `COMPACTION_THRESHOLD` of the index, `compact` reclaims them.
+        """
+        removed = 0
+        for item_id in item_ids:
+            row = self._row_of_id.pop(item_id, None)
+            if row is not None:
+                self._removed[row] = True
+                removed += 1
+        self._removed_count += removed
+        if self._removed_count > COMPACTION_THRESHOLD * len(self.items):
+            self.compact()
+        return removed
+
+    def upsert_items(self, items: Iterable[EmbeddedItem]) -> None:
+        """Adds `items`, replacing any stored items with the same ids."""
+        items = list(items)
+        self.remove_items(item.id for item in items if item.id is not None)
+        self.add_items(items)
+
+    def compact(self) -> None:
+        """Drops the rows of removed items, renumbering the remaining rows."""
+        if not self._removed_count:
+            return
+        np = self._np
+        size = len(self.items)
+        keep = np.flatnonzero(~self._removed[:size])
+        mapping = np.full(size, -1, dtype=np.int64)
+        mapping[keep] = np.arange(len(keep))
+        if self._vectors is not None:
+            self._vectors = self._vectors[keep]
+        if self._codes is not None:
+            self._codes = self._codes[keep]
+        self._removed = np.zeros(len(keep), dtype=np.bool_)
+        self._removed_count = 0
+        self.items = [self.items[row] for row in keep.tolist()]
+        self._row_of_id = {
+            item.id: row for row, item in enumerate(self.items) if item.id is not None
+        }
+        if self.ann is not None:
+            self.ann.remap(mapping)
+
+    def sync(
+        self,
+        index: EmbeddingIndex,
+        snapshot_id: str = None,
+        embedding_encoding: EmbeddingEncoding = EmbeddingEncoding.FLOAT32,
+        page_size: int = 1000,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> SyncResult:
+        """Brings the local index up to date with snapshot `snapshot_id` of `index`, by default its latest.
+
+        Only the items added or removed since the snapshot recorded by the previous sync (or `from_index`)
+        are downloaded, so the cost of a sync grows with the number of changes rather than the size of the
+        index. If the local index has no recorded snapshot, every item is downloaded. The engine lists
+        snapshots in creation order; create one with `EmbeddingIndex.create_snapshot` to make recent
+        changes visible to `sync`.
+        """
+        snapshot_id = snapshot_id or _latest_snapshot_id(index, space_id, space_handle, space)
+        result = SyncResult(snapshot_id=snapshot_id)
+        if snapshot_id is None or snapshot_id == self.snapshot_id:
+            return result
+
+        def _fetch_page(page_token: Optional[str]):
+            data = index.list_changes(
+                since_snapshot_id=self.snapshot_id,
+                until_snapshot_id=snapshot_id,
+                embedding_encoding=embedding_encoding,
+                as_numpy=True,
+                page_size=page_size,
+                page_token=page_token,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            ).data
+            return [data], data.next_page_token
+
+        for changes in paginate(_fetch_page):
+            result.removed += self.remove_items(changes.removed_item_ids or [])
+            self.upsert_items(changes.added_items or [])
+            result.added += len(changes.added_items or [])
+        self.snapshot_id = snapshot_id
+        return result
+
+    def _train_quantizer(self) -> None:
+        vectors = self.vectors
+        sample = vectors
+        if len(vectors) > self.quantizer.train_size:
+            rng = self._np.random.default_rng(0)
+            sample = vectors[rng.choice(len(vectors), self.quantizer.train_size, replace=False)]
+        self.quantizer.train(sample)
+        self._codes = self.quantizer.encode(vectors)
+        if not self.rerank:
+            self._vectors = None
+
+    def _score(self, queries: Any, rows: Any = None) -> Any:
+        """Scores `queries` against the given rows of the index, or all of them. Removed rows score -inf."""
+        if self._codes is not None:
+            codes = self._codes[: len(self.items)] if rows is None else self._codes[rows]
+            scores = self.quantizer.score(queries, codes)
+        else:
+            vectors = self.vectors if rows is None else self._vectors[rows]
+            scores = queries @ vectors.T
+        if self._removed_count:
+            removed = self._removed[: len(self.items)] if rows is None else self._removed[rows]
+            scores[:, removed] = -self._np.inf
+        return scores
+
+    def search_vectors(self, queries: Any, k: int = 1) -> Tuple[Any, Any]:
+        """Returns the rows and scores of the `k` best items for each query vector, best first.
+
+        With a trained `ann` or `quantizer`, results are approximate. Rows are padded with -1 when fewer than
+        `k` candidates were found.
+        """
+        queries = self._prepare(queries)
+        reranking = self._codes is not None and self.rerank > 0
+        n_candidates = max(k, self.rerank) if reranking else k
+        if self.ann is not None and self.ann.is_trained:
+            rows, scores = self.ann.search(queries, self._score, n_candidates)
+        else:
+            rows, scores = [], []
+            for start in range(0, queries.shape[0], self.query_batch_size):
+                batch_rows, batch_scores = top_k(
+                    self._score(queries[start : start + self.query_batch_size]), n_candidates
+                )
+                rows.append(batch_rows)
+                scores.append(batch_scores)
+            if not rows:
+                return self._np.empty((0, 0), dtype=self._np.int64), self._np.empty((0, 0))
+            rows, scores = self._np.concatenate(rows), self._np.concatenate(scores)
+        if self._removed_count:
+            rows = self._np.where(scores == -self._np.inf, -1, rows)
+        if reranking:
+            rows, scores = self._rerank(queries, rows, k)
+        return rows, scores
+
+    def _rerank(self, queries: Any, candidates: Any, k: int) -> Tuple[Any, Any]:
+        """Re-scores candidate rows with the exact vectors and keeps the `k` best of each query."""
+        np = self._np
+        rows, scores = [], []
+        for start in range(0, queries.shape[0], self.query_batch_size):
+            batch = candidates[start : start + self.query_batch_size]
+            valid = batch >= 0
+            exact = np.einsum(
+                "qd,qcd->qc",
+                queries[start : start + self.query_batch_size],
+                self._vectors[np.where(valid, batch, 0)],
+            )
+            best, best_scores = top_k(np.where(valid, exact, -np.inf), k)
+            rows.append(np.take_along_axis(batch, best, axis=1))
+            scores.append(best_scores)
+        return np.concatenate(rows), np.concatenate(scores)
+
+    def embed_queries(self, queries: List[str]) -> Any:
+        if self.query_embedder is None:
+            raise SteamshipError(
+                message="This local index has no query embedder, so it can only be searched by vector.",
+                suggestion="Provide a query_embedder, or use search_vectors.",
+            )
+        return self.query_embedder(queries)
+
+    def search(
+        self,
+        query: Union[str, List[str]],
+        k: int = 1,
+        include_metadata: bool = False,
+        query_vectors: Optional[Any] = None,
+    ) -> Response[QueryResults]:
+        """Searches the index like `EmbeddingIndex.search`, without a round trip to the engine.
+
+        Pre-computed `query_vectors` may be given to skip embedding the queries.
+        """
+        queries = query if isinstance(query, list) else [query]
+        if query_vectors is None:
+            query_vectors = self.embed_queries(queries)
+        rows, scores = self.search_vectors(query_vectors, k)
+        return Response(
+            expect=QueryResults,
+            data_=self.to_query_results(queries, rows, scores, include_metadata),
+        )
+
+    def to_query_results(
+        self, queries: List[str], rows: Any, scores: Any, include_metadata: bool = False
+    ) -> QueryResults:
+        """Converts rows and scores from `search_vectors` into `QueryResults`, flattened in query order."""
+        results = []
+        for query, query_rows, query_scores in zip(queries, rows.tolist(), scores.tolist()):
+            for row, score in zip(query_rows, query_scores):
+                if row < 0:
+                    break
+                item = self.items[row]
+                hit = Hit(
+                    id=item.id,
+                    index=row,
+                    index_source="local",
+                    value=item.value,
+                    score=score,
+                    external_id=item.external_id if include_metadata else None,
+                    external_type=item.external_type if include_metadata else None,
+                    metadata=item.metadata if include_metadata else None,
+                    query=query,
+                )
+                results.append(QueryResult(value=hit, score=score, index=row, id=item.id))
+        return QueryResults(items=results)
+
+    def save(self, directory: Union[str, Path]) -> None:
+        """Writes the index to `directory`: the vectors as `vectors.npy` and their codes as `codes.npy`, the
+        items as `items.jsonl`, the settings as `index.json` and, if trained, the ANN structure as `ann.npz`
+        and the quantizer as `quantizer.npz`. Removed items are compacted away first."""
+        self.compact()
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ("vectors.npy", "codes.npy", "ann.npz", "quantizer.npz"):
+            (directory / name).unlink(missing_ok=True)
+        if self._vectors is not None or self._codes is None:
+            save_matrix(directory / "vectors.npy", self.vectors)
+        if self._codes is not None:
+            self._np.save(directory / "codes.npy", self._codes[: len(self.items)])
+        with open(directory / "items.jsonl", "w") as f:
+            for item in self.items:
+                f.write(item.json(by_alias=True, exclude_none=True))
+                f.write("\n")
+        with open(directory / "index.json", "w") as f:
+            json.dump(
+                {
+                    "metric": self.metric,
+                    "dimensionality": self.dimensionality,
+                    "ann": self.ann.params() if self.ann is not None else None,
+                    "quantizer": self.quantizer.params() if self.quantizer is not None else None,
+                    "rerank": self.rerank,
+                    "snapshot_id": self.snapshot_id,
+                },
+                f,
+            )
+        if self.ann is not None and self.ann.is_trained:
+            self.ann.save(directory / "ann.npz")
+        if self.quantizer is not None and self.quantizer.is_trained:
+            self.quantizer.save(directory / "quantizer.npz")
+
+    @staticmethod
+    def load(
+        directory: Union[str, Path], query_embedder: QueryEmbedder = None, mmap: bool = False
+    ) -> LocalEmbeddingIndex:
+        """Reads an index written by `save`.
+
+        With `mmap`, the vectors and codes are mapped read-only instead of read into memory: loading is
+        near-instant, and processes which load the same directory share one copy of them. Adding items to a
+        mapped index copies them into memory; use `append` to add items to the saved index instead.
+        """
+        np = import_numpy()
+        directory = Path(directory)
+        with open(directory / "index.json") as f:
+            settings = json.load(f)
+
+        ann = None
+        if (directory / "ann.npz").exists():
+            ann = IvfIndex.load(directory / "ann.npz")
+        quantizer = None
+        if (directory / "quantizer.npz").exists():
+            quantizer = Quantizer.load(directory / "quantizer.npz", settings["quantizer"])
+        elif settings.get("quantizer") is not None:
+            quantizer = Quantizer.from_params(settings["quantizer"])
+        local = LocalEmbeddingIndex(
+            dimensionality=settings["dimensionality"],
+            metric=settings["metric"],
+            query_embedder=query_embedder,
+            ann=ann,
+            quantizer=quantizer,
+            rerank=settings.get("rerank", 0),
+        )
+        # The vectors were stored prepared (normalized for cosine), so they are loaded as-is.
+        rows = 0
+        if (directory / "vectors.npy").exists():
+            local._vectors = load_matrix(directory / "vectors.npy", mmap=mmap)
+            rows = local._vectors.shape[0]
+        if (directory / "codes.npy").exists():
+            local._codes = load_matrix(directory / "codes.npy", mmap=mmap)
+            rows = local._codes.shape[0]
+        with open(directory / "items.jsonl") as f:
+            # Items beyond the stored rows belong to an append still in progress.
+            items = [EmbeddedItem.parse_raw(line) for line, _ in zip(f, range(rows))]
+        local.items = items
+        local._removed = np.zeros(len(items), dtype=np.bool_)
+        local._row_of_id = {item.id: row for row, item in enumerate(items) if item.id is not None}
+        local.snapshot_id = settings.get("snapshot_id")
+        if ann is None and settings.get("ann") is not None:
+            local.ann = IvfIndex(**settings["ann"])
+            if len(items):
+                local.ann.add(local.vectors, 0)
+        return local
+
+    @staticmethod
+    def append(directory: Union[str, Path], items: Iterable[EmbeddedItem]) -> int:
+        """Appends `items`, which must carry embeddings, to the index saved in `directory` without loading or
+        rewriting it, and returns the number of items it then holds.
+
+        The vectors are written first and published last, so processes loading the index meanwhile see it
+        either with or without the new items. Only one process may append to an index at a time. Indexes
+        saved with a trained ANN structure or quantizer cannot be appended to, as those would not cover the
+        new items.
+        """
+        directory = Path(directory)
+        if (directory / "ann.npz").exists() or (directory / "codes.npy").exists():
+            raise SteamshipError(
+                message=f"The index saved in {directory} has a trained ANN structure or quantizer, so items "
+                "cannot be appended to it.",
+                suggestion="Load the index, add the items and save it again.",
+            )
+        with open(directory / "index.json") as f:
+            settings = json.load(f)
+        staged = LocalEmbeddingIndex(
+            dimensionality=settings["dimensionality"], metric=settings["metric"]
+        )
+        staged.add_items(items)
+
+        vectors_path = directory / "vectors.npy"
+        rows = load_matrix(vectors_path, mmap=True).shape[0]
+        _truncate_lines(directory / "items.jsonl", rows)
+        if not staged.items:
+            return rows
+        with open(directory / "items.jsonl", "a") as f:
+            for item in staged.items:
+                f.write(item.json(by_alias=True, exclude_none=True))
+                f.write("\n")
+        if settings["dimensionality"] is None:
+            save_matrix(vectors_path, staged.vectors)
+            settings["dimensionality"] = staged.dimensionality
+            with open(directory / "index.json", "w") as f:
+                json.dump(settings, f)
+            return len(staged)
+        return append_rows(vectors_path, staged.vectors)
+
+
+def _truncate_lines(path: Path, count: int) -> None:
+    """Drops the lines of the file at `path` after the first `count`, e.g. those of an interrupted append."""
+    with open(path, "r+b") as f:
+        for _ in range(count):
+            if not f.readline():
+                return
+        if f.read(1):
+            f.seek(-1, 1)
+            f.truncate()
+
+
+def _latest_snapshot_id(
+    index: EmbeddingIndex, space_id: str = None, space_handle: str = None, space: Any = None
+) -> Optional[str]:
+    snapshot_id = None
+    for snapshot in index.iter_snapshots(space_id=space_id, space_handle=space_handle, space=space):
+        snapshot_id = snapshot.snapshot_id
+    return snapshot_id
+
+
+def _is_normalized(vectors: Any, chunk_rows: int = 65536, tolerance: float = 1e-3) -> bool:
+    """Whether every row of `vectors` has unit L2 norm, or is zero; read `chunk_rows` rows at a time so that
+    a memory-mapped matrix is not loaded whole."""
+    np = import_numpy()
+    for start in range(0, vectors.shape[0], chunk_rows):
+        norms = np.linalg.norm(vectors[start : start + chunk_rows], axis=1)
+        if not np.all((np.abs(norms - 1) <= tolerance) | (norms == 0)):
+            return False
+    return True
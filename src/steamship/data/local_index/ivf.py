@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+from steamship.base import SteamshipError
+from steamship.utils.vectors import import_numpy, top_k
+
+
+def kmeans(vectors: Any, n_clusters: int, n_iter: int = 20, seed: int = 0) -> Any:
+    """Lloyd's k-means over the rows of `vectors`, returning a (n_clusters, dimensionality) float32 matrix.
+
+    Centroids are initialized from a random sample of rows; a cluster that empties is re-seeded with the
+    row furthest from its centroid.
+    """
+    np = import_numpy()
+    vectors = np.asarray(vectors, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    n_clusters = min(n_clusters, vectors.shape[0])
+    centroids = vectors[rng.choice(vectors.shape[0], size=n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        assignment, distances = _nearest(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        counts = np.bincount(assignment, minlength=n_clusters)
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            furthest = np.argsort(-distances)[: len(empty)]
+            sums[empty], counts[empty] = vectors[furthest], 1
+        centroids = sums / counts[:, None]
+    return centroids.astype(np.float32)
+
+
+def _nearest(vectors: Any, centroids: Any) -> Tuple[Any, Any]:
+    """Returns the index of the nearest centroid (by L2 distance) of each row, and the squared distance."""
+    np = import_numpy()
+    # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2; the ||x||^2 term does not change the argmin.
+    partial = (centroids * centroids).sum(axis=1)[None, :] - 2 * (vectors @ centroids.T)
+    assignment = partial.argmin(axis=1)
+    distances = partial[np.arange(len(vectors)), assignment] + (vectors * vectors).sum(axis=1)
+    return assignment, distances
+
+
+class IvfIndex:
+    """An inverted-file (IVF) approximate nearest-neighbour structure for `LocalEmbeddingIndex`.
+
+    Vectors are partitioned into `n_lists` clusters by k-means. A query is only scored against the rows of
+    the `n_probe` clusters whose centroids are nearest to it, so search cost scales with
+    `n_probe / n_lists` of the index instead of all of it. Raising `n_probe` trades latency for recall;
+    `n_probe == n_lists` is exact. Clusters and probes use L2 distance, which ranks like the cosine metric;
+    with the dot metric over unnormalized vectors, expect lower recall for the same `n_probe`.
+
+    The structure is built incrementally: rows are buffered until `train_size` of them have arrived, at which
+    point the centroids are trained on the buffer and every later row is assigned to its nearest list as it
+    is added. Until then, searches fall back to exact search. The IVF only stores row numbers; the vectors
+    themselves stay in the owning `LocalEmbeddingIndex`.
+    """
+
+    def __init__(
+        self,
+        n_lists: int = 256,
+        n_probe: int = 8,
+        train_size: int = None,
+        n_iter: int = 20,
+        seed: int = 0,
+    ):
+        self._np = import_numpy()
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        # Roughly 40 samples per centroid give stable k-means clusters.
+        self.train_size = train_size or 40 * n_lists
+        self.n_iter = n_iter
+        self.seed = seed
+        self.centroids = None
+        self._lists: List[List[int]] = []
+        self._list_arrays: Optional[List[Any]] = None  # Cached numpy views of `_lists`
+        self._pending: List[Tuple[int, Any]] = []  # (first row, vectors) received before training
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, sample: Any) -> None:
+        """Trains the centroids on `sample`, a matrix of vectors representative of the index."""
+        self.centroids = kmeans(sample, self.n_lists, n_iter=self.n_iter, seed=self.seed)
+        self._lists = [[] for _ in range(len(self.centroids))]
+        self._list_arrays = None
+
+    def add(self, vectors: Any, first_row: int) -> None:
+        """Registers `vectors`, stored in rows `first_row`, `first_row + 1`, ... of the owning index."""
+        if not self.is_trained:
+            self._pending.append((first_row, vectors.copy()))
+            if sum(len(pending) for _, pending in self._pending) < self.train_size:
+                return
+            pending, self._pending = self._pending, []
+            self.train(self._np.concatenate([vectors for _, vectors in pending]))
+            for row, vectors in pending:
+                self._assign(vectors, row)
+            return
+        self._assign(vectors, first_row)
+
+    def _assign(self, vectors: Any, first_row: int) -> None:
+        assignment, _ = _nearest(vectors, self.centroids)
+        for offset, list_id in enumerate(assignment.tolist()):
+            self._lists[list_id].append(first_row + offset)
+        self._list_arrays = None
+
+    def _arrays(self) -> List[Any]:
+        if self._list_arrays is None:
+            self._list_arrays = [
+                self._np.asarray(rows, dtype=self._np.int64) for rows in self._lists
+            ]
+        return self._list_arrays
+
+    def search(
+        self, queries: Any, score: Callable[[Any, Any], Any], k: int, n_probe: int = None
+    ) -> Tuple[Any, Any]:
+        """Returns the rows and scores of the (approximately) `k` best vectors for each query, best first.
+
+        `score(queries, rows)` returns the (len(queries), len(rows)) scores of the given rows of the owning
+        index. Rows of queries with fewer than `k` candidates are padded with -1 and a score of -inf.
+        """
+        np = self._np
+        if len(queries) == 0:
+            return np.empty((0, k), dtype=np.int64), np.empty((0, k), dtype=np.float32)
+        n_probe = min(n_probe or self.n_probe, len(self.centroids))
+        lists = self._arrays()
+        probes = _nearest_lists(queries, self.centroids, n_probe)
+
+        # Visit the probed lists one at a time, scoring each against every query that probes it, so that a
+        # list's vectors are gathered once per call rather than once per query. Each (query, probe) pair
+        # contributes up to k candidates to its own slot; the slots are merged with a final top-k.
+        pair_lists = probes.ravel()
+        pair_queries = np.repeat(np.arange(len(queries)), n_probe)
+        pair_slots = np.tile(np.arange(n_probe), len(queries))
+        order = np.argsort(pair_lists, kind="stable")
+        pair_lists, pair_queries, pair_slots = (
+            pair_lists[order],
+            pair_queries[order],
+            pair_slots[order],
+        )
+        group_starts = np.concatenate([[0], np.flatnonzero(np.diff(pair_lists)) + 1])
+        group_ends = np.concatenate([group_starts[1:], [len(pair_lists)]])
+
+        slot_rows = np.full((len(queries), n_probe * k), -1, dtype=np.int64)
+        slot_scores = np.full((len(queries), n_probe * k), -np.inf, dtype=np.float32)
+        for start, end in zip(group_starts.tolist(), group_ends.tolist()):
+            candidates = lists[pair_lists[start]]
+            if len(candidates) == 0:
+                continue
+            query_ids, slots = pair_queries[start:end], pair_slots[start:end]
+            best, best_scores = top_k(score(queries[query_ids], candidates), k)
+            columns = slots[:, None] * k + np.arange(best.shape[1])[None, :]
+            slot_rows[query_ids[:, None], columns] = candidates[best]
+            slot_scores[query_ids[:, None], columns] = best_scores
+
+        best, scores = top_k(slot_scores, k)
+        rows = np.take_along_axis(slot_rows, best, axis=1)
+        return rows, scores
+
+    def remap(self, mapping: Any) -> None:
+        """Renumbers rows after the owning index was compacted: row `r` becomes `mapping[r]`, and rows
+        mapped to -1 are dropped."""
+        np = self._np
+        remapped = []
+        for rows in self._arrays():
+            rows = mapping[rows]
+            remapped.append(rows[rows >= 0].tolist())
+        self._lists = remapped
+        self._list_arrays = None
+        pending, self._pending = self._pending, []
+        for first_row, vectors in pending:
+            rows = mapping[np.arange(first_row, first_row + len(vectors))]
+            for row, vector in zip(rows.tolist(), vectors):
+                if row >= 0:
+                    self._pending.append((row, vector[None, :]))
+
+    def params(self) -> dict:
+        """The constructor arguments of this structure."""
+        return {
+            "n_lists": self.n_lists,
+            "n_probe": self.n_probe,
+            "train_size": self.train_size,
+            "n_iter": self.n_iter,
+            "seed": self.seed,
+        }
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Writes the structure to `path` as a NumPy `.npz` archive."""
+        np = self._np
+        if not self.is_trained:
+            raise SteamshipError(message="Only a trained IVF index can be saved.")
+        sizes = np.asarray([len(rows) for rows in self._lists], dtype=np.int64)
+        np.savez(
+            path,
+            params=np.asarray(
+                [self.n_lists, self.n_probe, self.train_size, self.n_iter, self.seed]
+            ),
+            centroids=self.centroids,
+            offsets=np.concatenate([[0], np.cumsum(sizes)]),
+            rows=np.concatenate(self._arrays()) if len(sizes) else np.empty(0, dtype=np.int64),
+        )
+
+    @staticmethod
+    def load(path: Union[str, Path]) -> IvfIndex:
+        """Reads a structure written by `save`."""
+        np = import_numpy()
+        with np.load(path) as archive:
+            n_lists, n_probe, train_size, n_iter, seed = archive["params"].tolist()
+            ivf = IvfIndex(
+                n_lists=n_lists, n_probe=n_probe, train_size=train_size, n_iter=n_iter, seed=seed
+            )
+            ivf.centroids = archive["centroids"]
+            offsets, rows = archive["offsets"], archive["rows"]
+            ivf._lists = [
+                rows[offsets[i] : offsets[i + 1]].tolist() for i in range(len(offsets) - 1)
+            ]
+        return ivf
+
+
+def _nearest_lists(queries: Any, centroids: Any, n_probe: int) -> Any:
+    """Returns the indices of the `n_probe` centroids nearest to each query, in no particular order."""
+    np = import_numpy()
+    partial = (centroids * centroids).sum(axis=1)[None, :] - 2 * (queries @ centroids.T)
+    if n_probe < len(centroids):
+        probes = np.argpartition(partial, n_probe - 1, axis=1)[:, :n_probe]
+    else:
+        probes = np.broadcast_to(np.arange(len(centroids)), partial.shape)
+    return probes
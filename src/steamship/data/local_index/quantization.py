@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Union
+
+from steamship.base import SteamshipError
+from steamship.data.local_index.ivf import kmeans
+from steamship.utils.vectors import import_numpy
+
+# Rows are encoded and scored this many at a time, bounding the temporary float32 memory.
+_CHUNK_ROWS = 65536
+
+
+class Quantizer(ABC):
+    """Compresses the vectors of a `LocalEmbeddingIndex` into compact codes.
+
+    A quantizer is trained on a sample of vectors, after which `encode` maps vectors to rows of codes and
+    `score` computes approximate inner products between full-precision queries and encoded vectors
+    (asymmetric distance computation: only the stored side is quantized).
+    """
+
+    kind: str = None
+
+    def __init__(self, train_size: int):
+        self._np = import_numpy()
+        self.train_size = train_size
+
+    @property
+    @abstractmethod
+    def is_trained(self) -> bool:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def train(self, sample: Any) -> None:
+        """Fits the quantizer to `sample`, a matrix of vectors representative of the index."""
+        raise NotImplementedError()
+
+    def encode(self, vectors: Any) -> Any:
+        """Returns the (len(vectors), code_size) uint8 codes of `vectors`."""
+        chunks = [
+            self._encode_chunk(vectors[start : start + _CHUNK_ROWS])
+            for start in range(0, vectors.shape[0], _CHUNK_ROWS)
+        ]
+        if not chunks:
+            return self._encode_chunk(vectors)
+        return chunks[0] if len(chunks) == 1 else self._np.concatenate(chunks)
+
+    @abstractmethod
+    def _encode_chunk(self, vectors: Any) -> Any:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def decode(self, codes: Any) -> Any:
+        """Returns the float32 vectors approximated by `codes`."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _score_chunk(self, queries: Any, codes: Any) -> Any:
+        raise NotImplementedError()
+
+    def score(self, queries: Any, codes: Any) -> Any:
+        """Returns the (len(queries), len(codes)) approximate inner products of `queries` with `codes`."""
+        np = self._np
+        scores = np.empty((queries.shape[0], codes.shape[0]), dtype=np.float32)
+        for start in range(0, codes.shape[0], _CHUNK_ROWS):
+            end = start + _CHUNK_ROWS
+            scores[:, start:end] = self._score_chunk(queries, codes[start:end])
+        return scores
+
+    @abstractmethod
+    def params(self) -> dict:
+        """The constructor arguments of this quantizer, with its `kind`."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _arrays(self) -> dict:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _restore(self, arrays: Any) -> None:
+        raise NotImplementedError()
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Writes the trained quantizer to `path` as a NumPy `.npz` archive."""
+        if not self.is_trained:
+            raise SteamshipError(message="Only a trained quantizer can be saved.")
+        self._np.savez(path, **self._arrays())
+
+    @staticmethod
+    def from_params(params: dict) -> Quantizer:
+        """Creates an untrained quantizer from the output of `params`."""
+        params = dict(params)
+        kind = params.pop("kind")
+        for cls in (ScalarQuantizer, ProductQuantizer):
+            if cls.kind == kind:
+                return cls(**params)
+        raise SteamshipError(message=f"Unknown quantizer kind: {kind}.")
+
+    @staticmethod
+    def load(path: Union[str, Path], params: dict) -> Quantizer:
+        """Reads a quantizer written by `save`, created with `params`."""
+        quantizer = Quantizer.from_params(params)
+        with quantizer._np.load(path) as arrays:
+            quantizer._restore(arrays)
+        return quantizer
+
+
+class ScalarQuantizer(Quantizer):
+    """Quantizes each component of a vector to 8 bits, scaled to the range observed for that dimension.
+
+    Codes take a quarter of the memory of float32 vectors, and scores are usually within a fraction of a
+    percent of the exact ones.
+    """
+
+    kind = "scalar"
+
+    def __init__(self, train_size: int = 10000):
+        super().__init__(train_size)
+        self.offset = None
+        self.scale = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self.offset is not None
+
+    def train(self, sample: Any) -> None:
+        np = self._np
+        sample = np.asarray(sample, dtype=np.float32)
+        low, high = sample.min(axis=0), sample.max(axis=0)
+        self.offset = low
+        self.scale = np.where(high > low, (high - low) / 255, 1).astype(np.float32)
+
+    def _encode_chunk(self, vectors: Any) -> Any:
+        np = self._np
+        codes = np.rint((vectors - self.offset) / self.scale)
+        return np.clip(codes, 0, 255).astype(np.uint8)
+
+    def decode(self, codes: Any) -> Any:
+        return codes.astype(self._np.float32) * self.scale + self.offset
+
+    def _score_chunk(self, queries: Any, codes: Any) -> Any:
+        # q . (offset + scale * c) = q . offset + (q * scale) . c
+        offsets = queries @ self.offset
+        return (queries * self.scale) @ codes.T.astype(self._np.float32) + offsets[:, None]
+
+    def params(self) -> dict:
+        return {"kind": self.kind, "train_size": self.train_size}
+
+    def _arrays(self) -> dict:
+        return {"offset": self.offset, "scale": self.scale}
+
+    def _restore(self, arrays: Any) -> None:
+        self.offset, self.scale = arrays["offset"], arrays["scale"]
+
+
+class ProductQuantizer(Quantizer):
+    """Splits vectors into `n_subvectors` parts and replaces each part by the nearest of `n_centroids`
+    k-means centroids trained for that part.
+
+    With the default 256 centroids each part takes one byte, so a 768-dimensional float32 vector of 3 KiB
+    is stored in `n_subvectors` bytes. Queries are scored by summing per-part lookup tables of query-centroid
+    inner products. The dimensionality must be divisible by `n_subvectors`.
+    """
+
+    kind = "product"
+
+    def __init__(
+        self,
+        n_subvectors: int = 8,
+        n_centroids: int = 256,
+        train_size: int = None,
+        n_iter: int = 20,
+        seed: int = 0,
+    ):
+        if not 1 < n_centroids <= 256:
+            raise SteamshipError(
+                message=f"n_centroids must be between 2 and 256. Received {n_centroids}."
+            )
+        super().__init__(train_size or 40 * n_centroids)
+        self.n_subvectors = n_subvectors
+        self.n_centroids = n_centroids
+        self.n_iter = n_iter
+        self.seed = seed
+        self.codebooks = None  # (n_subvectors, n_centroids, dimensionality / n_subvectors)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.codebooks is not None
+
+    def _split(self, vectors: Any) -> Any:
+        dimensionality = vectors.shape[1]
+        if dimensionality % self.n_subvectors:
+            raise SteamshipError(
+                message=f"The dimensionality ({dimensionality}) must be divisible by n_subvectors "
+                f"({self.n_subvectors})."
+            )
+        return vectors.reshape(vectors.shape[0], self.n_subvectors, -1)
+
+    def train(self, sample: Any) -> None:
+        np = self._np
+        parts = self._split(np.asarray(sample, dtype=np.float32))
+        self.codebooks = np.stack(
+            [
+                kmeans(parts[:, m], self.n_centroids, n_iter=self.n_iter, seed=self.seed + m)
+                for m in range(self.n_subvectors)
+            ]
+        )
+
+    def _encode_chunk(self, vectors: Any) -> Any:
+        np = self._np
+        parts = self._split(vectors)
+        codes = np.empty((vectors.shape[0], self.n_subvectors), dtype=np.uint8)
+        for m, codebook in enumerate(self.codebooks):
+            distances = (codebook * codebook).sum(axis=1)[None, :] - 2 * (parts[:, m] @ codebook.T)
+            codes[:, m] = distances.argmin(axis=1)
+        return codes
+
+    def decode(self, codes: Any) -> Any:
+        parts = [self.codebooks[m][codes[:, m]] for m in range(self.n_subvectors)]
+        return self._np.concatenate(parts, axis=1)
+
+    def _score_chunk(self, queries: Any, codes: Any) -> Any:
+        np = self._np
+        parts = self._split(queries)
+        scores = np.zeros((queries.shape[0], codes.shape[0]), dtype=np.float32)
+        for m, codebook in enumerate(self.codebooks):
+            table = parts[:, m] @ codebook.T  # (queries, n_centroids)
+            scores += table[:, codes[:, m]]
+        return scores
+
+    def params(self) -> dict:
+        return {
+            "kind": self.kind,
+            "n_subvectors": self.n_subvectors,
+            "n_centroids": self.n_centroids,
+            "train_size": self.train_size,
+            "n_iter": self.n_iter,
+            "seed": self.seed,
+        }
+
+    def _arrays(self) -> dict:
+        return {"codebooks": self.codebooks}
+
+    def _restore(self, arrays: Any) -> None:
+        self.codebooks = arrays["codebooks"]
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from typing import Any, List
+
+from steamship.base import Client, SteamshipError
+from steamship.data.block import Block
+from steamship.data.file import File
+from steamship.data.operations.tagger import TagRequest, TagResponse
+from steamship.data.tags import TagKind, TextTag
+from steamship.utils.vectors import import_numpy
+
+
+class PluginQueryEmbedder:
+    """Embeds texts with an embedder plugin instance, returning a float32 matrix with one row per text.
+
+    All texts are sent in a single inline tag request, one block per text.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        plugin_instance: str,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ):
+        self.client = client
+        self.plugin_instance = plugin_instance
+        self.space_id = space_id
+        self.space_handle = space_handle
+        self.space = space
+
+    def __call__(self, texts: List[str]) -> Any:
+        np = import_numpy()
+        req = TagRequest(
+            type="inline",
+            file=File.CreateRequest(blocks=[Block.CreateRequest(text=text) for text in texts]),
+            plugin_instance=self.plugin_instance,
+        )
+        response = self.client.post(
+            "plugin/instance/tag",
+            req,
+            expect=TagResponse,
+            space_id=self.space_id,
+            space_handle=self.space_handle,
+            space=self.space,
+        )
+        response.wait()
+        blocks = response.data.file.blocks
+
+        vectors = []
+        for block in blocks:
+            embedding = next(
+                (
+                    tag.value[TextTag.Embedding]
+                    for tag in block.tags or []
+                    if tag.kind == TagKind.text and tag.name == TextTag.Embedding
+                ),
+                None,
+            )
+            if embedding is None:
+                raise SteamshipError(
+                    message=f"Plugin instance {self.plugin_instance} did not return an embedding for "
+                    f'"{block.text}".',
+                    suggestion="Make sure the plugin instance is an embedder.",
+                )
+            vectors.append(embedding)
+        if len(vectors) != len(texts):
+            raise SteamshipError(
+                message=f"Expected {len(texts)} embeddings from plugin instance {self.plugin_instance}; "
+                f"received {len(vectors)}."
+            )
+        return np.asarray(vectors, dtype=np.float32)
@@ -0,0 +1,95 @@
+"""Reading and appending to the `.npy` matrices of a saved `LocalEmbeddingIndex`.
+
+Matrices are written in the standard NumPy format, so `numpy.load` reads them, but with room reserved in
+the header. Rows can then be appended in place: the new rows are written after the existing ones and the
+shape in the header is updated last, so a process that maps the file while rows are appended sees either
+the old or the new shape, never a partial row.
+"""
+
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any, Union
+
+from steamship.base import SteamshipError
+from steamship.utils.vectors import import_numpy
+
+# The size of the header of written matrices, including the 10 bytes of magic and header length. Any shape
+# of a 2-d matrix fits, so appending never has to move the data.
+HEADER_SIZE = 128
+
+
+def _header(shape: tuple, dtype: Any, size: int) -> bytes:
+    """Returns a version 1.0 `.npy` header of exactly `size` bytes, or None if it does not fit."""
+    np = import_numpy()
+    fields = "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (
+        np.lib.format.dtype_to_descr(np.dtype(dtype)),
+        tuple(shape),
+    )
+    padding = size - 10 - len(fields) - 1
+    if padding < 0:
+        return None
+    return (
+        np.lib.format.magic(1, 0)
+        + struct.pack("<H", size - 10)
+        + fields.encode("latin1")
+        + b" " * padding
+        + b"\n"
+    )
+
+
+def save_matrix(path: Union[str, Path], matrix: Any) -> None:
+    """Writes `matrix` to `path` as a `.npy` file which `append_rows` can extend in place.
+
+    The file is written next to `path` and then renamed over it, so processes which mapped the previous
+    file keep a consistent view.
+    """
+    np = import_numpy()
+    path = Path(path)
+    matrix = np.ascontiguousarray(matrix)
+    with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as f:
+        f.write(_header(matrix.shape, matrix.dtype, HEADER_SIZE))
+        f.write(matrix.tobytes())
+    os.replace(f.name, path)
+
+
+def load_matrix(path: Union[str, Path], mmap: bool = False) -> Any:
+    """Reads a `.npy` matrix; with `mmap`, maps it read-only so that processes share one copy in memory."""
+    return import_numpy().load(path, mmap_mode="r" if mmap else None)
+
+
+def append_rows(path: Union[str, Path], rows: Any) -> int:
+    """Appends `rows` to the `.npy` matrix at `path` without rewriting it, returning the new row count.
+
+    Files written by `numpy.save` may lack room for the new shape in their header; they are rewritten once
+    with `save_matrix`. Only one process may append to a file at a time.
+    """
+    np = import_numpy()
+    with open(path, "r+b") as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        rows = np.ascontiguousarray(rows, dtype=dtype)
+        if fortran_order or len(shape) != rows.ndim or shape[1:] != rows.shape[1:]:
+            raise SteamshipError(
+                message=f"Cannot append rows of shape {rows.shape[1:]} to the matrix of shape {shape} "
+                f"at {path}."
+            )
+        offset = f.tell()
+        new_shape = (shape[0] + rows.shape[0],) + tuple(shape[1:])
+        header = _header(new_shape, dtype, offset) if version == (1, 0) else None
+        if header is not None:
+            f.seek(offset + shape[0] * dtype.itemsize * int(np.prod(shape[1:])))
+            f.write(rows.tobytes())
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+            # Publish the new rows only once they are written.
+            f.seek(0)
+            f.write(header)
+            return new_shape[0]
+    save_matrix(path, np.concatenate([load_matrix(path), rows]))
+    return new_shape[0]
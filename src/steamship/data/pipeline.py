@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, TextIO, Tuple, Union
+
+from steamship.base import Client, Response, SteamshipError
+from steamship.base.configuration import CamelModel
+from steamship.data.embeddings import EmbeddingIndex
+from steamship.data.file import File
+
+
+class PipelineStage:
+    """A step of a `FilePipeline`: `fn` maps the file produced by the previous stage, or for the first
+    stage an input such as a path, to a file. At most `max_concurrency` calls of a stage run at once."""
+
+    def __init__(self, name: str, fn: Callable[[Any], File], max_concurrency: int = 4):
+        if max_concurrency < 1:
+            raise SteamshipError(
+                message=f"max_concurrency must be positive. Received {max_concurrency}."
+            )
+        self.name = name
+        self.fn = fn
+        self.max_concurrency = max_concurrency
+
+
+class StageProgress(CamelModel):
+    """Progress of one stage of a `FilePipeline`."""
+
+    name: str
+    completed: int = 0
+    skipped: int = 0  # Completed by an earlier run, according to the checkpoint
+    queued: int = 0  # Waiting for a worker of this stage
+    in_flight: int = 0
+    busy_seconds: float = 0.0  # Summed duration of the stage's calls
+    elapsed_seconds: float = 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.completed / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+class PipelineProgress(CamelModel):
+    """Progress report of `FilePipeline.run`."""
+
+    stages: List[StageProgress]
+    elapsed_seconds: float = 0.0
+
+    @property
+    def files_completed(self) -> int:
+        """Files which went through every stage, in this run or an earlier one."""
+        return self.stages[-1].completed + self.stages[-1].skipped
+
+
+class PipelineCheckpointEntry(CamelModel):
+    """A line of the checkpoint written by `FilePipeline.run`: an input which completed a stage."""
+
+    key: str
+    stage: str
+    file_id: str
+
+
+class FilePipeline:
+    """Runs every file through a sequence of stages, each a pool of at most `max_concurrency` workers.
+
+    Files flow through the stages independently: as soon as a file leaves a stage it queues for the next,
+    so one file can be indexed while the next is still being blockified. At most `max_queued` files are
+    taken from the input beyond those the workers can hold, which keeps memory bounded on large inputs.
+
+    With a `checkpoint_path`, every completed stage is appended to that JSON lines checkpoint as a
+    `PipelineCheckpointEntry`; rerunning with the same checkpoint resumes each input after the last stage it
+    completed. Inputs are identified by `key_of`, their string form by default.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        stages: List[PipelineStage],
+        checkpoint_path: Union[str, Path] = None,
+        on_progress: Callable[[PipelineProgress], None] = None,
+        key_of: Callable[[Any], str] = str,
+        max_queued: int = None,
+    ):
+        if not stages:
+            raise SteamshipError(message="A pipeline needs at least one stage.")
+        if len({stage.name for stage in stages}) != len(stages):
+            raise SteamshipError(message="The stages of a pipeline need distinct names.")
+        self.client = client
+        self.stages = stages
+        self.checkpoint_path = checkpoint_path
+        self.on_progress = on_progress
+        self.key_of = key_of
+        self.max_queued = (
+            max_queued if max_queued is not None else sum(s.max_concurrency for s in stages)
+        )
+
+    @staticmethod
+    def ingest(
+        client: Client,
+        blockify_plugin_instance: str = None,
+        tag_plugin_instances: List[str] = None,
+        e_index: EmbeddingIndex = None,
+        mime_type: str = None,
+        max_concurrency: int = 4,
+        task_timeout_s: float = 600,
+        checkpoint_path: Union[str, Path] = None,
+        on_progress: Callable[[PipelineProgress], None] = None,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> FilePipeline:
+        """A pipeline which uploads files from paths, then blockifies them with
+        `blockify_plugin_instance`, tags them with each of `tag_plugin_instances` and indexes them into
+        `e_index`, skipping the steps which are not configured. Each tagger is a stage of its own, named
+        `tag:<plugin instance>`. Every stage runs up to `max_concurrency` files at once and waits up to
+        `task_timeout_s` for each of its tasks."""
+
+        def _result(response: Response) -> Any:
+            response.wait(max_timeout_s=task_timeout_s)
+            return response.data
+
+        def _upload(path: Union[str, Path]) -> File:
+            return _result(
+                File.create(
+                    client,
+                    filename=str(path),
+                    mime_type=mime_type,
+                    space_id=space_id,
+                    space_handle=space_handle,
+                    space=space,
+                )
+            )
+
+        def _blockify(file: File) -> File:
+            _result(
+                file.blockify(
+                    plugin_instance=blockify_plugin_instance,
+                    space_id=space_id,
+                    space_handle=space_handle,
+                    space=space,
+                )
+            )
+            return file
+
+        def _tagger(plugin_instance: str) -> Callable[[File], File]:
+            def _tag(file: File) -> File:
+                _result(
+                    file.tag(
+                        plugin_instance=plugin_instance,
+                        space_id=space_id,
+                        space_handle=space_handle,
+                        space=space,
+                    )
+                )
+                return file
+
+            return _tag
+
+        def _index(file: File) -> File:
+            file.index(e_index=e_index, space_id=space_id, space_handle=space_handle, space=space)
+            return file
+
+        stages = [PipelineStage("upload", _upload, max_concurrency)]
+        if blockify_plugin_instance is not None:
+            stages.append(PipelineStage("blockify", _blockify, max_concurrency))
+        for plugin_instance in tag_plugin_instances or []:
+            # One stage per tagger, so that a resumed file only replays the taggers it had not completed.
+            stages.append(
+                PipelineStage(f"tag:{plugin_instance}", _tagger(plugin_instance), max_concurrency)
+            )
+        if e_index is not None:
+            stages.append(PipelineStage("index", _index, max_concurrency))
+        return FilePipeline(
+            client, stages, checkpoint_path=checkpoint_path, on_progress=on_progress
+        )
+
+    def _read_checkpoint(self) -> Dict[str, Tuple[int, str]]:
+        """Maps the key of every input in the checkpoint to the position of the last stage it completed
+        and the id of its file."""
+        positions = {stage.name: position for position, stage in enumerate(self.stages)}
+        done: Dict[str, Tuple[int, str]] = {}
+        if self.checkpoint_path is None or not Path(self.checkpoint_path).exists():
+            return done
+        with open(self.checkpoint_path) as f:
+            for line in f:
+                if line.strip():
+                    entry = PipelineCheckpointEntry.parse_raw(line)
+                    position = positions.get(entry.stage)
+                    if position is not None and position > done.get(entry.key, (-1, None))[0]:
+                        done[entry.key] = (position, entry.file_id)
+        return done
+
+    def run(self, inputs: Iterable[Any]) -> PipelineProgress:
+        """Runs every element of `inputs`, which is consumed lazily, through the stages.
+
+        `on_progress` receives a `PipelineProgress` whenever a stage completes a file, and the final one is
+        returned. If a stage fails, no further work is started, the calls in flight are allowed to finish,
+        and a SteamshipError is raised.
+        """
+        checkpoint = open(self.checkpoint_path, "a") if self.checkpoint_path is not None else None
+        executors = [ThreadPoolExecutor(max_workers=s.max_concurrency) for s in self.stages]
+        state = _PipelineRun(self, inputs, checkpoint)
+        try:
+            while True:
+                state.draw_inputs()
+                if state.failure is None:
+                    state.submit(executors)
+                if not state.in_flight:
+                    break
+                finished, _ = wait(state.in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    state.finish(future)
+        finally:
+            for executor in executors:
+                executor.shutdown(wait=True)
+            if checkpoint is not None:
+                checkpoint.close()
+
+        state.update()
+        if state.failure is not None:
+            stage, key, error = state.failure
+            raise SteamshipError(
+                message=f"The {stage} stage failed for {key}; "
+                f"{state.progress.files_completed} files completed the pipeline.",
+                suggestion="Rerun with the same checkpoint_path to resume the pipeline."
+                if self.checkpoint_path is not None
+                else "Pass a checkpoint_path to make the pipeline resumable.",
+                error=error,
+            )
+        return state.progress
+
+
+def _timed(fn: Callable[[Any], File], value: Any) -> Tuple[File, float]:
+    call_started = time.perf_counter()
+    return fn(value), time.perf_counter() - call_started
+
+
+class _PipelineRun:
+    """The state of one `FilePipeline.run`: the inputs queued for each stage and the calls in flight."""
+
+    def __init__(self, pipeline: FilePipeline, inputs: Iterable[Any], checkpoint: Optional[TextIO]):
+        self.pipeline = pipeline
+        self.stages = pipeline.stages
+        self.done = pipeline._read_checkpoint()
+        self.progress = PipelineProgress(
+            stages=[StageProgress(name=stage.name) for stage in self.stages]
+        )
+        self.queues: List[Deque[Tuple[str, Any]]] = [deque() for _ in self.stages]
+        self.in_flight: Dict[Future, Tuple[int, str]] = {}
+        self.checkpoint = checkpoint
+        self.source = iter(inputs)
+        self.exhausted = False
+        self.failure: Optional[Tuple[str, str, BaseException]] = None
+        self.capacity = pipeline.max_queued + sum(stage.max_concurrency for stage in self.stages)
+        self.started = time.perf_counter()
+
+    def _running(self, position: int) -> int:
+        return sum(1 for p, _ in self.in_flight.values() if p == position)
+
+    def draw_inputs(self) -> None:
+        """Takes inputs from the source until it is exhausted or the pipeline holds `capacity` of them,
+        queueing each for the stage after the last one it completed according to the checkpoint."""
+        while self.failure is None and not self.exhausted:
+            if sum(len(queue) for queue in self.queues) + len(self.in_flight) >= self.capacity:
+                return
+            try:
+                value = next(self.source)
+            except StopIteration:
+                self.exhausted = True
+                return
+            key = self.pipeline.key_of(value)
+            position, file_id = self.done.get(key, (-1, None))
+            for stage in self.progress.stages[: position + 1]:
+                stage.skipped += 1
+            if position + 1 < len(self.stages):
+                resumed = File(client=self.pipeline.client, id=file_id) if position >= 0 else value
+                self.queues[position + 1].append((key, resumed))
+
+    def submit(self, executors: List[ThreadPoolExecutor]) -> None:
+        """Starts queued work on every stage with a free worker."""
+        for position, stage in enumerate(self.stages):
+            running = self._running(position)
+            while self.queues[position] and running < stage.max_concurrency:
+                key, value = self.queues[position].popleft()
+                future = executors[position].submit(_timed, stage.fn, value)
+                self.in_flight[future] = (position, key)
+                running += 1
+
+    def finish(self, future: Future) -> None:
+        """Records a finished call, queueing its file for the next stage unless the pipeline failed."""
+        position, key = self.in_flight.pop(future)
+        if future.exception() is not None:
+            self.failure = self.failure or (self.stages[position].name, key, future.exception())
+            return
+        file, seconds = future.result()
+        self.progress.stages[position].completed += 1
+        self.progress.stages[position].busy_seconds += seconds
+        self.write_checkpoint(key, position, file)
+        if position + 1 < len(self.stages) and self.failure is None:
+            self.queues[position + 1].append((key, file))
+        if self.pipeline.on_progress is not None:
+            self.update()
+            self.pipeline.on_progress(self.progress.copy(deep=True))
+
+    def write_checkpoint(self, key: str, position: int, file: File) -> None:
+        if self.checkpoint is None:
+            return
+        entry = PipelineCheckpointEntry(key=key, stage=self.stages[position].name, file_id=file.id)
+        self.checkpoint.write(entry.json(by_alias=True) + "\n")
+        self.checkpoint.flush()
+
+    def update(self) -> None:
+        """Brings the queue, in-flight and timing figures of the progress report up to date."""
+        self.progress.elapsed_seconds = time.perf_counter() - self.started
+        for position, stage in enumerate(self.progress.stages):
+            stage.queued = len(self.queues[position])
+            stage.in_flight = self._running(position)
+            stage.elapsed_seconds = self.progress.elapsed_seconds
@@ -9,14 +9,15 @@ from __future__ import annotations
 
 import json
 from enum import Enum
-from typing import Any, Dict, List, Optional, Type, Union
+from typing import Any, Dict, Iterator, List, Optional, Type, Union
 
 from pydantic import BaseModel
 
 from steamship.base.client import Client
 from steamship.base.configuration import CamelModel
-from steamship.base.request import Request
+from steamship.base.request import PageRequest, Request
 from steamship.base.response import Response
+from steamship.utils.pagination import DEFAULT_PAGE_SIZE, paginate
 
 
 class HostingType(str, Enum):
@@ -100,7 +101,7 @@ class DeletePluginRequest(Request):
     id: str
 
 
-class ListPublicPluginsRequest(Request):
+class ListPublicPluginsRequest(PageRequest):
     type: Optional[str] = None
 
 
@@ -110,6 +111,7 @@ class ListPrivatePluginsRequest(Request):
 
 class ListPluginsResponse(Response):
     plugins: List[Plugin]
+    next_page_token: str = None
 
 
 class GetPluginRequest(Request):
@@ -198,16 +200,44 @@ class Plugin(CamelModel):
 
     @staticmethod
     def list(
-        client: Client, t: str = None, space_id: str = None, space_handle: str = None
+        client: Client,
+        t: str = None,
+        space_id: str = None,
+        space_handle: str = None,
+        page_size: int = None,
+        page_token: str = None,
     ) -> Response[ListPluginsResponse]:
         return client.post(
             "plugin/list",
-            ListPublicPluginsRequest(type=t),
+            ListPublicPluginsRequest(type=t, page_size=page_size, page_token=page_token),
             expect=ListPluginsResponse,
             space_id=space_id,
             space_handle=space_handle,
         )
 
+    @staticmethod
+    def iter_list(
+        client: Client,
+        t: str = None,
+        space_id: str = None,
+        space_handle: str = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Iterator[Plugin]:
+        """Lazily yields the plugins of `Plugin.list`, fetching `page_size` of them at a time."""
+
+        def _fetch_page(page_token: Optional[str]):
+            data = Plugin.list(
+                client,
+                t=t,
+                page_size=page_size,
+                page_token=page_token,
+                space_id=space_id,
+                space_handle=space_handle,
+            ).data
+            return data.plugins, data.next_page_token
+
+        return paginate(_fetch_page)
+
     @staticmethod
     def get(client: Client, handle: str):
         return client.post("plugin/get", GetPluginRequest(handle=handle), expect=Plugin)
@@ -1,12 +1,42 @@
 from __future__ import annotations
 
+import dataclasses
 import json
 from json import JSONDecodeError
-from typing import Any
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from pydantic import BaseModel, Field, PrivateAttr
 
 from steamship.base.configuration import CamelModel
 
 
+def _decode_metadata(metadata: Any) -> Any:
+    """Decodes a JSON metadata string, leaving other values and strings which are not JSON as they are."""
+    if not isinstance(metadata, str):
+        return metadata
+    try:
+        return json.loads(metadata)
+    except JSONDecodeError:
+        return metadata
+
+
+def metadata_parser(schema: Type) -> Callable[[Any], Any]:
+    """Returns a function converting decoded metadata into an instance of `schema`, a pydantic model or a
+    dataclass. Values which are not dicts, such as None, are returned as they are."""
+    if isinstance(schema, type) and issubclass(schema, BaseModel):
+        parse = schema.parse_obj
+    elif dataclasses.is_dataclass(schema):
+
+        def parse(value: dict) -> Any:
+            return schema(**value)
+
+    else:
+        raise TypeError(
+            f"Metadata schemas must be pydantic models or dataclasses. Received {schema}."
+        )
+    return lambda value: parse(value) if isinstance(value, dict) else value
+
+
 class Hit(CamelModel):
     id: str = None
     index: int = None
@@ -15,14 +45,76 @@ class Hit(CamelModel):
     score: float = None
     external_id: str = None
     external_type: str = None
-    metadata: Any = None
+    # The metadata as received, usually a JSON string; `metadata` decodes it on first access.
+    raw_metadata: Any = Field(None, alias="metadata")
     query: str = None
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        metadata = kwargs.get("metadata")
-        if metadata is not None:
-            try:
-                self.metadata = json.loads(metadata)
-            except JSONDecodeError:
-                pass
+    _metadata: Any = PrivateAttr(default=None)
+    _metadata_decoded: bool = PrivateAttr(default=False)
+
+    @property
+    def metadata(self) -> Any:
+        """The metadata of the hit, decoded from JSON when first read."""
+        if not self._metadata_decoded:
+            self._set_metadata(_decode_metadata(self.raw_metadata))
+        return self._metadata
+
+    def _set_metadata(self, metadata: Any) -> None:
+        self._metadata = metadata
+        self._metadata_decoded = True
+
+    def __setattr__(self, name: str, value: Any):
+        if name == "metadata":
+            super().__setattr__("raw_metadata", value)
+            self._set_metadata(value)
+        else:
+            super().__setattr__(name, value)
+
+    def dict(self, **kwargs) -> Dict[str, Any]:
+        # Serialize the decoded metadata under its wire name, as before `raw_metadata` was introduced.
+        key = "metadata" if kwargs.get("by_alias") else "raw_metadata"
+        ret = {}
+        for name, value in super().dict(**kwargs).items():
+            if name == key:
+                ret["metadata"] = self.metadata
+            else:
+                ret[name] = value
+        return ret
+
+    def json(
+        self,
+        *,
+        include: Any = None,
+        exclude: Any = None,
+        by_alias: bool = False,
+        exclude_unset: bool = False,
+        exclude_defaults: bool = False,
+        exclude_none: bool = False,
+        encoder: Callable[[Any], Any] = None,
+        **dumps_kwargs: Any,
+    ) -> str:
+        # BaseModel.json does not go through dict(), so the metadata is renamed here as well.
+        data = self.dict(
+            include=include,
+            exclude=exclude,
+            by_alias=by_alias,
+            exclude_unset=exclude_unset,
+            exclude_defaults=exclude_defaults,
+            exclude_none=exclude_none,
+        )
+        return self.__config__.json_dumps(
+            data, default=encoder or self.__json_encoder__, **dumps_kwargs
+        )
+
+
+def decode_hit_metadata(hits: List[Hit], schema: Optional[Type] = None) -> List[Any]:
+    """Returns the decoded metadata of `hits`, in order, converted to instances of `schema` if given.
+
+    The schema parser is built once for all hits. The hits themselves are left unchanged: `Hit.metadata`
+    keeps returning the decoded JSON.
+    """
+    decoded = [hit.metadata for hit in hits]
+    if schema is None:
+        return decoded
+    parse = metadata_parser(schema)
+    return [parse(value) for value in decoded]
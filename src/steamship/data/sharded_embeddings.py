@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import bisect
+import hashlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, TypeVar, Union
+
+from steamship.base import Client, Response, SteamshipError
+from steamship.data.embeddings import (
+    DEFAULT_INSERT_BATCH_BYTES,
+    DEFAULT_INSERT_BATCH_SIZE,
+    EmbeddedItem,
+    EmbeddingIndex,
+    IndexInsertResponse,
+    InsertManyProgress,
+    QueryResult,
+    QueryResults,
+    _insert_batches,
+    _items_for_insert,
+)
+from steamship.utils.batching import batched, map_concurrently
+from steamship.utils.dedup import Deduplicator
+from steamship.utils.pagination import DEFAULT_PAGE_SIZE
+from steamship.utils.vectors import EmbeddingEncoding
+
+T = TypeVar("T")
+
+# Points per shard on the hash ring; more points spread items more evenly between shards.
+VIRTUAL_NODES = 64
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _routing_key(item: EmbeddedItem) -> str:
+    return item.external_id if item.external_id is not None else item.value or ""
+
+
+class ShardedEmbeddingIndex:
+    """Spreads the items of one logical embedding index over several `EmbeddingIndex` shards.
+
+    Items are routed to a shard by hashing their `external_id` (their value if they have none) onto a
+    consistent-hash ring, so adding a shard only moves the items the new shard takes over. `search` queries
+    every shard concurrently, up to `max_concurrency` at once, and merges their results into a global top-k
+    by score.
+
+    Scores must be comparable across shards, so every shard should use the same embedder plugin instance.
+    """
+
+    def __init__(self, shards: List[EmbeddingIndex], max_concurrency: int = 8):
+        if not shards:
+            raise SteamshipError(message="A sharded embedding index needs at least one shard.")
+        self.max_concurrency = max_concurrency
+        self.shards: List[EmbeddingIndex] = []
+        self._ring: List[Tuple[int, int]] = []  # (point, shard position), sorted by point
+        self._add_to_ring(shards)
+
+    @staticmethod
+    def create(
+        client: Client,
+        handle: str,
+        n_shards: int,
+        plugin_instance: str = None,
+        max_concurrency: int = 8,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> ShardedEmbeddingIndex:
+        """Creates, or opens, the `n_shards` indexes `{handle}-shard-0`, `{handle}-shard-1`, ..."""
+        shards = []
+        for number in range(n_shards):
+            response = EmbeddingIndex.create(
+                client,
+                handle=f"{handle}-shard-{number}",
+                plugin_instance=plugin_instance,
+                upsert=True,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            )
+            response.wait()
+            shards.append(response.data)
+        return ShardedEmbeddingIndex(shards, max_concurrency=max_concurrency)
+
+    def _add_to_ring(self, shards: List[EmbeddingIndex]) -> None:
+        for shard in shards:
+            position = len(self.shards)
+            self.shards.append(shard)
+            for node in range(VIRTUAL_NODES):
+                bisect.insort(self._ring, (_hash64(f"{shard.id}#{node}"), position))
+
+    def shard_for(self, key: str) -> EmbeddingIndex:
+        """The shard holding the items routed by `key`."""
+        return self.shards[self._position_for(key)]
+
+    def _position_for(self, key: str) -> int:
+        point = bisect.bisect(self._ring, (_hash64(key), len(self.shards)))
+        return self._ring[point % len(self._ring)][1]
+
+    def _fan_out(self, fn: Callable[[int], T], positions: List[int] = None) -> List[T]:
+        """Calls `fn` with the given shard positions, by default all, concurrently, returning the results
+        in the same order."""
+        positions = list(range(len(self.shards))) if positions is None else positions
+        results: Dict[int, T] = {}
+        try:
+            for i, result in map_concurrently(fn, positions, max_concurrency=self.max_concurrency):
+                results[i] = result
+        except Exception as error:
+            raise SteamshipError(
+                message="A shard of a sharded embedding index failed.", error=error
+            )
+        return [results[i] for i in range(len(positions))]
+
+    def insert(
+        self,
+        value: str,
+        external_id: str = None,
+        external_type: str = None,
+        metadata: Any = None,
+        reindex: bool = True,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> Response[IndexInsertResponse]:
+        return self.shard_for(external_id if external_id is not None else value).insert(
+            value,
+            external_id=external_id,
+            external_type=external_type,
+            metadata=metadata,
+            reindex=reindex,
+            space_id=space_id,
+            space_handle=space_handle,
+            space=space,
+        )
+
+    def insert_many(
+        self,
+        items: Iterable[Union[EmbeddedItem, str]],
+        reindex: bool = True,
+        batch_size: int = DEFAULT_INSERT_BATCH_SIZE,
+        max_batch_bytes: int = DEFAULT_INSERT_BATCH_BYTES,
+        max_concurrency: int = None,
+        resume_from_batch: int = 0,
+        on_progress: Callable[[InsertManyProgress], None] = None,
+        embedding_encoding: EmbeddingEncoding = None,
+        deduplicator: Deduplicator = None,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> Response[IndexInsertResponse]:
+        """Inserts `items` into their shards like `EmbeddingIndex.insert_many`, writing up to
+        `max_concurrency` batches at once, by default the index's `max_concurrency`. The merged `item_ids`
+        are in input order.
+
+        `items` is consumed lazily: every shard buffers its items until they fill a batch of `batch_size`
+        items or `max_batch_bytes` bytes, which is then sent. `on_progress` and `resume_from_batch` count
+        these batches across all shards. With a `deduplicator`, near-duplicates are skipped across all shards.
+        """
+        positions_of_batches: List[List[int]] = []  # The input positions of the items of each batch
+        batches = self._shard_batches(
+            _items_for_insert(items, embedding_encoding, deduplicator),
+            batch_size,
+            max_batch_bytes,
+            positions_of_batches,
+        )
+        pending = (batch for number, batch in enumerate(batches) if number >= resume_from_batch)
+
+        def _insert_batch(batch: List[EmbeddedItem]) -> Response[IndexInsertResponse]:
+            return self.shard_for(_routing_key(batch[0]))._insert_batch(
+                batch,
+                reindex=reindex,
+                embedding_encoding=embedding_encoding,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            )
+
+        completed = _insert_batches(
+            "sharded embedding index " + ", ".join(shard.id for shard in self.shards),
+            _insert_batch,
+            pending,
+            max_concurrency=max_concurrency or self.max_concurrency,
+            resume_from_batch=resume_from_batch,
+            on_progress=on_progress,
+        )
+        ids_by_input_position = {}
+        for number, data in completed.items():
+            item_ids = (data and data.item_ids) or []
+            input_positions = positions_of_batches[number + resume_from_batch]
+            ids_by_input_position.update(zip(input_positions, item_ids))
+        return Response(
+            expect=IndexInsertResponse,
+            data_=IndexInsertResponse(
+                item_ids=[ids_by_input_position[i] for i in sorted(ids_by_input_position)]
+            ),
+            client=self.shards[0].client,
+        )
+
+    def _shard_batches(
+        self,
+        items: Iterable[EmbeddedItem],
+        batch_size: int,
+        max_batch_bytes: int,
+        positions_of_batches: List[List[int]],
+    ) -> Iterator[List[EmbeddedItem]]:
+        """Routes `items` to their shards, yielding the items buffered for a shard as a batch once they fill
+        `batch_size` items or would exceed `max_batch_bytes`, then the remaining buffers in shard order.
+        The input positions of the items of every yielded batch are appended to `positions_of_batches`."""
+        buffers: Dict[int, List[Tuple[int, EmbeddedItem]]] = {}
+        sizes: Dict[int, int] = {}
+
+        def _flush(shard: int) -> List[EmbeddedItem]:
+            entries = buffers.pop(shard)
+            sizes.pop(shard)
+            positions_of_batches.append([position for position, _ in entries])
+            return [item for _, item in entries]
+
+        for position, item in enumerate(items):
+            shard = self._position_for(_routing_key(item))
+            size = len(item.json(by_alias=True, exclude_none=True))
+            if shard in buffers and sizes[shard] + size > max_batch_bytes:
+                yield _flush(shard)
+            buffers.setdefault(shard, []).append((position, item))
+            sizes[shard] = sizes.get(shard, 0) + size
+            if len(buffers[shard]) >= batch_size:
+                yield _flush(shard)
+        for shard in sorted(buffers):
+            yield _flush(shard)
+
+    def embed(
+        self, space_id: str = None, space_handle: str = None, space: Any = None
+    ) -> List[Response]:
+        """Embeds every shard, returning the responses of the shards once they have all completed."""
+
+        def _embed(position: int) -> Response:
+            response = self.shards[position].embed(
+                space_id=space_id, space_handle=space_handle, space=space
+            )
+            response.wait()
+            return response
+
+        return self._fan_out(_embed)
+
+    def search(
+        self,
+        query: Union[str, List[str]],
+        k: int = 1,
+        include_metadata: bool = False,
+        use_cache: bool = True,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> Response[QueryResults]:
+        """Searches every shard and returns the `k` best hits of each query across all shards, best first,
+        flattened in query order like `EmbeddingIndex.search`."""
+
+        def _search(position: int) -> QueryResults:
+            response = self.shards[position].search(
+                query,
+                k=k,
+                include_metadata=include_metadata,
+                use_cache=use_cache,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            )
+            response.wait()
+            return response.data
+
+        queries = query if isinstance(query, list) else [query]
+        candidates: Dict[str, List[QueryResult]] = {}
+        for results in self._fan_out(_search):
+            for item in results.items or []:
+                hit_query = item.value.query if item.value is not None else None
+                candidates.setdefault(hit_query if len(queries) > 1 else queries[0], []).append(
+                    item
+                )
+
+        merged = []
+        for q in dict.fromkeys(queries):
+            ranked = sorted(
+                candidates.get(q, []),
+                key=lambda item: float("-inf") if item.score is None else item.score,
+                reverse=True,
+            )
+            merged.extend(ranked[:k])
+        return Response(
+            expect=QueryResults, data_=QueryResults(items=merged), client=self.shards[0].client
+        )
+
+    def add_shards(
+        self,
+        shards: List[EmbeddingIndex],
+        rebalance: bool = True,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> int:
+        """Adds `shards` to the index and, unless `rebalance` is False, moves the items they now own to them.
+
+        Returns the number of items moved.
+        """
+        self._add_to_ring(shards)
+        return self.rebalance(space_id, space_handle, space) if rebalance else 0
+
+    def rebalance(self, space_id: str = None, space_handle: str = None, space: Any = None) -> int:
+        """Moves every item which is not on the shard it routes to, returning the number of items moved.
+
+        Items are read a page at a time and copied with their embeddings to their new shard; they are deleted
+        from their old one once all of its items have been read, so a search running meanwhile may briefly see
+        an item on both. Rebalancing is not atomic; if it
+        fails, run it again.
+        """
+
+        def _rebalance(position: int) -> int:
+            shard = self.shards[position]
+            items = shard.iter_items(space_id=space_id, space_handle=space_handle, space=space)
+            moved_ids = []
+            for page in batched(items, max_items=DEFAULT_PAGE_SIZE):
+                misplaced: Dict[int, List[EmbeddedItem]] = {}
+                for item in page:
+                    target = self._position_for(_routing_key(item))
+                    if target != position:
+                        misplaced.setdefault(target, []).append(item)
+                for target, moving in misplaced.items():
+                    self.shards[target].insert_many(
+                        [item.copy(update={"id": None, "index_id": None}) for item in moving],
+                        space_id=space_id,
+                        space_handle=space_handle,
+                        space=space,
+                    ).wait()
+                    moved_ids.extend(item.id for item in moving)
+            # Deleted once the listing is done, so that the pages being read do not shift.
+            for item_ids in batched(moved_ids, max_items=DEFAULT_INSERT_BATCH_SIZE):
+                shard.delete_items(
+                    item_ids, space_id=space_id, space_handle=space_handle, space=space
+                ).wait()
+            return len(moved_ids)
+
+        return sum(self._fan_out(_rebalance))
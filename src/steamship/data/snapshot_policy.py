@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Tuple
+
+from steamship.base import Response, SteamshipError
+from steamship.base.tasks import TaskState
+
+if TYPE_CHECKING:
+    from steamship.data.embeddings import EmbeddingIndex, IndexSnapshotResponse
+
+
+def _is_finished(response: Response) -> bool:
+    """Whether the task behind `response` has completed, polling its status once if it has not."""
+    if response.task is None or response.task.state in (TaskState.succeeded, TaskState.failed):
+        return True
+    response.refresh()
+    return response.task.state in (TaskState.succeeded, TaskState.failed)
+
+
+class SnapshotPolicy:
+    """Decides when an `EmbeddingIndex` snapshots itself; see `EmbeddingIndex.enable_auto_snapshot`.
+
+    A snapshot is due once `every_items` items have been inserted, or `every_seconds` have passed since the
+    first insert not covered by a snapshot. Inserts count once their request has succeeded: an insert whose
+    task is still running is counted when its task is seen to succeed. Snapshots are coalesced: while one is
+    in flight no other is started, and the inserts made meanwhile are covered by the next one. Once a
+    snapshot has completed, all but the `retain` most recent snapshots completed by this policy are deleted,
+    oldest first; snapshots made otherwise are left alone.
+    """
+
+    def __init__(
+        self,
+        every_items: Optional[int] = 1000,
+        every_seconds: Optional[float] = None,
+        retain: Optional[int] = 2,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if every_items is None and every_seconds is None:
+            raise SteamshipError(message="Set every_items, every_seconds, or both.")
+        if retain is not None and retain < 1:
+            raise SteamshipError(message=f"retain must be at least 1. Received {retain}.")
+        self.every_items = every_items
+        self.every_seconds = every_seconds
+        self.retain = retain
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pending_items = 0  # Items inserted since the last snapshot was started
+        self._pending_since: Optional[float] = None
+        # Inserts whose task may still be running, with their item counts
+        self._unconfirmed: List[Tuple[Response, int]] = []
+        self._in_flight: Optional[Response[IndexSnapshotResponse]] = None
+        self._in_flight_items = 0
+        self._starting = False  # Whether a caller is starting a snapshot, outside the lock
+        self._completed_ids: List[str] = []  # Snapshots completed by this policy, oldest first
+        self.snapshots_created = 0
+
+    @property
+    def pending_items(self) -> int:
+        return self._pending_items
+
+    def _is_due(self) -> bool:
+        if not self._pending_items:
+            return False
+        if self.every_items is not None and self._pending_items >= self.every_items:
+            return True
+        return (
+            self.every_seconds is not None
+            and self._clock() - self._pending_since >= self.every_seconds
+        )
+
+    def _add_pending(self, count: int) -> None:
+        """Counts `count` more items as not covered by a snapshot. Must hold the lock."""
+        if not self._pending_items:
+            self._pending_since = self._clock()
+        self._pending_items += count
+
+    def _confirm_inserts(self) -> None:
+        """Counts the inserts whose request is known to have succeeded and drops those which failed, without
+        polling the tasks still running. Must hold the lock."""
+        unconfirmed = []
+        for response, count in self._unconfirmed:
+            if response.task is not None and response.task.state not in (
+                TaskState.succeeded,
+                TaskState.failed,
+            ):
+                unconfirmed.append((response, count))
+            elif response.error is None and (
+                response.task is None or response.task.state == TaskState.succeeded
+            ):
+                self._add_pending(count)
+        self._unconfirmed = unconfirmed
+
+    def record_inserts(
+        self,
+        index: EmbeddingIndex,
+        response: Response,
+        count: int,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> Optional[Response[IndexSnapshotResponse]]:
+        """Records the insert of `count` items into `index` by the request answered with `response`, and
+        starts a snapshot if one is due."""
+        with self._lock:
+            self._unconfirmed.append((response, count))
+        return self.snapshot_if_due(
+            index, space_id=space_id, space_handle=space_handle, space=space
+        )
+
+    def snapshot_if_due(
+        self,
+        index: EmbeddingIndex,
+        force: bool = False,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> Optional[Response[IndexSnapshotResponse]]:
+        """Starts a snapshot of `index` if one is due (with `force`, if any insert is not yet covered) and no
+        other snapshot is in flight. Returns the response of the started snapshot, or None.
+
+        A snapshot in flight which has completed is first recorded, and the snapshots it makes obsolete are
+        deleted before the next one starts, so that pruning never counts a snapshot which might still fail.
+        The lock is only held to decide; the requests to the engine are made without it, so that inserts
+        are not held up while snapshots are polled, created or deleted.
+        """
+        with self._lock:
+            self._confirm_inserts()
+            if self._starting or not (self._is_due() or (force and self._pending_items)):
+                return None
+            self._starting = True
+        try:
+            if not self._finish_in_flight(index, space_id, space_handle, space):
+                return None
+            with self._lock:
+                count, self._pending_items, self._pending_since = self._pending_items, 0, None
+            try:
+                response = index.create_snapshot(
+                    space_id=space_id, space_handle=space_handle, space=space
+                )
+            except Exception:
+                with self._lock:
+                    self._add_pending(count)
+                raise
+            with self._lock:
+                self._in_flight, self._in_flight_items = response, count
+                self.snapshots_created += 1
+            return response
+        finally:
+            self._starting = False
+
+    def flush(
+        self,
+        index: EmbeddingIndex,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> None:
+        """Waits for the inserts and the snapshot in flight, snapshots any inserts not covered yet and prunes
+        old snapshots."""
+        with self._lock:
+            waiting = [response for response, _ in self._unconfirmed]
+            in_flight = self._in_flight
+        for response in waiting:
+            response.wait()
+        if in_flight is not None and not _is_finished(in_flight):
+            in_flight.wait()
+        response = self.snapshot_if_due(
+            index, force=True, space_id=space_id, space_handle=space_handle, space=space
+        )
+        if response is not None:
+            response.wait()
+        self._finish_in_flight(index, space_id, space_handle, space)
+
+    def _finish_in_flight(
+        self,
+        index: EmbeddingIndex,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+    ) -> bool:
+        """Records the snapshot in flight if it has finished and deletes the snapshots it makes obsolete.
+        Returns whether no snapshot is in flight any more. Must not hold the lock."""
+        with self._lock:
+            in_flight = self._in_flight
+        if in_flight is None:
+            return True
+        if not _is_finished(in_flight):
+            return False
+        with self._lock:
+            # Another caller may have recorded it meanwhile.
+            obsolete = self._complete() if self._in_flight is in_flight else []
+        for snapshot_id in obsolete:
+            index.delete_snapshot(
+                snapshot_id, space_id=space_id, space_handle=space_handle, space=space
+            ).wait()
+        return True
+
+    def _complete(self) -> List[str]:
+        """Clears the finished snapshot in flight, recording its id if it succeeded, and returns the ids of
+        the oldest completed snapshots beyond `retain`, which are to be deleted. Must hold the lock."""
+        response, self._in_flight = self._in_flight, None
+        if response.task is not None and response.task.state == TaskState.failed:
+            logging.warning(f"Automatic snapshot failed: {response.task.status_message}")
+            # Its inserts are covered by the next snapshot instead.
+            self._add_pending(self._in_flight_items)
+            return []
+        if response.data_ is not None and response.data_.snapshot_id is not None:
+            self._completed_ids.append(response.data_.snapshot_id)
+        if self.retain is None or len(self._completed_ids) <= self.retain:
+            return []
+        obsolete = self._completed_ids[: -self.retain]
+        del self._completed_ids[: -self.retain]
+        return obsolete
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional
 
 from steamship.base import Client, Request, Response
 from steamship.base.configuration import CamelModel
+from steamship.base.request import PageRequest
+from steamship.utils.pagination import DEFAULT_PAGE_SIZE, paginate
 
 
-class TagQueryRequest(Request):
+class TagQueryRequest(PageRequest):
     tag_filter_query: str
 
 
@@ -106,8 +108,12 @@ class Tag(CamelModel):
         space_id: str = None,
         space_handle: str = None,
         space: Any = None,
+        page_size: int = None,
+        page_token: str = None,
     ) -> Response[TagQueryResponse]:
-        req = TagQueryRequest(tag_filter_query=tag_filter_query)
+        req = TagQueryRequest(
+            tag_filter_query=tag_filter_query, page_size=page_size, page_token=page_token
+        )
         res = client.post(
             "tag/query",
             payload=req,
@@ -118,9 +124,35 @@ class Tag(CamelModel):
         )
         return res
 
+    @staticmethod
+    def iter_query(
+        client: Client,
+        tag_filter_query: str,
+        space_id: str = None,
+        space_handle: str = None,
+        space: Any = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Iterator[Tag]:
+        """Lazily yields the tags matching `tag_filter_query`, fetching `page_size` of them at a time."""
+
+        def _fetch_page(page_token: Optional[str]):
+            data = Tag.query(
+                client,
+                tag_filter_query,
+                page_size=page_size,
+                page_token=page_token,
+                space_id=space_id,
+                space_handle=space_handle,
+                space=space,
+            ).data
+            return data.tags, data.next_page_token
+
+        return paginate(_fetch_page)
+
 
 class TagQueryResponse(Response):
     tags: List[Tag]
+    next_page_token: str = None
 
 
 Tag.ListResponse.update_forward_refs()
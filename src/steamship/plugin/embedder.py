@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 
 from steamship.app import Response, post
 from steamship.plugin.inputs.block_and_tag_plugin_input import BlockAndTagPluginInput
+from steamship.plugin.inputs.embedder_plugin_input import EmbedderPluginInput
 from steamship.plugin.outputs.embedded_items_plugin_output import EmbeddedItemsPluginOutput
 from steamship.plugin.service import PluginRequest, PluginService
 
@@ -23,5 +24,18 @@ class Embedder(PluginService[BlockAndTagPluginInput, EmbeddedItemsPluginOutput],
 
     @post("tag")
     def run_endpoint(self, **kwargs) -> Response[EmbeddedItemsPluginOutput]:
-        """Exposes the Embedder's `run` operation to the Steamship Engine via the expected HTTP path POST /tag"""
-        return self.run(PluginRequest[BlockAndTagPluginInput](**kwargs))
+        """Exposes the Embedder's `run` operation to the Steamship Engine via the expected HTTP path POST /tag
+
+        If the caller asked for a binary embedding encoding and the implementation did not choose one itself,
+        the output is encoded as requested.
+        """
+        request = PluginRequest[EmbedderPluginInput](**kwargs)
+        response = self.run(request)
+        output = response.data if isinstance(response, Response) else response
+        if (
+            isinstance(output, EmbeddedItemsPluginOutput)
+            and output.embedding_encoding is None
+            and request.data is not None
+        ):
+            output.embedding_encoding = request.data.embedding_encoding
+        return response
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from steamship.plugin.inputs.block_and_tag_plugin_input import BlockAndTagPluginInput
+from steamship.utils.vectors import EmbeddingEncoding
+
+
+class EmbedderPluginInput(BlockAndTagPluginInput):
+    """The input of an Embedder: the blocks to embed, plus the embedding encoding the caller accepts."""
+
+    embedding_encoding: EmbeddingEncoding = None
@@ -5,6 +5,7 @@ from typing import Any
 
 from steamship.base.configuration import CamelModel
 from steamship.base.mime_types import TEXT_MIME_TYPES
+from steamship.utils.raw_cache import default_raw_cache
 from steamship.utils.signed_urls import url_to_bytes
 
 
@@ -59,7 +60,8 @@ class RawDataPluginInput(CamelModel):
             else:
                 kwargs["data"] = data_bytes
         elif url is not None:
-            kwargs["data"] = url_to_bytes(url)  # Resolve the URL into the data field
+            # Resolve the URL into the data field
+            kwargs["data"] = url_to_bytes(url, cache=default_raw_cache())
             kwargs.pop(
                 "url"
             )  # Remove the URL field to preserve a simple interface for the consumer
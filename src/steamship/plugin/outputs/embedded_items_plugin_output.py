@@ -1,9 +1,62 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Any, Callable, Dict, List, Union
+
+from pydantic import validator
 
 from steamship.base.configuration import CamelModel
+from steamship.utils.vectors import (
+    EmbeddingEncoding,
+    decode_embedding,
+    encode_embedding,
+    is_ndarray,
+)
 
 
 class EmbeddedItemsPluginOutput(CamelModel):
-    embeddings: List[List[float]]
+    # How `embeddings` are encoded on the wire. JSON lists of numbers when None.
+    embedding_encoding: EmbeddingEncoding = None
+    # One vector per input block: a list of floats or a numpy.ndarray. A 2-d numpy.ndarray is also accepted.
+    embeddings: List[Union[List[float], Any]]
+
+    @validator("embeddings", pre=True)
+    def _decode_embeddings(cls, v, values):  # noqa: N805
+        if is_ndarray(v):
+            return list(v)
+        encoding = values.get("embedding_encoding")
+        return [
+            decode_embedding(embedding, encoding) if isinstance(embedding, str) else embedding
+            for embedding in v
+        ]
+
+    def dict(self, **kwargs) -> Dict[str, Any]:
+        ret = super().dict(**kwargs)
+        ret["embeddings"] = [
+            encode_embedding(embedding, self.embedding_encoding) for embedding in self.embeddings
+        ]
+        return ret
+
+    def json(
+        self,
+        *,
+        include: Any = None,
+        exclude: Any = None,
+        by_alias: bool = False,
+        exclude_unset: bool = False,
+        exclude_defaults: bool = False,
+        exclude_none: bool = False,
+        encoder: Callable[[Any], Any] = None,
+        **dumps_kwargs: Any,
+    ) -> str:
+        # BaseModel.json does not go through dict(), so the embeddings are encoded here as well.
+        data = self.dict(
+            include=include,
+            exclude=exclude,
+            by_alias=by_alias,
+            exclude_unset=exclude_unset,
+            exclude_defaults=exclude_defaults,
+            exclude_none=exclude_none,
+        )
+        return self.__config__.json_dumps(
+            data, default=encoder or self.__json_encoder__, **dumps_kwargs
+        )
@@ -0,0 +1,100 @@
+"""Helpers for splitting large workloads into batches and dispatching them concurrently.
+
+The Steamship client is synchronous (it is built on `requests`), so concurrency is provided by a bounded
+thread pool: at most `max_concurrency` calls are in flight at any time and the input is consumed lazily,
+which keeps memory bounded even when the input is a generator over millions of items.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+U = TypeVar("U")
+
+
+def batched(
+    items: Iterable[T],
+    max_items: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    size_of: Optional[Callable[[T], int]] = None,
+) -> Iterator[List[T]]:
+    """Lazily splits `items` into lists of at most `max_items` elements and roughly `max_bytes` bytes.
+
+    The size of each element is estimated with `size_of`; it is only invoked when `max_bytes` is set.
+    An element which is by itself larger than `max_bytes` is emitted as a batch of one.
+    """
+    if max_items is not None and max_items < 1:
+        raise ValueError(f"max_items must be positive. Received {max_items}.")
+    if max_bytes is not None and size_of is None:
+        raise ValueError("size_of must be provided when max_bytes is set.")
+
+    batch: List[T] = []
+    batch_bytes = 0
+    for item in items:
+        item_bytes = size_of(item) if max_bytes is not None else 0
+        if batch and (
+            (max_items is not None and len(batch) >= max_items)
+            or (max_bytes is not None and batch_bytes + item_bytes > max_bytes)
+        ):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(item)
+        batch_bytes += item_bytes
+    if batch:
+        yield batch
+
+
+def map_concurrently(
+    fn: Callable[[T], U],
+    items: Iterable[T],
+    max_concurrency: int = 1,
+) -> Iterator[Tuple[int, U]]:
+    """Applies `fn` to every element of `items`, keeping at most `max_concurrency` calls in flight.
+
+    Yields `(position, result)` tuples in completion order, where `position` is the index of the element in
+    `items`. If a call raises, no further work is submitted, the calls already in flight are allowed to
+    finish, and the exception is re-raised to the consumer.
+    """
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be positive. Received {max_concurrency}.")
+
+    if max_concurrency == 1:
+        for position, item in enumerate(items):
+            yield position, fn(item)
+    else:
+        yield from _map_in_pool(fn, items, max_concurrency)
+
+
+def _map_in_pool(
+    fn: Callable[[T], U], items: Iterable[T], max_concurrency: int
+) -> Iterator[Tuple[int, U]]:
+    iterator = enumerate(items)
+    in_flight: Dict[Future, int] = {}
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+
+        def _fill():
+            for position, item in iterator:
+                in_flight[executor.submit(fn, item)] = position
+                if len(in_flight) >= max_concurrency:
+                    return
+
+        _fill()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            yield from _collect(done, in_flight)
+            _fill()
+
+
+def _collect(done: Iterable[Future], in_flight: Dict[Future, int]) -> Iterator[Tuple[int, U]]:
+    """Yields the results of the `done` futures, removing them from `in_flight`. If any of them failed, waits
+    for the rest of `in_flight` and raises the first failure."""
+    failure = None
+    for future in done:
+        position = in_flight.pop(future)
+        if future.exception() is not None:
+            failure = failure or future.exception()
+        else:
+            yield position, future.result()
+    if failure is not None:
+        wait(in_flight)
+        raise failure
@@ -0,0 +1,111 @@
+"""A small thread-safe LRU cache with optional time-to-live and memory bounds."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+from steamship.base.configuration import CamelModel
+
+V = TypeVar("V")
+
+
+class CacheStats(CamelModel):
+    """Counters describing the effectiveness and footprint of an `LRUCache`."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # Entries dropped to respect `max_entries` or `max_bytes`
+    invalidations: int = 0  # Entries dropped by `invalidate` or `clear`
+    entries: int = 0
+    bytes: int = 0  # Estimated memory held by the cached values
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LRUCache(Generic[V]):
+    """Maps hashable keys to values, evicting the least recently used entries first.
+
+    Entries expire `ttl_seconds` after they were stored, if set. The cache holds at most `max_entries`
+    entries and, if `max_bytes` is set, at most roughly `max_bytes` of values as estimated by `size_of`.
+    A value larger than `max_bytes` by itself is not stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        size_of: Callable[[V], int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be positive. Received {max_entries}.")
+        if max_bytes is not None and size_of is None:
+            raise ValueError("size_of must be provided when max_bytes is set.")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._size_of = size_of
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[V, float, int]]" = OrderedDict()
+        self._stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Returns the value stored under `key`, or None if it is absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None:
+                if self._clock() - entry[1] > self.ttl_seconds:
+                    self._drop(key)
+                    entry = None
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: V) -> None:
+        """Stores `value` under `key`, evicting least recently used entries as needed."""
+        size = self._size_of(value) if self._size_of is not None else 0
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = (value, self._clock(), size)
+            self._stats.bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._stats.bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drops every entry whose key satisfies `predicate`, returning how many were dropped."""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._drop(key)
+            self._stats.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        self.invalidate(lambda _: True)
+
+    def stats(self) -> CacheStats:
+        """A snapshot of the counters of this cache."""
+        with self._lock:
+            return self._stats.copy(update={"entries": len(self._entries)})
+
+    def _drop(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self._stats.bytes -= size
@@ -0,0 +1,222 @@
+"""Near-duplicate detection for text, used to keep boilerplate out of embedding indexes.
+
+A `Deduplicator` remembers the texts it has accepted and, for each new text, reports whether it is a
+near-duplicate of one of them. Two locality-sensitive schemes are provided:
+
+* `SimHashDeduplicator` fingerprints each text with a 64-bit SimHash and treats texts whose fingerprints
+  differ in at most `max_distance` bits as duplicates. It is the cheaper of the two and suits short,
+  templated texts.
+* `MinHashDeduplicator` estimates the Jaccard similarity of the word shingles of two texts with MinHash
+  signatures and treats texts above `threshold` as duplicates. Its threshold is easier to reason about.
+
+Both index fingerprints in hash buckets (banding), so a lookup costs O(1) on average instead of a comparison
+with every accepted text. Both require NumPy (``pip install steamship[numpy]``).
+"""
+
+import hashlib
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, TypeVar
+
+from steamship.base.configuration import CamelModel
+from steamship.utils.vectors import import_numpy
+
+T = TypeVar("T")
+
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int) -> List[str]:
+    """The overlapping sequences of `size` lower-cased words of `text`; the whole text if it is shorter."""
+    words = _WORD.findall((text or "").lower())
+    if len(words) <= size:
+        return [" ".join(words)]
+    return [" ".join(words[i : i + size]) for i in range(len(words) - size + 1)]
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class DedupStats(CamelModel):
+    """Counters of a `Deduplicator`."""
+
+    seen: int = 0
+    duplicates: int = 0  # Texts reported as (near-)duplicates; the rest were accepted as canonical
+
+    @property
+    def duplicate_rate(self) -> float:
+        return self.duplicates / self.seen if self.seen else 0.0
+
+
+class Deduplicator(ABC):
+    """Detects texts which are near-duplicates of texts seen before.
+
+    Every text is registered under a key (e.g. an item or block id). `canonical` returns the key of the
+    earlier text a new text duplicates, or the new key itself if it is original. With `keep_mapping`, the
+    duplicate-to-canonical mapping is kept in `duplicates`.
+    """
+
+    def __init__(self, shingle_size: int = 3, keep_mapping: bool = True):
+        self._np = import_numpy()
+        self.shingle_size = shingle_size
+        self.keep_mapping = keep_mapping
+        self.duplicates: Dict[Hashable, Hashable] = {}
+        self.stats = DedupStats()
+        self._exact: Dict[bytes, Hashable] = {}  # Digest of the normalized text -> canonical key
+
+    def canonical(self, key: Hashable, text: str) -> Hashable:
+        """Returns the key of the text `text` duplicates, or registers `text` under `key` and returns `key`."""
+        self.stats.seen += 1
+        normalized = " ".join(_WORD.findall((text or "").lower()))
+        digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+        match = self._exact.get(digest)
+        if match is None:
+            fingerprint = self._fingerprint(text)
+            match = self._find(fingerprint)
+            if match is None:
+                self._exact[digest] = key
+                self._add(key, fingerprint)
+                return key
+        self.stats.duplicates += 1
+        if self.keep_mapping:
+            self.duplicates[key] = match
+        return match
+
+    def add(self, key: Hashable, text: str) -> None:
+        """Registers `text` as canonical, e.g. to seed the deduplicator with already indexed texts."""
+        normalized = " ".join(_WORD.findall((text or "").lower()))
+        digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+        if digest not in self._exact:
+            self._exact[digest] = key
+            self._add(key, self._fingerprint(text))
+
+    def filter(
+        self,
+        items: Iterable[T],
+        text_of: Callable[[T], str],
+        key_of: Callable[[T], Hashable],
+    ) -> Iterator[T]:
+        """Lazily yields the elements of `items` which are not near-duplicates of an earlier element."""
+        for item in items:
+            key = key_of(item)
+            if self.canonical(key, text_of(item)) == key:
+                yield item
+
+    @abstractmethod
+    def _fingerprint(self, text: str) -> Any:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _find(self, fingerprint: Any) -> Optional[Hashable]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _add(self, key: Hashable, fingerprint: Any) -> None:
+        raise NotImplementedError()
+
+
+class SimHashDeduplicator(Deduplicator):
+    """Treats texts whose 64-bit SimHash fingerprints differ in at most `max_distance` bits as duplicates.
+
+    Fingerprints are split into `max_distance + 1` bands; by the pigeonhole principle, two fingerprints
+    within the distance agree exactly on at least one band, so only texts sharing a band are compared.
+    """
+
+    def __init__(self, max_distance: int = 3, shingle_size: int = 3, keep_mapping: bool = True):
+        super().__init__(shingle_size=shingle_size, keep_mapping=keep_mapping)
+        if not 0 <= max_distance < 64:
+            raise ValueError(f"max_distance must be between 0 and 63. Received {max_distance}.")
+        self.max_distance = max_distance
+        n_bands = max_distance + 1
+        edges = [64 * i // n_bands for i in range(n_bands + 1)]
+        self._bands = [(start, (1 << (end - start)) - 1) for start, end in zip(edges, edges[1:])]
+        self._buckets: List[Dict[int, List[Hashable]]] = [{} for _ in self._bands]
+        self._fingerprints: Dict[Hashable, int] = {}
+
+    def _fingerprint(self, text: str) -> int:
+        np = self._np
+        hashes = np.array([_hash64(s) for s in shingles(text, self.shingle_size)], dtype="<u8")
+        bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+        majority = bits.sum(axis=0) * 2 > len(hashes)
+        return int.from_bytes(np.packbits(majority, bitorder="little").tobytes(), "little")
+
+    def _find(self, fingerprint: int) -> Optional[Hashable]:
+        for (shift, mask), buckets in zip(self._bands, self._buckets):
+            for key in buckets.get((fingerprint >> shift) & mask, ()):
+                if bin(fingerprint ^ self._fingerprints[key]).count("1") <= self.max_distance:
+                    return key
+        return None
+
+    def _add(self, key: Hashable, fingerprint: int) -> None:
+        self._fingerprints[key] = fingerprint
+        for (shift, mask), buckets in zip(self._bands, self._buckets):
+            buckets.setdefault((fingerprint >> shift) & mask, []).append(key)
+
+
+class MinHashDeduplicator(Deduplicator):
+    """Treats texts whose word shingles have an estimated Jaccard similarity of at least `threshold` as
+    duplicates.
+
+    Signatures of `num_perm` MinHash values are split into bands of rows chosen so that pairs near the
+    threshold are likely to share a band; candidates sharing a band are then checked against the threshold.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        shingle_size: int = 3,
+        seed: int = 0,
+        keep_mapping: bool = True,
+    ):
+        super().__init__(shingle_size=shingle_size, keep_mapping=keep_mapping)
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be in (0, 1]. Received {threshold}.")
+        np = self._np
+        self.threshold = threshold
+        self.num_perm = num_perm
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hash functions h(x) = ((a * x + b) mod 2^64) >> 32, with odd multipliers.
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+        self.n_bands, self.rows_per_band = _bands_for(threshold, num_perm)
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [{} for _ in range(self.n_bands)]
+        self._signatures: Dict[Hashable, Any] = {}
+
+    def _fingerprint(self, text: str) -> Any:
+        np = self._np
+        hashes = np.array([_hash64(s) for s in shingles(text, self.shingle_size)], dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            permuted = self._a[:, None] * hashes[None, :] + self._b[:, None]
+        return (permuted >> np.uint64(32)).min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: Any) -> Iterator[bytes]:
+        for band in range(self.n_bands):
+            start = band * self.rows_per_band
+            yield signature[start : start + self.rows_per_band].tobytes()
+
+    def _find(self, signature: Any) -> Optional[Hashable]:
+        for band_key, buckets in zip(self._band_keys(signature), self._buckets):
+            for key in buckets.get(band_key, ()):
+                if (self._signatures[key] == signature).mean() >= self.threshold:
+                    return key
+        return None
+
+    def _add(self, key: Hashable, signature: Any) -> None:
+        self._signatures[key] = signature
+        for band_key, buckets in zip(self._band_keys(signature), self._buckets):
+            buckets.setdefault(band_key, []).append(key)
+
+
+def _bands_for(threshold: float, num_perm: int):
+    """Picks the (bands, rows) split of `num_perm` whose S-curve midpoint (1/bands)^(1/rows) is closest to
+    `threshold`, erring on the low side so that true duplicates are rarely missed."""
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        midpoint = (1 / bands) ** (1 / rows)
+        penalty = abs(midpoint - threshold) + (0.05 if midpoint > threshold else 0)
+        if best is None or penalty < best[0]:
+            best = (penalty, bands, rows)
+    return best[1], best[2]
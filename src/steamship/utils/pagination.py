@@ -0,0 +1,55 @@
+"""Helpers for consuming paginated listings lazily.
+
+Listing endpoints accept a `page_size` and a `page_token` (see `PageRequest`) and answer with one page of
+results and a `next_page_token`, which is empty on the last page. `paginate` turns such an endpoint into a
+generator, fetching the next page in the background while the current one is consumed, so that memory stays
+bounded by two pages and the first results are available after a single round trip.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple, TypeVar
+
+from steamship.base.error import SteamshipError
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 100
+
+PageFetcher = Callable[[Optional[str]], Tuple[Optional[List[T]], Optional[str]]]
+
+
+def paginate(fetch_page: PageFetcher, prefetch: bool = True) -> Iterator[T]:
+    """Yields the results of every page returned by `fetch_page`, in order.
+
+    `fetch_page` receives a page token (None for the first page) and returns the results of that page and
+    the token of the next one. With `prefetch`, the next page is requested as soon as the current one has
+    arrived.
+    """
+    if not prefetch:
+        page_token = None
+        while True:
+            results, next_page_token = fetch_page(page_token)
+            yield from results or []
+            if not next_page_token:
+                return
+            _check_progress(page_token, next_page_token)
+            page_token = next_page_token
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        page_token = None
+        pending = executor.submit(fetch_page, page_token)
+        while pending is not None:
+            results, next_page_token = pending.result()
+            pending = None
+            if next_page_token:
+                _check_progress(page_token, next_page_token)
+                page_token = next_page_token
+                pending = executor.submit(fetch_page, page_token)
+            yield from results or []
+
+
+def _check_progress(page_token: Optional[str], next_page_token: str) -> None:
+    if next_page_token == page_token:
+        raise SteamshipError(
+            message=f"The listing returned page token {page_token} twice; stopping to avoid an endless loop."
+        )
@@ -0,0 +1,172 @@
+"""An on-disk, content-addressed cache of raw file bytes which several processes can share."""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple, Union
+
+# If set, raw file contents are cached in this directory unless another cache is configured.
+RAW_CACHE_DIR_ENV = "STEAMSHIP_RAW_CACHE_DIR"
+
+DEFAULT_RAW_CACHE_MAX_BYTES = 1 << 30
+
+_default_cache: Optional["RawDataCache"] = None
+
+
+class RawDataCache:
+    """Caches raw file contents on disk, keyed by a stable key (a file id, or a URL without its signature)
+    plus the version of the contents, an engine- or storage-provided ETag.
+
+    Contents are stored once per SHA-256 digest, however many keys refer to them. Every write goes to a
+    temporary file which is then renamed into place, so processes sharing the directory never see a partial
+    entry. Once the stored contents exceed `max_bytes`, the least recently read are evicted.
+
+    Callers revalidate with the ETag of the cached entry, e.g. with an `If-None-Match` header, and read the
+    cached contents only when the server confirms they are current.
+
+    The size of the cache is only measured, by listing its directory, on the first write and once the bytes
+    written since then take it over `max_bytes`; between scans a running total is kept. Writes by other
+    processes sharing the directory are picked up by the next scan.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = None,
+        max_bytes: int = DEFAULT_RAW_CACHE_MAX_BYTES,
+    ):
+        self.directory = Path(
+            directory
+            if directory is not None
+            else Path(tempfile.gettempdir()) / "steamship-raw-cache"
+        )
+        self.max_bytes = max_bytes
+        self._total_bytes: Optional[
+            int
+        ] = None  # As of the last scan, plus the writes since; None before
+
+    def _ref_path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / "refs" / digest[:2] / f"{digest}.json"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.directory / "blobs" / digest[:2] / digest
+
+    def open(self, key: str) -> Optional[Tuple[str, BinaryIO]]:
+        """Returns the ETag of the contents cached under `key` and an open binary file of them, or None.
+
+        The file stays readable even if the entry is evicted meanwhile; the caller must close it.
+        """
+        try:
+            with open(self._ref_path(key)) as f:
+                ref = json.load(f)
+            blob = self._blob_path(ref["sha256"])
+            contents = open(blob, "rb")
+        except (OSError, ValueError, KeyError):
+            return None
+        try:
+            os.utime(blob)  # Marks the contents as recently used
+        except OSError:
+            pass
+        return ref["etag"], contents
+
+    def get(self, key: str, etag: str) -> Optional[bytes]:
+        """Returns the contents cached under `key` if they have the version `etag`, or None."""
+        entry = self.open(key)
+        if entry is None:
+            return None
+        cached_etag, contents = entry
+        with contents:
+            return contents.read() if cached_etag == etag else None
+
+    def put(self, key: str, etag: str, data: bytes) -> None:
+        """Caches `data` as the contents of `key` at version `etag`."""
+        for _ in self.store(key, etag, [data]):
+            pass
+
+    def store(self, key: str, etag: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Passes `chunks` through, caching them as the contents of `key` at version `etag` once the last one
+        has been read. Nothing is cached if iteration stops early or fails."""
+        blobs = self.directory / "blobs"
+        blobs.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        written = 0
+        with tempfile.NamedTemporaryFile(dir=blobs, suffix=".tmp", delete=False) as f:
+            try:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    f.write(chunk)
+                    written += len(chunk)
+                    yield chunk
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+        blob = self._blob_path(digest.hexdigest())
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not blob.exists()
+        os.replace(f.name, blob)
+        self._write_ref(key, {"key": key, "etag": etag, "sha256": digest.hexdigest()})
+        if self._total_bytes is not None and is_new:
+            self._total_bytes += written
+        if self._total_bytes is None or self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def _write_ref(self, key: str, ref: dict) -> None:
+        path = self._ref_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=path.parent, suffix=".tmp", delete=False) as f:
+            json.dump(ref, f)
+        os.replace(f.name, path)
+
+    def size(self) -> int:
+        """The number of bytes of cached contents."""
+        return sum(size for _, size, _ in self._blobs())
+
+    def _blobs(self) -> Iterator[Tuple[float, int, Path]]:
+        for directory in (self.directory / "blobs").glob("??"):
+            for entry in os.scandir(directory):
+                if entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:  # Evicted by another process
+                    continue
+                yield stat.st_mtime, stat.st_size, Path(entry.path)
+
+    def evict(self) -> int:
+        """Deletes the least recently read contents until at most `max_bytes` remain, returning the number
+        of bytes freed. Keys whose contents were evicted become misses."""
+        blobs = sorted(self._blobs())
+        total = sum(size for _, size, _ in blobs)
+        excess = total - self.max_bytes
+        freed = 0
+        for _, size, path in blobs:
+            if freed >= excess:
+                break
+            try:
+                path.unlink()
+                freed += size
+            except OSError:
+                pass
+        self._total_bytes = total - freed
+        if freed:
+            logging.debug(f"Evicted {freed} bytes from the raw data cache in {self.directory}.")
+        return freed
+
+
+def set_default_raw_cache(cache: Optional[RawDataCache]) -> None:
+    """Sets the cache `File.raw` and `RawDataPluginInput` use when they are not given one."""
+    global _default_cache
+    _default_cache = cache
+
+
+def default_raw_cache() -> Optional[RawDataCache]:
+    """The cache set with `set_default_raw_cache`, else one in the `STEAMSHIP_RAW_CACHE_DIR` directory if that
+    environment variable is set, else None: caching is opt-in."""
+    global _default_cache
+    if _default_cache is None and os.getenv(RAW_CACHE_DIR_ENV):
+        _default_cache = RawDataCache(os.getenv(RAW_CACHE_DIR_ENV))
+    return _default_cache
@@ -1,19 +1,21 @@
+import hashlib
 import logging
 import urllib
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Optional
 from urllib.parse import parse_qs
 
 import requests
 
 from steamship import SteamshipError
+from steamship.utils.raw_cache import RawDataCache
 from steamship.utils.url import apply_localstack_url_fix
 
 # If this isn't present, Localstack won't show logs
 logging.getLogger().setLevel(logging.INFO)
 
 
-def url_to_bytes(url: str) -> bytes:
+def url_to_bytes(url: str, cache: RawDataCache = None) -> bytes:
     """
     Downloads the Signed URL and returns the contents as bytes.
 
@@ -22,13 +24,30 @@ def url_to_bytes(url: str) -> bytes:
       * Any required manipulations for URL signed URLs
       * Any required manipulations for localstack-based environments
 
+    With a `cache`, the contents are cached under the URL without its query string, which stays the same when the
+    URL is signed again, and the ETag the storage returned. Later downloads send that ETag as `If-None-Match` and
+    read the cached contents if the storage answers that they have not changed.
+
     Note that the base API Client does not use this method on purpose: in the event of error code, it inspects the
     contents of the response for a SteamshipError.
     """
     url = apply_localstack_url_fix(url)
     logging.info(f"Downloading: {url}.")
 
-    resp = requests.get(url)
+    key = url.split("?", 1)[0]
+    cached = cache.open(key) if cache is not None else None
+    headers = {"If-None-Match": cached[0]} if cached is not None else None
+    try:
+        resp = requests.get(url, headers=headers)
+        if resp.status_code == 304 and cached is not None:
+            logging.info(f"Read the unchanged contents of {key} from the raw data cache.")
+            return cached[1].read()
+    finally:
+        if cached is not None:
+            cached[1].close()
+
+    if cache is not None and resp.status_code == 200 and resp.headers.get("ETag"):
+        cache.put(key, resp.headers["ETag"], resp.content)
     if resp.status_code != 200:
         # TODO: At least Localstack seend to reply with HTTP 200 even if the file isn't found!
         # The full response contains:
@@ -63,17 +82,37 @@ def download_from_signed_url(url: str, to_file: Path = None) -> Path:
     return Path(to_file)
 
 
+def stream_from_signed_url(url: str, to: BinaryIO, chunk_size: int = 1 << 20) -> str:
+    """
+    Streams the contents of the Signed URL into the binary file object `to`, `chunk_size` bytes at a time, so that
+    large downloads are never held in memory. Returns the hex SHA-256 digest of the contents.
+    """
+    url = apply_localstack_url_fix(url)
+    logging.info(f"Streaming: {url}.")
+
+    digest = hashlib.sha256()
+    with requests.get(url, stream=True) as resp:
+        if resp.status_code != 200:
+            raise SteamshipError(
+                message=f"There was an error downloading from the signed url: {url}. HTTP {resp.status_code}. Content: {resp.text}"
+            )
+        for chunk in resp.iter_content(chunk_size=chunk_size):
+            digest.update(chunk)
+            to.write(chunk)
+    return digest.hexdigest()
+
+
 def upload_to_signed_url(url: str, _bytes: Optional[bytes] = None, filepath: Optional[Path] = None):
     """
     Uploads either the bytes or filepath contents to the provided Signed URL.
+
+    When uploading a file to AWS, its contents are streamed from disk rather than read into memory.
     """
 
     if _bytes is not None:
         logging.info(f"Uploading provided bytes to: {url}")
     elif filepath is not None:
         logging.info(f"Uploading file at {filepath} to: {url}")
-        with open(filepath, "rb") as f:
-            _bytes = f.read()
     else:
         raise SteamshipError(
             message="Unable to upload data to signed URL -- neither a filepath nor bytes were provided.",
@@ -84,14 +123,20 @@ def upload_to_signed_url(url: str, _bytes: Optional[bytes] = None, filepath: Opt
 
     if "amazonaws.com" in parsed_url.netloc:
         # When uploading to AWS Production, the format of the URL should be https://BUCKET.DOMAIN/KEY
-        http_response = requests.put(
-            url, data=_bytes, headers={"Content-Type": "application/octet-stream"}
-        )
+        headers = {"Content-Type": "application/octet-stream"}
+        if _bytes is not None:
+            http_response = requests.put(url, data=_bytes, headers=headers)
+        else:
+            with open(filepath, "rb") as f:
+                http_response = requests.put(url, data=f, headers=headers)
     else:
         # When uploading to AWS Localstack, the format of the URL should be https://DOMAIN/BUCKET
         # And we must, in addition, re-format the POST request. This appears to be a quick of using Localstack
         # and here should be considered a special case to enable testing.
         logging.info("Space.upload_to_signed_url is using the LOCALSTACK upload strategy.")
+        if _bytes is None:
+            with open(filepath, "rb") as f:
+                _bytes = f.read()
 
         params = parse_qs(parsed_url.query)
         params = {p: params[p][0] for p in params}
@@ -0,0 +1,136 @@
+"""Wire encodings for embedding vectors, and optional NumPy support.
+
+Embeddings travel as JSON lists of decimal numbers by default. The binary encodings pack a vector as
+little-endian IEEE 754 floats and base64 the result: float32 is about a third of the size of the JSON text
+and float16 about a sixth, and neither requires parsing one Python float per component.
+
+NumPy is an optional dependency (``pip install steamship[numpy]``). The encodings work without it; it is
+only required when vectors are requested as ``numpy.ndarray``.
+"""
+
+import base64
+import struct
+import sys
+from array import array
+from enum import Enum
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+from steamship.base.error import SteamshipError
+
+Vector = Union[List[float], Any]  # A list of floats or a 1-d numpy.ndarray
+
+
+class EmbeddingEncoding(str, Enum):
+    """How embedding vectors are represented in a request or response body."""
+
+    JSON = "json"  # A JSON list of numbers
+    FLOAT32 = "float32"  # Base64 of little-endian float32 values
+    FLOAT16 = "float16"  # Base64 of little-endian float16 values
+
+
+_NUMPY_DTYPES = {
+    EmbeddingEncoding.FLOAT32: "<f4",
+    EmbeddingEncoding.FLOAT16: "<f2",
+}
+
+
+def import_numpy() -> Any:
+    """Imports NumPy, raising a SteamshipError with installation instructions if it is not available."""
+    try:
+        import numpy
+    except ImportError as error:
+        raise SteamshipError(
+            message="This operation requires NumPy, which is not installed.",
+            suggestion="Install the optional dependency with `pip install steamship[numpy]`.",
+            error=error,
+        )
+    return numpy
+
+
+def is_ndarray(obj: Any) -> bool:
+    """Returns whether `obj` is a numpy.ndarray, without importing NumPy."""
+    return type(obj).__name__ == "ndarray" and type(obj).__module__ == "numpy"
+
+
+def _pack(vector: Sequence[float], encoding: EmbeddingEncoding) -> bytes:
+    if is_ndarray(vector):
+        return vector.astype(_NUMPY_DTYPES[encoding], copy=False).tobytes()
+    if encoding == EmbeddingEncoding.FLOAT16:
+        return struct.pack(f"<{len(vector)}e", *vector)
+    packed = array("f", vector)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack(raw: bytes, encoding: EmbeddingEncoding) -> List[float]:
+    if encoding == EmbeddingEncoding.FLOAT16:
+        return list(struct.unpack(f"<{len(raw) // 2}e", raw))
+    unpacked = array("f")
+    unpacked.frombytes(raw)
+    if sys.byteorder == "big":
+        unpacked.byteswap()
+    return unpacked.tolist()
+
+
+def encode_embedding(
+    embedding: Optional[Vector], encoding: Optional[EmbeddingEncoding] = None
+) -> Union[None, List[float], str]:
+    """Encodes a vector for transport. Strings are assumed to be encoded already and are passed through."""
+    if embedding is None or isinstance(embedding, str):
+        return embedding
+    encoding = EmbeddingEncoding(encoding or EmbeddingEncoding.JSON)
+    if encoding == EmbeddingEncoding.JSON:
+        return embedding.tolist() if is_ndarray(embedding) else embedding
+    return base64.b64encode(_pack(embedding, encoding)).decode("ascii")
+
+
+def decode_embedding(
+    data: Union[None, List[float], str],
+    encoding: Optional[EmbeddingEncoding] = None,
+    as_numpy: bool = False,
+) -> Optional[Vector]:
+    """Decodes a vector received over the wire into a list of floats, or a float32 numpy.ndarray.
+
+    JSON lists are accepted whatever `encoding` says, since a server may not support the requested encoding.
+    """
+    if data is None:
+        return None
+    if isinstance(data, str):
+        encoding = EmbeddingEncoding(encoding or EmbeddingEncoding.JSON)
+        if encoding == EmbeddingEncoding.JSON:
+            raise SteamshipError(
+                message="Received an encoded embedding, but no binary embedding encoding was requested."
+            )
+        raw = base64.b64decode(data)
+        if not as_numpy:
+            return _unpack(raw, encoding)
+        np = import_numpy()
+        return np.frombuffer(raw, dtype=_NUMPY_DTYPES[encoding]).astype(np.float32)
+    if as_numpy:
+        np = import_numpy()
+        return np.asarray(data, dtype=np.float32)
+    return data.tolist() if is_ndarray(data) else data
+
+
+def top_k(scores: Any, k: int) -> Tuple[Any, Any]:
+    """Returns the column indices and values of the `k` highest scores of each row of `scores`, best first.
+
+    Uses `argpartition`, so only the `k` selected scores of each row are sorted.
+    """
+    np = import_numpy()
+    n = scores.shape[1]
+    k = min(k, n)
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(scores.dtype)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape)
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    return (
+        np.take_along_axis(candidates, order, axis=1),
+        np.take_along_axis(candidate_scores, order, axis=1),
+    )
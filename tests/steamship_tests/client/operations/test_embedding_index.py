@@ -270,3 +270,18 @@ def test_empty_queries():
         search_results = index.search("")
         # noinspection PyUnresolvedReferences
         assert len(search_results.data.items) == 1
+
+
+def test_insert_many_batched():
+    steamship = get_steamship_client()
+    plugin_instance = PluginInstance.create(steamship, plugin_handle=_TEST_EMBEDDER).data
+    with random_index(steamship, plugin_instance.handle) as index:
+        values = [f"Orange number {i}" for i in range(10)]
+        res = index.insert_many(values, batch_size=3, max_concurrency=2)
+        assert res.error is None
+        assert len(res.data.item_ids) == len(values)
+        index.embed().wait()
+
+        task = index.list_items()
+        assert task.error is None
+        assert len(task.data.items) == len(values)
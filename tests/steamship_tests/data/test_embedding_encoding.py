@@ -0,0 +1,45 @@
+import pytest
+from steamship_tests.utils.fake_client import FakeClient
+
+from steamship import EmbeddingIndex
+from steamship.base import Response
+from steamship.data.embeddings import EmbeddedItem, IndexInsertResponse, ListItemsResponse
+from steamship.utils.vectors import EmbeddingEncoding, encode_embedding
+
+np = pytest.importorskip("numpy")
+
+
+def test_insert_many_encodes_numpy_embeddings():
+    requests = []
+
+    def _handler(operation, payload, expect):
+        requests.append(payload)
+        return Response(expect=expect, data_=IndexInsertResponse(item_ids=[]))
+
+    index = EmbeddingIndex(client=FakeClient(_handler), id="index")
+    item = EmbeddedItem(value="a", embedding=np.array([1.0, 2.0], dtype=np.float32))
+    index.insert_many([item], embedding_encoding=EmbeddingEncoding.FLOAT32)
+    sent = requests[0].dict(by_alias=True)
+    assert sent["embeddingEncoding"] == EmbeddingEncoding.FLOAT32
+    assert sent["items"][0]["embedding"] == encode_embedding([1.0, 2.0], EmbeddingEncoding.FLOAT32)
+
+    index.insert_many([item])
+    assert requests[1].items[0].embedding == [1.0, 2.0]
+
+
+def test_list_items_decodes_embeddings():
+    def _handler(operation, payload, expect):
+        assert payload.embedding_encoding == EmbeddingEncoding.FLOAT16
+        items = [
+            EmbeddedItem(
+                value="a", embedding=encode_embedding([1.0, 0.5], EmbeddingEncoding.FLOAT16)
+            ),
+            EmbeddedItem(value="b", embedding=[0.0, 2.0]),
+        ]
+        return Response(expect=expect, data_=ListItemsResponse(items=items))
+
+    index = EmbeddingIndex(client=FakeClient(_handler), id="index")
+    items = index.list_items(embedding_encoding=EmbeddingEncoding.FLOAT16, as_numpy=True).data.items
+    assert all(item.embedding.dtype == np.float32 for item in items)
+    assert items[0].embedding.tolist() == [1.0, 0.5]
+    assert items[1].embedding.tolist() == [0.0, 2.0]
@@ -0,0 +1,189 @@
+import threading
+
+import pytest
+from steamship_tests.utils.fake_client import FakeClient
+
+from steamship import EmbeddingIndex, SteamshipError
+from steamship.base import Response
+from steamship.base.tasks import Task, TaskState
+from steamship.data.embeddings import (
+    DeleteSnapshotsResponse,
+    IndexInsertResponse,
+    IndexSnapshotResponse,
+    ListSnapshotsResponse,
+)
+from steamship.data.snapshot_policy import SnapshotPolicy
+
+
+class _Engine:
+    """Creates snapshots as tasks which stay running until `finish` is called, unless `instant` is set."""
+
+    def __init__(self):
+        self.instant = False
+        self.created = 0
+        self.snapshots = []
+        self.tasks = {}
+        self.deleted = []
+
+    def finish(self):
+        for task in self.tasks.values():
+            task.state = TaskState.succeeded
+
+    def handle(self, operation, payload, expect):
+        if operation == "embedding-index/item/create":
+            return Response(expect=expect, data_=IndexInsertResponse(item_ids=[]))
+        if operation == "embedding-index/snapshot/create":
+            snapshot_id = f"s{self.created}"
+            self.created += 1
+            self.snapshots.append(snapshot_id)
+            state = TaskState.succeeded if self.instant else TaskState.running
+            self.tasks[snapshot_id] = Task(task_id=snapshot_id, state=state)
+            return Response(
+                expect=expect,
+                task=self.tasks[snapshot_id].copy(),
+                data_=IndexSnapshotResponse(snapshot_id=snapshot_id),
+                client=self.client,
+            )
+        if operation == "task/status":
+            return Response(expect=expect, task=self.tasks[payload.task_id].copy())
+        if operation == "embedding-index/snapshot/list":
+            snapshots = [IndexSnapshotResponse(snapshot_id=s) for s in self.snapshots]
+            return Response(expect=expect, data_=ListSnapshotsResponse(snapshots=snapshots))
+        assert operation == "embedding-index/snapshot/delete"
+        self.snapshots.remove(payload.snapshot_id)
+        self.deleted.append(payload.snapshot_id)
+        return Response(expect=expect, data_=DeleteSnapshotsResponse())
+
+    def index(self) -> EmbeddingIndex:
+        self.client = FakeClient(self.handle)
+        return EmbeddingIndex(client=self.client, id="index")
+
+
+def test_snapshots_are_coalesced_and_pruned():
+    engine = _Engine()
+    index = engine.index()
+    policy = index.enable_auto_snapshot(every_items=10, retain=2)
+
+    index.insert_many([f"item {i}" for i in range(30)], batch_size=5)
+    assert engine.snapshots == ["s0"]  # Due twice more, but s0 was still running.
+    assert policy.pending_items == 20
+
+    engine.finish()
+    index.insert("one more")
+    assert engine.snapshots == ["s0", "s1"]
+    assert policy.pending_items == 0
+
+    engine.finish()
+    index.insert_many([f"more {i}" for i in range(10)], batch_size=10)
+    assert engine.snapshots == ["s0", "s1", "s2"]  # s2 is still running, so it does not count
+    assert engine.deleted == []
+
+    engine.finish()
+    engine.instant = True
+    index.insert("last")
+    index.flush_snapshots()
+    assert engine.snapshots == ["s2", "s3"]
+    assert engine.deleted == ["s0", "s1"]
+    assert policy.snapshots_created == 4
+
+
+def test_a_failed_snapshot_does_not_prune_the_last_completed_one():
+    engine = _Engine()
+    index = engine.index()
+    index.enable_auto_snapshot(every_items=1, retain=1)
+
+    index.insert("a")
+    engine.finish()
+    index.insert("b")
+    engine.tasks["s1"].state = TaskState.failed
+    index.insert("c")
+    assert engine.snapshots == ["s0", "s1", "s2"]
+    assert engine.deleted == []
+
+    engine.finish()
+    index.flush_snapshots()
+    assert engine.snapshots == ["s1", "s2"]  # The failed s1 was not recorded, so it is left alone
+    assert engine.deleted == ["s0"]
+
+
+def test_inserts_count_once_their_task_succeeds():
+    engine = _Engine()
+    index = engine.index()
+    policy = index.enable_auto_snapshot(every_items=2, retain=None)
+    handle = engine.handle
+
+    def _handle(operation, payload, expect):
+        if operation == "embedding-index/item/create":
+            return Response(expect=expect, task=Task(task_id="insert", state=TaskState.running))
+        return handle(operation, payload, expect)
+
+    index.client._handler = _handle
+    a, b = index.insert("a"), index.insert("b")
+    assert policy.pending_items == 0 and engine.snapshots == []
+
+    a.task.state, b.task.state = TaskState.succeeded, TaskState.failed
+    c = index.insert("c")
+    assert policy.pending_items == 1 and engine.snapshots == []  # The failed insert is not counted
+
+    c.task.state = TaskState.succeeded
+    index.insert("d")
+    assert engine.snapshots == ["s0"]
+
+
+def test_inserts_are_not_held_up_while_snapshots_are_deleted():
+    engine = _Engine()
+    engine.instant = True
+    index = engine.index()
+    index.enable_auto_snapshot(every_items=1, retain=1)
+    handle = engine.handle
+    deleting, release = threading.Event(), threading.Event()
+
+    def _handle(operation, payload, expect):
+        if operation == "embedding-index/snapshot/delete":
+            deleting.set()
+            release.wait(timeout=5)
+        return handle(operation, payload, expect)
+
+    index.client._handler = _handle
+    index.insert("a")
+    index.insert("b")
+    pruning = threading.Thread(target=index.insert, args=("c",))
+    pruning.start()
+    assert deleting.wait(timeout=5)
+
+    inserting = threading.Thread(target=index.insert, args=("d",))
+    inserting.start()
+    inserting.join(timeout=2)
+    assert not inserting.is_alive()  # Did not wait for the deletion
+
+    release.set()
+    pruning.join(timeout=5)
+    index.flush_snapshots()
+    assert engine.deleted[0] == "s0"
+
+
+def test_snapshot_after_seconds_of_activity():
+    engine = _Engine()
+    index = engine.index()
+    now = [0.0]
+    index._snapshot_policy = SnapshotPolicy(
+        every_items=None, every_seconds=5, retain=None, clock=lambda: now[0]
+    )
+
+    index.insert("a")
+    now[0] = 4
+    index.insert("b")
+    assert engine.snapshots == []
+    now[0] = 5
+    index.insert("c")
+    assert engine.snapshots == ["s0"]
+
+    index.disable_auto_snapshot()
+    index.insert("d")
+    index.flush_snapshots()
+    assert engine.snapshots == ["s0"]
+
+
+def test_policy_needs_a_trigger():
+    with pytest.raises(SteamshipError):
+        SnapshotPolicy(every_items=None, every_seconds=None)
@@ -0,0 +1,79 @@
+import pytest
+from steamship_tests.utils.fake_client import FakeClient
+
+from steamship import EmbeddingIndex, SteamshipError
+from steamship.base import Response
+from steamship.data.embeddings import EmbeddedItem, IndexInsertResponse, IndexItemId
+
+
+def _index(fail_on_batch: int = None):
+    requests = []
+
+    def _handler(operation, payload, expect):
+        assert operation == "embedding-index/item/create"
+        requests.append(payload)
+        if fail_on_batch is not None and len(requests) - 1 == fail_on_batch:
+            return Response(expect=expect, error=SteamshipError(message="Too large"))
+        ids = [IndexItemId(index_id="index", id=item.value) for item in payload.items]
+        return Response(expect=expect, data_=IndexInsertResponse(item_ids=ids))
+
+    return EmbeddingIndex(client=FakeClient(_handler), id="index"), requests
+
+
+def test_insert_many_single_batch():
+    index, requests = _index()
+    res = index.insert_many(["a", "b", "c"])
+    assert len(requests) == 1
+    assert [item.id for item in res.data.item_ids] == ["a", "b", "c"]
+
+
+def test_insert_many_chunks_and_merges_in_order():
+    index, requests = _index()
+    progress = []
+    values = [f"item {i}" for i in range(25)]
+    res = index.insert_many(
+        (value for value in values), batch_size=4, max_concurrency=3, on_progress=progress.append
+    )
+    assert len(requests) == 7
+    assert all(len(req.items) <= 4 for req in requests)
+    assert [item.id for item in res.data.item_ids] == values
+    assert progress[-1].batches_completed == 7
+    assert progress[-1].items_completed == 25
+    assert progress[-1].acknowledged_batches == 7
+
+
+def test_insert_many_chunks_by_bytes():
+    index, requests = _index()
+    index.insert_many(["x" * 100 for _ in range(10)], max_batch_bytes=350)
+    assert len(requests) > 1
+    assert all(len(req.items) <= 3 for req in requests)
+
+
+def test_insert_many_resume():
+    values = [str(i) for i in range(10)]
+    index, requests = _index(fail_on_batch=2)
+    with pytest.raises(SteamshipError) as error:
+        index.insert_many(values, batch_size=2)
+    assert "resume_from_batch=2" in error.value.suggestion
+
+    index, requests = _index()
+    res = index.insert_many(values, batch_size=2, resume_from_batch=2)
+    assert [item.value for req in requests for item in req.items] == values[4:]
+    assert [item.id for item in res.data.item_ids] == values[4:]
+
+
+def test_insert_many_skips_near_duplicates():
+    pytest.importorskip("numpy")
+    from steamship.utils.dedup import MinHashDeduplicator
+
+    footer = "Please consider the environment before printing this email and its attachments"
+    items = [
+        EmbeddedItem(value=footer, external_id="a"),
+        EmbeddedItem(value="An entirely different sentence about shipping", external_id="b"),
+        EmbeddedItem(value=footer + " today", external_id="c"),
+    ]
+    deduplicator = MinHashDeduplicator(threshold=0.7)
+    index, requests = _index()
+    index.insert_many(items, deduplicator=deduplicator)
+    assert [item.external_id for item in requests[0].items] == ["a", "b"]
+    assert deduplicator.duplicates == {"c": "a"}
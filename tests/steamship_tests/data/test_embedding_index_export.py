@@ -0,0 +1,97 @@
+import hashlib
+
+import pytest
+from steamship_tests.utils.fake_client import FakeClient
+
+from steamship import EmbeddingIndex, SteamshipError
+from steamship.base import Response
+from steamship.data.embeddings import EmbeddedItem, ExportSnapshotResponse
+from steamship.data.local_index import LocalEmbeddingIndex
+from steamship.utils import signed_urls
+
+np = pytest.importorskip("numpy")
+
+VECTORS = np.array([[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]], dtype="<f4")
+ITEMS = "".join(
+    EmbeddedItem(id=item_id, value=item_id).json(by_alias=True, exclude_none=True) + "\n"
+    for item_id in ["a", "b", "c"]
+).encode()
+
+
+class _Download:
+    def __init__(self, content: bytes):
+        self.content = content
+        self.status_code = 200
+        self.text = ""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def iter_content(self, chunk_size: int):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    blobs = {"https://s3/vectors": VECTORS.tobytes(), "https://s3/items": ITEMS}
+    monkeypatch.setattr(
+        signed_urls.requests, "get", lambda url, stream=False: _Download(blobs[url])
+    )
+    return blobs
+
+
+def _index(vectors_sha256: str = None) -> EmbeddingIndex:
+    def _handler(operation, payload, expect):
+        assert operation == "embedding-index/snapshot/export"
+        assert payload.snapshot_id is None
+        return Response(
+            expect=expect,
+            data_=ExportSnapshotResponse(
+                snapshot_id="s1",
+                count=3,
+                dimensionality=2,
+                vectors_url="https://s3/vectors",
+                vectors_sha256=vectors_sha256 or hashlib.sha256(VECTORS.tobytes()).hexdigest(),
+                items_url="https://s3/items",
+                items_sha256=hashlib.sha256(ITEMS).hexdigest(),
+            ),
+        )
+
+    return EmbeddingIndex(client=FakeClient(_handler), id="index")
+
+
+def test_export_snapshot(tmp_path, storage):
+    export = _index().export_snapshot(None, tmp_path, chunk_size=5)
+    assert export.snapshot_id == "s1"
+    assert np.array_equal(np.fromfile(tmp_path / "vectors.f32", dtype="<f4").reshape(3, 2), VECTORS)
+    assert (tmp_path / "items.jsonl").read_bytes() == ITEMS
+
+    local = LocalEmbeddingIndex.from_export(tmp_path)
+    assert local.snapshot_id == "s1"
+    assert isinstance(local.vectors, np.memmap)  # The normalized vectors are used in place
+    rows, _ = local.search_vectors(np.array([[0.5, 1.0]]), k=2)
+    assert [local.items[row].id for row in rows[0].tolist()] == ["c", "b"]
+
+
+def test_from_export_normalizes_vectors_for_cosine(tmp_path, storage):
+    _index().export_snapshot(None, tmp_path)
+    (tmp_path / "vectors.f32").write_bytes((VECTORS * 3).tobytes())
+
+    cosine = LocalEmbeddingIndex.from_export(tmp_path)
+    assert not isinstance(cosine.vectors, np.memmap)
+    assert np.allclose(cosine.vectors, VECTORS)
+
+    dot = LocalEmbeddingIndex.from_export(tmp_path, metric="dot")
+    assert isinstance(dot.vectors, np.memmap)
+    rows, scores = dot.search_vectors(np.array([[1.0, 0.0]]), k=1)
+    assert dot.items[rows[0][0]].id == "a" and scores[0][0] == pytest.approx(3.0)
+
+
+def test_export_snapshot_rejects_corrupt_download(tmp_path, storage):
+    with pytest.raises(SteamshipError):
+        _index(vectors_sha256="0" * 64).export_snapshot(None, tmp_path)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,103 @@
+from steamship_tests.utils.fake_client import FakeClient
+
+from steamship import EmbeddingIndex
+from steamship.base import Response, Task, TaskState
+from steamship.data.embeddings import IndexInsertResponse, QueryResult, QueryResults
+from steamship.data.search import Hit
+
+
+def _index():
+    operations = []
+
+    def _handler(operation, payload, expect):
+        operations.append(operation)
+        if operation == "embedding-index/search":
+            hit = Hit(value=payload.query, score=len(operations))
+            return Response(expect=expect, data_=QueryResults(items=[QueryResult(value=hit)]))
+        return Response(expect=expect, data_=IndexInsertResponse(item_ids=[]))
+
+    client = FakeClient(_handler)
+    client.enable_search_cache(ttl_seconds=None)
+    return EmbeddingIndex(client=client, id="index"), operations
+
+
+def test_search_is_cached_per_arguments():
+    index, operations = _index()
+    first = index.search("query", k=2).data
+    second = index.search("query", k=2).data
+    assert operations == ["embedding-index/search"]
+    assert second == first
+    assert second is not first  # Callers receive copies they are free to mutate
+
+    index.search("query", k=3)
+    index.search("query", k=2, include_metadata=True)
+    index.search("query", k=2, use_cache=False)
+    assert len(operations) == 4
+
+    stats = index.client.search_cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 3, 3)
+    assert stats.bytes > 0
+
+
+def test_writes_invalidate_the_index():
+    index, operations = _index()
+    other = EmbeddingIndex(client=index.client, id="other")
+    index.search("query")
+    other.search("query")
+
+    index.insert("new item")
+    index.search("query")
+    other.search("query")
+    assert operations.count("embedding-index/search") == 3
+    assert index.client.search_cache.stats().invalidations == 1
+
+
+def test_searches_are_not_cached_while_a_write_is_running():
+    index, operations = _index()
+    state = [TaskState.running]  # The state of the write's task on the engine
+    handler = index.client._handler
+
+    def _handler(operation, payload, expect):
+        if operation == "embedding-index/item/create":
+            operations.append(operation)
+            task = Task(task_id="task", state=state[0])
+            return Response(expect=expect, task=task, client=index.client)
+        if operation == "task/status":
+            operations.append(operation)
+            return Response(expect=expect, task=Task(task_id="task", state=state[0]))
+        return handler(operation, payload, expect)
+
+    index.client._handler = _handler
+    index.search("query")
+    index.insert("new item")  # Never waited on
+    index.search("query")
+    index.search("query")
+    assert operations.count("embedding-index/search") == 3
+    assert operations.count("task/status") == 2  # Polled once per search
+    assert index.client.search_cache.stats().entries == 0
+
+    state[0] = TaskState.succeeded
+    index.search("query")
+    index.search("query")
+    assert operations.count("embedding-index/search") == 4
+    assert operations.count("task/status") == 3
+    assert index._pending_writes == []
+
+
+def test_only_the_oldest_running_write_is_polled():
+    index, operations = _index()
+    handler = index.client._handler
+
+    def _handler(operation, payload, expect):
+        task = Task(task_id="task", state=TaskState.running)
+        if operation in ("embedding-index/item/create", "task/status"):
+            operations.append(operation)
+            return Response(expect=expect, task=task, client=index.client)
+        return handler(operation, payload, expect)
+
+    index.client._handler = _handler
+    for value in ["a", "b", "c"]:
+        index.insert(value)
+    operations.clear()
+    index.search("query")
+    assert operations == ["task/status", "embedding-index/search"]
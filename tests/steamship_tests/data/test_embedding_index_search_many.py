@@ -0,0 +1,48 @@
+import pytest
+from steamship_tests.utils.fake_client import FakeClient
+
+from steamship import EmbeddingIndex, SteamshipError
+from steamship.base import Response
+from steamship.data.embeddings import QueryResult, QueryResults
+from steamship.data.search import Hit
+
+
+def _index(fail_on_query: str = None):
+    requests = []
+
+    def _handler(operation, payload, expect):
+        assert operation == "embedding-index/search"
+        requests.append(payload)
+        if fail_on_query in payload.queries:
+            return Response(expect=expect, error=SteamshipError(message="Search failed"))
+        items = [
+            QueryResult(value=Hit(value=f"{query} hit {i}", query=query))
+            for query in payload.queries
+            for i in range(payload.k)
+        ]
+        return Response(expect=expect, data_=QueryResults(items=items))
+
+    return EmbeddingIndex(client=FakeClient(_handler), id="index"), requests
+
+
+def test_search_many_batches_and_merges_in_order():
+    index, requests = _index()
+    queries = [f"q{i}" for i in range(23)]
+    batches = []
+    res = index.search_many(
+        (query for query in queries),
+        k=2,
+        batch_size=5,
+        max_concurrency=3,
+        on_batch=lambda start, results: batches.append((start, len(results.items))),
+    )
+    assert len(requests) == 5
+    assert all(len(req.queries) <= 5 for req in requests)
+    assert [item.value.query for item in res.data.items] == [q for q in queries for _ in range(2)]
+    assert sorted(batches) == [(0, 10), (5, 10), (10, 10), (15, 10), (20, 6)]
+
+
+def test_search_many_failure():
+    index, _ = _index(fail_on_query="q7")
+    with pytest.raises(SteamshipError):
+        index.search_many([f"q{i}" for i in range(10)], batch_size=4, max_concurrency=2)
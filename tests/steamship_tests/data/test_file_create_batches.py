@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+from steamship_tests.utils.fake_client import FakeClient
+
+from steamship import Block, File, SteamshipError, Tag
+from steamship.base import Response
+
+
+class _Engine:
+    """Creates files from blocks, placing appended blocks at their offset whatever order they arrive in."""
+
+    def __init__(self, fail_at_offset: int = None):
+        self.requests = []
+        self.blocks = {}  # Position -> text
+        self.tags = []
+        self.fail_at_offset = fail_at_offset
+        self.lock = threading.Lock()
+
+    def _add(self, offset, blocks, tags):
+        for position, block in enumerate(blocks, start=offset):
+            self.blocks[position] = block.text
+        self.tags.extend(tag.name for tag in tags)
+
+    def handle(self, operation, payload, expect):
+        with self.lock:
+            self.requests.append(operation)
+            if operation == "file/create":
+                self._add(0, payload.blocks, payload.tags)
+                blocks = [Block(text=block.text) for block in payload.blocks]
+                return Response(expect=expect, data_=File(id="file-id", handle="h", blocks=blocks))
+            assert operation == "file/append" and payload.id == "file-id"
+            if payload.block_offset is not None and payload.block_offset == self.fail_at_offset:
+                return Response(expect=expect, error=SteamshipError(message="Too many blocks"))
+            self._add(payload.block_offset or 0, payload.blocks, payload.tags)
+            return Response(expect=expect, data_=File(id="file-id"))
+
+
+def _blocks(n: int):
+    return (Block.CreateRequest(text=f"block {i}") for i in range(n))
+
+
+def test_small_files_are_created_in_one_request():
+    engine = _Engine()
+    file = File.create(FakeClient(engine.handle), blocks=list(_blocks(3))).data
+    assert engine.requests == ["file/create"]
+    assert len(file.blocks) == 3 and file.blocks_loaded
+
+
+def test_large_block_streams_are_appended_in_order_in_batches():
+    engine = _Engine()
+    tags = [Tag.CreateRequest(kind="topic", name=f"t{i}") for i in range(250)]
+    file = File.create(
+        FakeClient(engine.handle),
+        blocks=_blocks(1050),
+        tags=tags,
+        batch_size=100,
+        max_concurrency=4,
+    ).data
+
+    assert engine.requests.count("file/create") == 1
+    assert engine.requests.count("file/append") == 10 + 2  # Blocks 100-1049, then tags 100-249
+    assert [engine.blocks[i] for i in range(1050)] == [f"block {i}" for i in range(1050)]
+    assert sorted(engine.tags) == sorted(tag.name for tag in tags)
+    assert (file.id, file.handle) == ("file-id", "h")
+    assert file.blocks == [] and not file.blocks_loaded and not file.tags_loaded
+
+
+def test_batches_are_bounded_by_bytes_and_failures_name_the_file():
+    engine = _Engine(fail_at_offset=4)
+    big = (Block.CreateRequest(text="x" * 1000) for _ in range(10))
+    with pytest.raises(SteamshipError, match="File file-id was created"):
+        File.create(FakeClient(engine.handle), blocks=big, max_batch_bytes=2500, max_concurrency=1)
+    assert engine.requests == ["file/create", "file/append", "file/append"]
+
+
+def test_tags_are_appended_once_every_block_has_been():
+    engine = _Engine()
+    blocks_when_tagged = []
+
+    def _handle(operation, payload, expect):
+        if operation == "file/append" and payload.blocks:
+            time.sleep(0.01)
+        if operation == "file/append" and payload.tags:
+            blocks_when_tagged.append(len(engine.blocks))
+        return engine.handle(operation, payload, expect)
+
+    tags = [Tag.CreateRequest(kind="topic", name=f"t{i}") for i in range(300)]
+    File.create(
+        FakeClient(_handle), blocks=_blocks(500), tags=tags, batch_size=100, max_concurrency=4
+    )
+    assert blocks_when_tagged == [500, 500]
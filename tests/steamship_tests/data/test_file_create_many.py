@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+from steamship_tests.utils.fake_client import FakeClient
+
+from steamship import File, SteamshipError
+from steamship.base import Response
+from steamship.data.file import UploadManifestEntry
+
+
+class _Engine:
+    """Stores files by handle; `fail_on` makes the upload of the file with that name fail."""
+
+    def __init__(self, fail_on: str = None):
+        self.files = {}  # Handle -> file id
+        self.uploads = []
+        self.fail_on = fail_on
+        self.lock = threading.Lock()
+
+    def handle(self, operation, payload, expect):
+        with self.lock:
+            if operation == "file/get":
+                if payload.handle not in self.files:
+                    return Response(expect=expect, error=SteamshipError(message="Not found"))
+                return Response(expect=expect, data_=File(id=self.files[payload.handle]))
+            assert operation == "file/create"
+            if self.fail_on is not None and payload.filename.endswith(self.fail_on):
+                return Response(expect=expect, error=SteamshipError(message="Upload failed"))
+            if payload.handle in self.files:
+                return Response(expect=expect, error=SteamshipError(message="Handle is taken"))
+            self.uploads.append(payload.filename)
+            self.files[payload.handle] = f"file-{len(self.files)}"
+            return Response(expect=expect, data_=File(id=self.files[payload.handle]))
+
+
+@pytest.fixture
+def archive(tmp_path):
+    directory = tmp_path / "archive"
+    (directory / "sub").mkdir(parents=True)
+    for name, content in [("a.txt", "alpha"), ("b.txt", "beta"), ("sub/c.txt", "gamma")]:
+        (directory / name).write_text(content)
+    (directory / "sub" / "copy-of-a.txt").write_text("alpha")
+    return directory
+
+
+def test_create_many_uploads_a_directory_once_per_content(archive, tmp_path):
+    engine = _Engine()
+    reports = []
+    progress = File.create_many(
+        FakeClient(engine.handle),
+        archive,
+        max_concurrency=3,
+        manifest_path=tmp_path / "manifest.jsonl",
+        on_progress=reports.append,
+    )
+    assert sorted(path.rsplit("/", 1)[-1] for path in engine.uploads) == ["a.txt", "b.txt", "c.txt"]
+    assert (progress.files_uploaded, progress.files_skipped) == (3, 1)
+    assert progress.bytes_uploaded == len("alpha") + len("beta") + len("gamma")
+    assert len(reports) == 4 and progress.files_per_second > 0
+
+    with open(tmp_path / "manifest.jsonl") as f:
+        entries = [UploadManifestEntry.parse_raw(line) for line in f]
+    assert sorted(entry.path for entry in entries) == sorted(
+        str(path) for path in archive.rglob("*.txt")
+    )
+    (duplicate,) = [entry for entry in entries if entry.duplicate_of is not None]
+    assert duplicate.duplicate_of == str(archive / "a.txt")
+
+    # Content uploaded before, by any client, is not uploaded again.
+    (archive / "d.txt").write_text("beta")
+    progress = File.create_many(FakeClient(engine.handle), [archive / "d.txt"])
+    assert (progress.files_uploaded, progress.files_skipped) == (0, 1)
+
+    # Without skip_existing there is no lookup, and the conflicting upload is skipped.
+    progress = File.create_many(FakeClient(engine.handle), [archive / "d.txt"], skip_existing=False)
+    assert (progress.files_uploaded, progress.files_skipped) == (0, 1)
+    assert len(engine.uploads) == 3
+
+
+def test_create_many_resumes_from_manifest(archive, tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    engine = _Engine(fail_on="c.txt")
+    paths = [archive / "a.txt", archive / "b.txt", archive / "sub" / "c.txt"]
+    with pytest.raises(SteamshipError):
+        File.create_many(
+            FakeClient(engine.handle), paths, max_concurrency=1, manifest_path=manifest
+        )
+    assert len(engine.uploads) == 2
+
+    engine.fail_on = None
+    progress = File.create_many(
+        FakeClient(engine.handle), paths, max_concurrency=1, manifest_path=manifest
+    )
+    # Listed paths are not revisited.
+    assert (progress.files_uploaded, progress.files_skipped) == (1, 0)
+    assert engine.uploads[-1].endswith("c.txt") and len(engine.uploads) == 3
@@ -0,0 +1,87 @@
+import pytest
+from steamship_tests.utils.fake_client import FakeClient
+
+from steamship import File
+from steamship.base import Response
+from steamship.data import file as file_module
+from steamship.data.file import FileUploadType
+from steamship.data.space import SignedUrl
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    """Accepts PUTs to signed URLs, recording what was uploaded and whether it was streamed from a file."""
+    uploads = []
+
+    class _Stored:
+        status_code = 200
+
+    def _put(url, data=None, headers=None):
+        streamed = hasattr(data, "read")
+        uploads.append((url, data.read() if streamed else data, streamed))
+        return _Stored()
+
+    monkeypatch.setattr("steamship.utils.signed_urls.requests.put", _put)
+    return uploads
+
+
+@pytest.fixture
+def engine():
+    requests = []
+
+    def _handle(operation, payload, expect):
+        requests.append((operation, payload))
+        if operation == "space/createSignedUrl":
+            assert payload.bucket == SignedUrl.Bucket.IMPORTS
+            assert payload.operation == SignedUrl.Operation.WRITE
+            url = f"https://imports.s3.amazonaws.com/{payload.filepath}?X-Amz-Signature=s"
+            return Response(expect=expect, data_=SignedUrl.Response(signed_url=url))
+        assert operation == "file/create"
+        return Response(expect=expect, data_=File(id="file-id"))
+
+    return FakeClient(_handle), requests
+
+
+def test_large_files_are_streamed_to_storage(engine, storage, tmp_path, monkeypatch):
+    client, requests = engine
+    monkeypatch.setattr(file_module, "DIRECT_UPLOAD_THRESHOLD_BYTES", 10)
+    path = tmp_path / "large.txt"
+    path.write_bytes(b"x" * 100)
+
+    assert File.create(client, filename=str(path), mime_type="text/plain").data.id == "file-id"
+    (_, signed_url), (_, req) = requests
+    assert signed_url.filepath.endswith("/large.txt")
+    assert storage == [
+        (
+            f"https://imports.s3.amazonaws.com/{signed_url.filepath}?X-Amz-Signature=s",
+            b"x" * 100,
+            True,
+        )
+    ]
+    assert req.type == FileUploadType.UPLOADED and req.upload_filepath == signed_url.filepath
+    assert req.mime_type == "text/plain"
+
+
+def test_direct_upload_can_be_forced_or_disabled(engine, storage, tmp_path):
+    client, requests = engine
+    File.create(client, content="small", direct_upload=True)
+    assert storage[0][1:] == (b"small", False)
+    assert requests[-1][1].type == FileUploadType.UPLOADED
+
+    path = tmp_path / "small.txt"
+    path.write_text("small")
+    File.create(client, filename=str(path))
+    File.create(client, content="x" * 100, direct_upload=False)
+    assert len(storage) == 1
+    assert [req.type for _, req in requests[-2:]] == [FileUploadType.FILE] * 2
+
+
+def test_the_threshold_counts_the_bytes_of_text(engine, storage, monkeypatch):
+    client, requests = engine
+    monkeypatch.setattr(file_module, "DIRECT_UPLOAD_THRESHOLD_BYTES", 10)
+    File.create(client, content="é" * 5)  # 10 bytes
+    assert storage == [] and requests[-1][1].type == FileUploadType.FILE
+
+    File.create(client, content="é" * 6)  # 6 characters, but 12 bytes
+    assert storage[0][1:] == (("é" * 6).encode("utf-8"), False)
+    assert requests[-1][1].type == FileUploadType.UPLOADED
@@ -0,0 +1,137 @@
+import hashlib
+import json
+
+import pytest
+
+from steamship import File, Steamship, SteamshipError
+from steamship.utils.raw_cache import RawDataCache
+
+CONTENT = bytes(range(256)) * 40
+
+
+class _FakeHttpResponse:
+    """Stands in for a `requests` response which is read in chunks."""
+
+    def __init__(
+        self, status_code: int, body: bytes, content_type: str = "application/octet-stream"
+    ):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = {"Content-Type": content_type}
+        self.content = body
+        self.chunks_read = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size: int):
+        for start in range(0, len(self.content), chunk_size):
+            self.chunks_read += 1
+            yield self.content[start : start + chunk_size]
+
+    def json(self):
+        return json.loads(self.content)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Serves `content` as the raw contents of every file, honouring range requests unless told not to.
+
+    The ETag of the contents is their length; a request which sends it as If-None-Match gets HTTP 304.
+    """
+    calls = []
+    settings = {"honour_ranges": True, "fail": False, "content": CONTENT}
+
+    def _post(url, json=None, headers=None, stream=False, **kwargs):
+        calls.append({"url": url, "headers": headers, "stream": stream})
+        if settings["fail"]:
+            error = {"status": {"state": "failed", "statusMessage": "No such file"}}
+            return _FakeHttpResponse(404, _dumps(error), "application/json")
+        content = settings["content"]
+        etag = f'"{len(content)}"'
+        byte_range = headers.get("Range")
+        if headers.get("If-None-Match") == etag:
+            response = _FakeHttpResponse(304, b"")
+        elif byte_range is None or not settings["honour_ranges"]:
+            response = _FakeHttpResponse(200, content)
+        else:
+            start, end = byte_range[len("bytes=") :].split("-")
+            response = _FakeHttpResponse(206, content[int(start) : int(end) + 1 if end else None])
+        response.headers["ETag"] = etag
+        calls[-1]["response"] = response
+        return response
+
+    monkeypatch.setattr("steamship.base.client.requests.post", _post)
+    return calls, settings
+
+
+def _dumps(value) -> bytes:
+    return json.dumps(value).encode("utf-8")
+
+
+def _file() -> File:
+    return File(client=Steamship(api_key="fake-api-key"), id="file-id")
+
+
+def test_raw_streams_chunks_and_reads_ranges(server):
+    calls, settings = server
+    chunks = _file().raw(stream=True, chunk_size=1000).data
+    assert next(chunks) == CONTENT[:1000]
+    assert calls[0]["stream"] and not calls[0]["response"].closed
+    assert b"".join(chunks) == CONTENT[1000:]
+    assert calls[0]["response"].closed
+
+    assert _file().raw(byte_range=(100, 300)).data == CONTENT[100:300]
+    assert calls[1]["headers"]["Range"] == "bytes=100-299"
+    assert _file().raw(byte_range=(10_000, None)).data == CONTENT[10_000:]
+
+    # A server which ignores the range is read only up to the end of the range.
+    settings["honour_ranges"] = False
+    assert _file().raw(byte_range=(1500, 2500), chunk_size=1000).data == CONTENT[1500:2500]
+    assert calls[-1]["response"].chunks_read == 3
+
+    with pytest.raises(SteamshipError):
+        _file().raw(byte_range=(5, 5))
+
+
+def test_download_verifies_the_checksum_before_replacing_the_target(server, tmp_path):
+    calls, settings = server
+    target = tmp_path / "nested" / "file.bin"
+    sha256 = hashlib.sha256(CONTENT).hexdigest()
+    assert _file().download(target, sha256=sha256, chunk_size=4096) == target
+    assert target.read_bytes() == CONTENT
+
+    with pytest.raises(SteamshipError):
+        _file().download(target, byte_range=(0, 10), sha256=sha256)
+    assert target.read_bytes() == CONTENT
+    assert list(target.parent.iterdir()) == [target]
+
+    settings["fail"] = True
+    with pytest.raises(SteamshipError, match="No such file"):
+        _file().download(tmp_path / "missing.bin")
+    assert not (tmp_path / "missing.bin").exists()
+
+
+def test_raw_reads_unchanged_contents_from_the_cache(server, tmp_path):
+    calls, settings = server
+    cache = RawDataCache(tmp_path / "cache")
+    assert _file().raw(cache=cache).data == CONTENT
+    assert "If-None-Match" not in calls[0]["headers"]
+
+    assert b"".join(_file().raw(stream=True, cache=cache).data) == CONTENT
+    assert calls[1]["headers"]["If-None-Match"] == f'"{len(CONTENT)}"'
+    assert calls[1]["response"].status_code == 304
+
+    settings["content"] = b"changed"
+    assert _file().download(tmp_path / "file.bin", cache=cache).read_bytes() == b"changed"
+    assert _file().raw(cache=cache).data == b"changed"
+    assert calls[-1]["response"].status_code == 304
+    assert _file().raw(byte_range=(0, 3), cache=cache).data == b"cha"
+    assert "If-None-Match" not in calls[-1]["headers"]
@@ -0,0 +1,116 @@
+import pytest
+from steamship_tests.utils.fake_client import FakeClient
+
+from steamship import Block, EmbeddingIndex, File, SteamshipError
+from steamship.base import Response
+from steamship.data.embeddings import (
+    DeleteItemsResponse,
+    EmbeddedItem,
+    IndexInsertResponse,
+    IndexItemId,
+    ListItemsResponse,
+)
+
+
+class _Engine:
+    """Serves a file and an embedding index which stores inserted items in memory."""
+
+    def __init__(self, texts):
+        self.blocks = [Block(id=f"b{i}", text=text) for i, text in enumerate(texts)]
+        self.items = {}
+        self.embedded = []
+        self.deleted = []
+        self.operations = []
+        self.fail_inserts = False
+
+    def handle(self, operation, payload, expect):
+        self.operations.append(operation)
+        if operation == "file/get":
+            return Response(expect=expect, data_=File(id="f", blocks=self.blocks))
+        if operation == "embedding-index/item/list":
+            assert payload.include_embeddings is False
+            items = [
+                item
+                for item in self.items.values()
+                if payload.file_id is None or item.file_id == payload.file_id
+            ]
+            return Response(expect=expect, data_=ListItemsResponse(items=items))
+        if operation == "embedding-index/item/delete":
+            self.deleted.extend(payload.item_ids)
+            for item_id in payload.item_ids:
+                del self.items[item_id]
+            return Response(expect=expect, data_=DeleteItemsResponse(item_ids=payload.item_ids))
+        assert operation == "embedding-index/item/create"
+        if self.fail_inserts:
+            return Response(expect=expect, error=SteamshipError(message="Insert failed"))
+        ids = []
+        for item in payload.items:
+            item_id = f"item{len(self.embedded)}"
+            self.embedded.append(item.value)
+            self.items[item_id] = item.copy(update={"id": item_id})
+            ids.append(IndexItemId(id=item_id))
+        return Response(expect=expect, data_=IndexInsertResponse(item_ids=ids))
+
+
+def test_index_only_embeds_new_or_changed_blocks():
+    engine = _Engine(["one", "two", "three"])
+    client = FakeClient(engine.handle)
+    file = File(client=client, id="f")
+    index = EmbeddingIndex(client=client, id="index")
+
+    file.index(e_index=index)
+    assert engine.embedded == ["one", "two", "three"]
+
+    file.index(e_index=index)
+    assert len(engine.embedded) == 3  # Nothing changed
+
+    engine.blocks[1] = Block(id="b1", text="two, edited")
+    engine.blocks.append(Block(id="b3", text="four"))
+    del engine.blocks[0]
+    file.index(e_index=index)
+    assert engine.embedded[3:] == ["two, edited", "four"]
+    assert engine.deleted == ["item1"]  # The stale item of the edited block
+
+    file.index(e_index=index, remove_deleted_blocks=True)
+    assert len(engine.embedded) == 5
+    assert engine.deleted == ["item1", "item0"]
+    assert sorted(item.value for item in engine.items.values()) == ["four", "three", "two, edited"]
+
+
+def test_stale_items_are_deleted_only_after_their_replacements_are_inserted():
+    engine = _Engine(["one", "two"])
+    client = FakeClient(engine.handle)
+    file = File(client=client, id="f")
+    index = EmbeddingIndex(client=client, id="index")
+    file.index(e_index=index)
+
+    engine.blocks[0] = Block(id="b0", text="one, edited")
+    engine.fail_inserts = True
+    with pytest.raises(SteamshipError):
+        file.index(e_index=index)
+    assert engine.deleted == []
+
+    engine.fail_inserts = False
+    engine.operations.clear()
+    file.index(e_index=index)
+    assert engine.operations[-2:] == ["embedding-index/item/create", "embedding-index/item/delete"]
+    assert engine.deleted == ["item0"]
+
+
+def test_legacy_items_without_a_file_id_are_matched_on_request():
+    engine = _Engine(["one", "two"])
+    engine.items = {
+        "legacy0": EmbeddedItem(id="legacy0", value="one", external_id="b0", external_type="block"),
+        "other": EmbeddedItem(id="other", value="x", external_id="c0", external_type="block"),
+    }
+    client = FakeClient(engine.handle)
+    file = File(client=client, id="f")
+    index = EmbeddingIndex(client=client, id="index")
+
+    file.index(e_index=index, match_legacy_items=True)
+    assert engine.embedded == ["one", "two"]
+    assert engine.deleted == ["legacy0"]
+    assert "other" in engine.items
+
+    file.index(e_index=index)
+    assert len(engine.embedded) == 2
@@ -0,0 +1,181 @@
+import threading
+
+import pytest
+from steamship_tests.utils.fake_client import FakeClient
+
+from steamship import Block, EmbeddingIndex, File, SteamshipError
+from steamship.base import Response
+from steamship.data.embeddings import IndexInsertResponse, ListItemsResponse
+from steamship.data.pipeline import FilePipeline, PipelineStage
+
+
+def _client() -> FakeClient:
+    return FakeClient(lambda operation, payload, expect: Response(expect=expect))
+
+
+def test_files_flow_through_stages_independently():
+    client = _client()
+    second_file_tagged = threading.Event()
+    blocked_waiting = []
+
+    def _upload(name: str) -> File:
+        return File(client=client, id=f"file-{name}")
+
+    def _blockify(file: File) -> File:
+        if file.id == "file-a":
+            # Only returns once file b has gone through the next stage.
+            blocked_waiting.append(second_file_tagged.wait(timeout=5))
+        return file
+
+    def _tag(file: File) -> File:
+        if file.id == "file-b":
+            second_file_tagged.set()
+        return file
+
+    reports = []
+    pipeline = FilePipeline(
+        client,
+        [
+            PipelineStage("upload", _upload, max_concurrency=1),
+            PipelineStage("blockify", _blockify, max_concurrency=2),
+            PipelineStage("tag", _tag, max_concurrency=1),
+        ],
+        on_progress=reports.append,
+    )
+    progress = pipeline.run(["a", "b", "c"])
+    assert blocked_waiting == [True]
+    assert [stage.completed for stage in progress.stages] == [3, 3, 3]
+    assert progress.files_completed == 3
+    assert len(reports) == 9 and reports[-1].stages[-1].queued == 0
+    assert max(report.stages[1].in_flight for report in reports) <= 2
+    assert progress.stages[1].busy_seconds > 0 and progress.stages[0].files_per_second > 0
+
+
+def test_pipeline_resumes_from_checkpoint(tmp_path):
+    client = _client()
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    calls = []
+    failing = {"b"}
+
+    def _stage(name: str):
+        def _run(value):
+            key = value if isinstance(value, str) else value.id
+            calls.append((name, key))
+            if name == "tag" and key in failing:
+                raise ValueError("Tagger unavailable")
+            return value if isinstance(value, File) else File(client=client, id=value)
+
+        return PipelineStage(name, _run, max_concurrency=1)
+
+    def _pipeline() -> FilePipeline:
+        return FilePipeline(
+            client, [_stage("upload"), _stage("tag")], checkpoint_path=checkpoint, max_queued=0
+        )
+
+    with pytest.raises(SteamshipError, match="tag stage failed for b"):
+        _pipeline().run(["a", "b", "c"])
+    completed = set(calls) - {("tag", "b")}
+    assert {("upload", "a"), ("upload", "b"), ("tag", "a")} <= completed
+
+    failing.clear()
+    calls.clear()
+    progress = _pipeline().run(["a", "b", "c"])
+    assert set(calls) == {("upload", "c"), ("tag", "b"), ("tag", "c")} - completed
+    assert all(s.completed + s.skipped == 3 for s in progress.stages)
+    assert progress.stages[-1].skipped == 1
+
+
+def test_ingest_uploads_blockifies_and_tags(tmp_path):
+    operations = []
+
+    def _handle(operation, payload, expect):
+        operations.append((operation, getattr(payload, "plugin_instance", None)))
+        if operation == "file/create":
+            return Response(expect=expect, data_=File(client=client, id=payload.filename))
+        return Response(expect=expect)
+
+    client = FakeClient(_handle)
+    pipeline = FilePipeline.ingest(
+        client, blockify_plugin_instance="blockifier", tag_plugin_instances=["ner", "topics"]
+    )
+    assert [stage.name for stage in pipeline.stages] == [
+        "upload",
+        "blockify",
+        "tag:ner",
+        "tag:topics",
+    ]
+    (tmp_path / "doc.txt").write_text("Some text")
+    assert pipeline.run([tmp_path / "doc.txt"]).files_completed == 1
+    assert operations == [
+        ("file/create", None),
+        ("plugin/instance/blockify", "blockifier"),
+        ("plugin/instance/tag", "ner"),
+        ("plugin/instance/tag", "topics"),
+    ]
+
+
+def test_ingest_resumes_after_the_last_tagger_completed(tmp_path):
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    (tmp_path / "doc.txt").write_text("Some text")
+    failing = {"topics"}
+    tagged = []
+
+    def _handle(operation, payload, expect):
+        if operation == "file/create":
+            return Response(expect=expect, data_=File(client=client, id="file"))
+        tagged.append(payload.plugin_instance)
+        if payload.plugin_instance in failing:
+            return Response(expect=expect, error=SteamshipError(message="Tagger unavailable"))
+        return Response(expect=expect)
+
+    def _run():
+        return FilePipeline.ingest(
+            client, tag_plugin_instances=["ner", "topics"], checkpoint_path=checkpoint
+        ).run([tmp_path / "doc.txt"])
+
+    client = FakeClient(_handle)
+    with pytest.raises(SteamshipError, match="tag:topics stage failed"):
+        _run()
+    assert tagged == ["ner", "topics"]
+
+    failing.clear()
+    tagged.clear()
+    assert _run().files_completed == 1
+    assert tagged == ["topics"]
+
+
+def test_ingest_uses_the_given_space_in_every_stage(tmp_path):
+    posted = []
+
+    class _Client(FakeClient):
+        def post(self, operation, payload=None, expect=None, **kwargs):
+            posted.append((operation, kwargs.get("space_id")))
+            return super().post(operation, payload, expect, **kwargs)
+
+    def _handle(operation, payload, expect):
+        if operation in ("file/create", "file/get"):
+            file = File(client=client, id="file", blocks=[Block(id="b", text="Some text")])
+            return Response(expect=expect, data_=file)
+        if operation == "embedding-index/item/list":
+            return Response(expect=expect, data_=ListItemsResponse(items=[]))
+        if operation == "embedding-index/item/create":
+            return Response(expect=expect, data_=IndexInsertResponse(item_ids=[]))
+        return Response(expect=expect)
+
+    client = _Client(_handle)
+    (tmp_path / "doc.txt").write_text("Some text")
+    FilePipeline.ingest(
+        client,
+        blockify_plugin_instance="blockifier",
+        tag_plugin_instances=["ner"],
+        e_index=EmbeddingIndex(client=client, id="index"),
+        space_id="space",
+    ).run([tmp_path / "doc.txt"])
+    assert {operation for operation, _ in posted} >= {
+        "file/create",
+        "plugin/instance/blockify",
+        "plugin/instance/tag",
+        "file/get",
+        "embedding-index/item/create",
+    }
+    assert all(space_id == "space" for _, space_id in posted)
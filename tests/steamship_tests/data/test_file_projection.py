@@ -0,0 +1,51 @@
+from steamship_tests.utils.fake_client import FakeClient
+
+from steamship import Block, File, Tag
+from steamship.base import Response
+
+
+def _handle(client, operation, payload, expect):
+    """Answers with a file whose blocks and tags are left out, or filtered, as the payload asks."""
+    tags = [Tag(kind="ner", name="person"), Tag(kind="summary", name="short")]
+    if payload.tag_kinds is not None:
+        tags = [tag for tag in tags if tag.kind in payload.tag_kinds]
+    file = {
+        "client": client,
+        "id": "file-id",
+        "handle": "handle",
+        "mimeType": "text/plain",
+        "blocks": [Block(text="Hello").dict(by_alias=True)] if payload.include_blocks else None,
+        "tags": [tag.dict(by_alias=True) for tag in tags] if payload.include_tags else None,
+    }
+    if operation == "file/get":
+        return Response(expect=expect, data_=File.parse_obj({"file": file}))
+    assert operation == "file/list"
+    return Response(expect=expect, data_=File.ListResponse(files=[File.parse_obj(file)]))
+
+
+def _client() -> FakeClient:
+    client = FakeClient(lambda *args: _handle(client, *args))
+    return client
+
+
+def test_get_and_refresh_project_away_blocks_and_tags():
+    client = _client()
+    file = File.get(client, "file-id").data
+    assert len(file.blocks) == 1 and len(file.tags) == 2
+    assert file.blocks_loaded and file.tags_loaded
+
+    file = File.get(client, "file-id", include_blocks=False, include_tags=False).data
+    assert (file.id, file.handle, file.mime_type) == ("file-id", "handle", "text/plain")
+    assert file.blocks == [] and file.tags == []
+    assert not file.blocks_loaded and not file.tags_loaded
+
+    file = file.refresh(tag_kinds=["summary"]).data
+    assert [tag.kind for tag in file.tags] == ["summary"]
+    assert file.blocks_loaded and not file.tags_loaded
+
+
+def test_list_projects_every_file():
+    (file,) = File.list(_client(), include_blocks=False).data.files
+    assert file.blocks == [] and len(file.tags) == 2
+    assert not file.blocks_loaded and file.tags_loaded
+    assert [f.blocks_loaded for f in File.iter_list(_client())] == [True]
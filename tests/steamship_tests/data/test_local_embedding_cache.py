@@ -0,0 +1,78 @@
+import pytest
+from steamship_tests.utils.fake_client import FakeClient
+
+from steamship import Block, File, Tag
+from steamship.base import Response
+from steamship.data.local_index import EmbeddingCache
+from steamship.data.operations.tagger import TagResponse
+from steamship.data.tags import TagKind, TextTag
+
+np = pytest.importorskip("numpy")
+
+VECTORS = {
+    "cats purr": [1.0, 0.0, 0.0],
+    "dogs bark": [0.0, 1.0, 0.0],
+    "fish swim": [0.0, 0.0, 1.0],
+    "kittens": [0.9, 0.1, 0.0],
+    "puppies": [0.1, 0.9, 0.0],
+}
+
+
+class _Embedder:
+    """Answers inline tag requests with fixed embeddings, recording the texts embedded by each request."""
+
+    def __init__(self):
+        self.requests = []
+
+    def handle(self, operation, payload, expect):
+        assert operation == "plugin/instance/tag"
+        texts = [block.text for block in payload.file.blocks]
+        self.requests.append(texts)
+        blocks = [
+            Block(
+                text=text,
+                tags=[
+                    Tag(
+                        kind=TagKind.text,
+                        name=TextTag.Embedding,
+                        value={TextTag.Embedding: VECTORS[text]},
+                    )
+                ],
+            )
+            for text in texts
+        ]
+        return Response(expect=expect, data_=TagResponse(file=File(blocks=blocks)))
+
+
+def test_embed_and_search_embeds_docs_once():
+    embedder = _Embedder()
+    cache = EmbeddingCache()
+    docs = ["cats purr", "dogs bark", "fish swim"]
+
+    results = cache.embed_and_search(FakeClient(embedder.handle), "kittens", docs, "embedder", k=2)
+    assert [item.value.value for item in results.data.items] == ["cats purr", "dogs bark"]
+    assert results.data.items[0].value.index == 0
+    assert results.data.items[0].score == pytest.approx(0.9 / np.linalg.norm([0.9, 0.1]))
+
+    results = cache.embed_and_search(FakeClient(embedder.handle), "puppies", docs, "embedder", k=1)
+    assert results.data.items[0].value.value == "dogs bark"
+    assert embedder.requests == [docs + ["kittens"], ["puppies"]]
+    assert cache.stats().hits == 3
+
+    # Embeddings are cached per plugin instance.
+    cache.embed_and_search(FakeClient(embedder.handle), "puppies", docs[:1], "other-embedder")
+    assert embedder.requests[-1] == ["cats purr", "puppies"]
+
+
+def test_disk_cache_is_shared(tmp_path):
+    embedder = _Embedder()
+    docs = ["cats purr", "dogs bark"]
+    EmbeddingCache(directory=tmp_path).embed_and_search(
+        FakeClient(embedder.handle), "kittens", docs, "embedder"
+    )
+
+    results = EmbeddingCache(directory=tmp_path).embed_and_search(
+        FakeClient(embedder.handle), "puppies", docs + ["fish swim"], "embedder"
+    )
+    assert results.data.items[0].value.value == "dogs bark"
+    assert embedder.requests[-1] == ["fish swim", "puppies"]
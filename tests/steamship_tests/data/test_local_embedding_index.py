@@ -0,0 +1,87 @@
+import pytest
+from steamship_tests.utils.fake_client import FakeClient
+
+from steamship import EmbeddingIndex
+from steamship.base import Response
+from steamship.data.embeddings import EmbeddedItem, ListItemsResponse, ListSnapshotsResponse
+from steamship.data.local_index import LocalEmbeddingIndex, Metric, top_k
+
+np = pytest.importorskip("numpy")
+
+ITEMS = [
+    EmbeddedItem(id="1", value="north", embedding=[0.0, 1.0], external_id="n", metadata='{"a": 1}'),
+    EmbeddedItem(id="2", value="east", embedding=[1.0, 0.0], external_id="e"),
+    EmbeddedItem(id="3", value="north east", embedding=[2.0, 2.0], external_id="ne"),
+]
+QUERIES = {"up": [0.0, 3.0], "right": [1.0, 0.1]}
+
+
+def _embed(texts):
+    return np.array([QUERIES[text] for text in texts], dtype=np.float32)
+
+
+def test_top_k_matches_full_sort():
+    scores = np.random.default_rng(0).normal(size=(5, 100)).astype(np.float32)
+    rows, values = top_k(scores, 7)
+    expected = np.argsort(-scores, axis=1)[:, :7]
+    assert np.array_equal(rows, expected)
+    assert np.allclose(values, np.take_along_axis(scores, expected, axis=1))
+
+    rows, values = top_k(scores, 1000)
+    assert rows.shape == (5, 100)
+
+
+def test_search_cosine():
+    index = LocalEmbeddingIndex(query_embedder=_embed)
+    index.add_items(ITEMS)
+    assert len(index) == 3
+    assert index.vectors.dtype == np.float32
+
+    res = index.search("up", k=2).data
+    assert [item.value.value for item in res.items] == ["north", "north east"]
+    assert res.items[0].score == pytest.approx(1.0)
+    assert res.items[0].value.external_id is None
+    assert res.items[0].value.metadata is None
+
+    res = index.search(["up", "right"], include_metadata=True).data
+    assert [(item.value.query, item.value.value) for item in res.items] == [
+        ("up", "north"),
+        ("right", "east"),
+    ]
+    assert res.items[0].value.external_id == "n"
+    assert res.items[0].value.metadata == {"a": 1}
+
+
+def test_search_dot():
+    index = LocalEmbeddingIndex(metric=Metric.DOT, query_embedder=_embed)
+    index.add_items(ITEMS)
+    res = index.search("up", k=3).data
+    assert [item.value.value for item in res.items] == ["north east", "north", "east"]
+    assert res.items[0].score == pytest.approx(6.0)
+
+
+def test_incremental_growth():
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(1000, 16)).astype(np.float32)
+    index = LocalEmbeddingIndex(metric=Metric.DOT)
+    for start in range(0, 1000, 37):
+        chunk = vectors[start : start + 37]
+        index.add_vectors(chunk, [EmbeddedItem(id=str(start + i)) for i in range(len(chunk))])
+    assert np.array_equal(index.vectors, vectors)
+
+    rows, scores = index.search_vectors(vectors[:10], k=5)
+    expected = np.argsort(-(vectors[:10] @ vectors.T), axis=1)[:, :5]
+    assert np.array_equal(rows, expected)
+
+
+def test_from_index():
+    def _handler(operation, payload, expect):
+        if operation == "embedding-index/snapshot/list":
+            return Response(expect=expect, data_=ListSnapshotsResponse(snapshots=[]))
+        assert operation == "embedding-index/item/list"
+        return Response(expect=expect, data_=ListItemsResponse(items=ITEMS))
+
+    remote = EmbeddingIndex(client=FakeClient(_handler), id="index")
+    index = LocalEmbeddingIndex.from_index(remote, query_embedder=_embed)
+    assert [item.id for item in index.items] == ["1", "2", "3"]
+    assert index.search("right").data.items[0].value.value == "east"
@@ -0,0 +1,77 @@
+import pytest
+
+from steamship import SteamshipError
+from steamship.data.embeddings import EmbeddedItem
+from steamship.data.local_index import LocalEmbeddingIndex, ScalarQuantizer
+from steamship.data.local_index.store import append_rows, save_matrix
+
+np = pytest.importorskip("numpy")
+
+
+def _item(item_id: str, *embedding: float) -> EmbeddedItem:
+    return EmbeddedItem(id=item_id, value=item_id, embedding=list(embedding))
+
+
+def _search_ids(index: LocalEmbeddingIndex, vector, k: int = 10):
+    rows, _ = index.search_vectors(np.asarray([vector], dtype=np.float32), k)
+    return [index.items[row].id for row in rows[0].tolist() if row >= 0]
+
+
+def test_append_rows_in_place(tmp_path):
+    path = tmp_path / "m.npy"
+    save_matrix(path, np.ones((2, 3), dtype=np.float32))
+    size = path.stat().st_size
+    assert append_rows(path, np.zeros((2, 3))) == 4
+    assert path.stat().st_size == size + 2 * 3 * 4
+    assert np.array_equal(np.load(path), np.array([[1] * 3] * 2 + [[0] * 3] * 2, dtype=np.float32))
+
+    with pytest.raises(SteamshipError):
+        append_rows(path, np.zeros((1, 2)))
+
+
+def test_load_mmap_and_append(tmp_path):
+    local = LocalEmbeddingIndex()
+    local.add_items([_item("a", 1, 0), _item("b", 0, 1)])
+    local.save(tmp_path)
+
+    mapped = LocalEmbeddingIndex.load(tmp_path, mmap=True)
+    assert isinstance(mapped._vectors, np.memmap)
+    assert _search_ids(mapped, [1, 0.1]) == ["a", "b"]
+
+    assert LocalEmbeddingIndex.append(tmp_path, [_item("c", 1, 1)]) == 3
+    reloaded = LocalEmbeddingIndex.load(tmp_path, mmap=True)
+    assert [item.id for item in reloaded.items] == ["a", "b", "c"]
+    assert _search_ids(reloaded, [1, 1], k=1) == ["c"]
+
+    # Adding to a mapped index leaves the saved one untouched.
+    reloaded.add_items([_item("d", -1, 0)])
+    assert _search_ids(reloaded, [-1, 0], k=1) == ["d"]
+    assert len(LocalEmbeddingIndex.load(tmp_path)) == 3
+
+
+def test_interrupted_append_is_ignored(tmp_path):
+    local = LocalEmbeddingIndex()
+    local.add_items([_item("a", 1, 0)])
+    local.save(tmp_path)
+    with open(tmp_path / "items.jsonl", "a") as f:
+        f.write(_item("partial", 0, 1).json(by_alias=True) + "\n")
+
+    assert [item.id for item in LocalEmbeddingIndex.load(tmp_path).items] == ["a"]
+    LocalEmbeddingIndex.append(tmp_path, [_item("b", 0, 1)])
+    assert [item.id for item in LocalEmbeddingIndex.load(tmp_path).items] == ["a", "b"]
+
+
+def test_append_to_empty_index(tmp_path):
+    LocalEmbeddingIndex().save(tmp_path)
+    LocalEmbeddingIndex.append(tmp_path, [_item("a", 1, 0), _item("b", 0, 1)])
+    loaded = LocalEmbeddingIndex.load(tmp_path, mmap=True)
+    assert loaded.dimensionality == 2
+    assert _search_ids(loaded, [0, 1], k=1) == ["b"]
+
+
+def test_append_to_quantized_index_fails(tmp_path):
+    local = LocalEmbeddingIndex(quantizer=ScalarQuantizer(train_size=2))
+    local.add_items([_item("a", 1, 0), _item("b", 0, 1)])
+    local.save(tmp_path)
+    with pytest.raises(SteamshipError):
+        LocalEmbeddingIndex.append(tmp_path, [_item("c", 1, 1)])
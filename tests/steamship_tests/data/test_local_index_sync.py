@@ -0,0 +1,104 @@
+import pytest
+from steamship_tests.utils.fake_client import FakeClient
+
+from steamship import EmbeddingIndex
+from steamship.base import Response
+from steamship.data.embeddings import (
+    EmbeddedItem,
+    IndexSnapshotResponse,
+    ListItemChangesResponse,
+    ListItemsResponse,
+    ListSnapshotsResponse,
+)
+from steamship.data.local_index import IvfIndex, LocalEmbeddingIndex
+
+np = pytest.importorskip("numpy")
+
+
+def _item(item_id: str, *embedding: float) -> EmbeddedItem:
+    return EmbeddedItem(id=item_id, value=item_id, embedding=list(embedding))
+
+
+class _Remote:
+    """An engine with a history of snapshots, each recording the items added and removed since the last."""
+
+    def __init__(self):
+        self.snapshots = []  # (snapshot id, added items, removed ids)
+        self.requests = []
+
+    def snapshot(self, added=(), removed=()):
+        self.snapshots.append((f"s{len(self.snapshots)}", list(added), list(removed)))
+
+    def handle(self, operation, payload, expect):
+        self.requests.append(operation)
+        ids = [snapshot_id for snapshot_id, _, _ in self.snapshots]
+        if operation == "embedding-index/snapshot/list":
+            snapshots = [IndexSnapshotResponse(snapshot_id=snapshot_id) for snapshot_id in ids]
+            return Response(expect=expect, data_=ListSnapshotsResponse(snapshots=snapshots))
+        if operation == "embedding-index/item/list":
+            items = {}
+            for _, added, removed in self.snapshots:
+                items.update({item.id: item for item in added})
+                for item_id in removed:
+                    items.pop(item_id, None)
+            return Response(expect=expect, data_=ListItemsResponse(items=list(items.values())))
+        assert operation == "embedding-index/item/changes"
+        start = ids.index(payload.since_snapshot_id) + 1
+        end = ids.index(payload.until_snapshot_id) + 1
+        pages = [
+            ListItemChangesResponse(added_items=added, removed_item_ids=removed)
+            for _, added, removed in self.snapshots[start:end]
+        ]
+        page = int(payload.page_token or 0)
+        if page + 1 < len(pages):
+            pages[page].next_page_token = str(page + 1)
+        return Response(expect=expect, data_=pages[page])
+
+
+def _search_ids(index: LocalEmbeddingIndex, vector, k: int = 10):
+    rows, _ = index.search_vectors(np.asarray([vector], dtype=np.float32), k)
+    return [index.items[row].id for row in rows[0].tolist() if row >= 0]
+
+
+def test_sync_applies_only_changes():
+    remote = _Remote()
+    remote.snapshot(added=[_item("a", 1, 0), _item("b", 0, 1), _item("c", 1, 1)])
+    index = EmbeddingIndex(client=FakeClient(remote.handle), id="index")
+    local = LocalEmbeddingIndex.from_index(index, query_embedder=lambda texts: None)
+    assert local.snapshot_id == "s0" and len(local) == 3
+
+    remote.snapshot(added=[_item("d", -1, 0)], removed=["a"])
+    remote.snapshot(added=[_item("b", 0, -1)])  # Replaces "b"
+    remote.requests.clear()
+    result = local.sync(index)
+
+    assert (result.snapshot_id, result.added, result.removed) == ("s2", 2, 1)
+    assert "embedding-index/item/list" not in remote.requests
+    assert remote.requests.count("embedding-index/item/changes") == 2
+    assert len(local) == 3
+    assert _search_ids(local, [1, 0]) == ["c", "b", "d"]  # "a" was removed
+    assert _search_ids(local, [0, -1], k=1) == ["b"]
+
+    remote.requests.clear()
+    assert local.sync(index).added == 0
+    assert remote.requests == ["embedding-index/snapshot/list"]
+
+
+def test_compaction_keeps_ann_consistent(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(400, 8)).astype(np.float32)
+    items = [EmbeddedItem(id=str(i)) for i in range(400)]
+    local = LocalEmbeddingIndex(ann=IvfIndex(n_lists=4, n_probe=4, train_size=100))
+    local.add_vectors(vectors, items)
+
+    assert local.remove_items([str(i) for i in range(0, 400, 2)]) == 200  # Triggers compaction
+    assert len(local) == len(local.items) == 200
+    rows, _ = local.search_vectors(vectors[1:20:2], 1)
+    assert [local.items[row].id for row in rows[:, 0].tolist()] == [str(i) for i in range(1, 20, 2)]
+
+    local.remove_items(["1"])
+    assert "1" not in _search_ids(local, vectors[1])
+    local.snapshot_id = "s7"
+    local.save(tmp_path)
+    loaded = LocalEmbeddingIndex.load(tmp_path)
+    assert len(loaded) == 199 and loaded.snapshot_id == "s7"
@@ -0,0 +1,70 @@
+import pytest
+
+from steamship.data.embeddings import EmbeddedItem
+from steamship.data.local_index import IvfIndex, LocalEmbeddingIndex, kmeans
+
+np = pytest.importorskip("numpy")
+
+
+def _clustered(n: int, dimensionality: int = 16, clusters: int = 20, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dimensionality)) * 4
+    labels = rng.integers(clusters, size=n)
+    return (centers[labels] + rng.normal(size=(n, dimensionality))).astype(np.float32)
+
+
+def _recall(approximate, exact) -> float:
+    hits = sum(len(set(a) & set(e)) for a, e in zip(approximate.tolist(), exact.tolist()))
+    return hits / exact.size
+
+
+def _items(n: int):
+    return [EmbeddedItem(id=str(i), value=f"item {i}") for i in range(n)]
+
+
+def test_kmeans_separates_clusters():
+    vectors = np.concatenate([np.zeros((50, 2)), np.full((50, 2), 10.0)]).astype(np.float32)
+    centroids = kmeans(vectors, 2)
+    assert sorted(centroids[:, 0].tolist()) == pytest.approx([0.0, 10.0])
+
+
+def test_ivf_is_built_incrementally():
+    vectors = _clustered(3000)
+    queries = _clustered(50, seed=1)
+    exact = LocalEmbeddingIndex()
+    exact.add_vectors(vectors, _items(3000))
+    expected, _ = exact.search_vectors(queries, k=10)
+
+    approximate = LocalEmbeddingIndex(ann=IvfIndex(n_lists=32, n_probe=8, train_size=1000))
+    for start in range(0, 3000, 500):
+        approximate.add_vectors(vectors[start : start + 500], _items(3000)[start : start + 500])
+        if start + 500 < 1000:
+            # Not trained yet: searches are exact.
+            assert not approximate.ann.is_trained
+    assert approximate.ann.is_trained
+
+    rows, _ = approximate.search_vectors(queries, k=10)
+    assert _recall(rows, expected) > 0.9
+
+    approximate.ann.n_probe = 32  # Probing every list is exact
+    rows, _ = approximate.search_vectors(queries, k=10)
+    assert _recall(rows, expected) == 1.0
+
+    rows, scores = approximate.search_vectors(queries[:0], k=10)
+    assert rows.shape == scores.shape == (0, 10)
+
+
+def test_save_and_load(tmp_path):
+    vectors = _clustered(500)
+    index = LocalEmbeddingIndex(ann=IvfIndex(n_lists=8, n_probe=2, train_size=200))
+    index.add_vectors(vectors, _items(500))
+    index.save(tmp_path)
+
+    loaded = LocalEmbeddingIndex.load(tmp_path)
+    assert [item.id for item in loaded.items] == [item.id for item in index.items]
+    assert loaded.ann.is_trained
+    assert np.array_equal(loaded.vectors, index.vectors)
+    for expected, actual in zip(
+        index.search_vectors(vectors[:20], 5), loaded.search_vectors(vectors[:20], 5)
+    ):
+        assert np.array_equal(expected, actual)
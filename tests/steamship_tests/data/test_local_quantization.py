@@ -0,0 +1,87 @@
+import pytest
+
+from steamship.data.embeddings import EmbeddedItem
+from steamship.data.local_index import (
+    IvfIndex,
+    LocalEmbeddingIndex,
+    ProductQuantizer,
+    ScalarQuantizer,
+)
+
+np = pytest.importorskip("numpy")
+
+
+def _clustered(n: int, dimensionality: int = 32, clusters: int = 20, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dimensionality)) * 4
+    labels = rng.integers(clusters, size=n)
+    return (centers[labels] + rng.normal(size=(n, dimensionality))).astype(np.float32)
+
+
+def _recall(approximate, exact) -> float:
+    hits = sum(len(set(a) & set(e)) for a, e in zip(approximate.tolist(), exact.tolist()))
+    return hits / exact.size
+
+
+def _items(n: int):
+    return [EmbeddedItem(id=str(i)) for i in range(n)]
+
+
+def _expected(vectors, queries, k: int = 10):
+    exact = LocalEmbeddingIndex()
+    exact.add_vectors(vectors, _items(len(vectors)))
+    return exact.search_vectors(queries, k)[0], exact.nbytes
+
+
+def test_scalar_quantizer_round_trip():
+    vectors = _clustered(200)
+    quantizer = ScalarQuantizer()
+    quantizer.train(vectors)
+    codes = quantizer.encode(vectors)
+    assert codes.dtype == np.uint8 and codes.shape == vectors.shape
+    assert np.abs(quantizer.decode(codes) - vectors).max() <= quantizer.scale.max()
+
+    queries = vectors[:5]
+    exact = queries @ vectors.T
+    assert quantizer.score(queries, codes) == pytest.approx(exact, abs=0.01 * np.abs(exact).max())
+
+
+@pytest.mark.parametrize(
+    "quantizer,min_recall",
+    [
+        (ScalarQuantizer(train_size=500), 0.9),
+        (ProductQuantizer(n_subvectors=16, train_size=1000), 0.6),
+    ],
+)
+def test_quantized_index_saves_memory(quantizer, min_recall):
+    vectors, queries = _clustered(2000), _clustered(20, seed=1)
+    expected, exact_bytes = _expected(vectors, queries)
+
+    index = LocalEmbeddingIndex(quantizer=quantizer)
+    for start in range(0, 2000, 250):
+        index.add_vectors(vectors[start : start + 250], _items(2000)[start : start + 250])
+    assert quantizer.is_trained
+    assert index.nbytes < exact_bytes / 3
+
+    rows, _ = index.search_vectors(queries, 10)
+    assert _recall(rows, expected) >= min_recall
+
+
+def test_rerank_with_exact_vectors(tmp_path):
+    vectors, queries = _clustered(2000), _clustered(20, seed=1)
+    expected, _ = _expected(vectors, queries)
+
+    index = LocalEmbeddingIndex(
+        quantizer=ProductQuantizer(n_subvectors=4, train_size=1000),
+        ann=IvfIndex(n_lists=16, n_probe=16, train_size=1000),
+        rerank=100,
+    )
+    index.add_vectors(vectors, _items(2000))
+    rows, scores = index.search_vectors(queries, 10)
+    assert _recall(rows, expected) > 0.95
+    assert np.all(np.diff(scores, axis=1) <= 0)
+
+    index.save(tmp_path)
+    loaded = LocalEmbeddingIndex.load(tmp_path)
+    assert loaded.quantizer.is_trained and loaded.rerank == 100
+    assert np.array_equal(loaded.search_vectors(queries, 10)[0], rows)
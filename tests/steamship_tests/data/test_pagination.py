@@ -0,0 +1,33 @@
+from steamship_tests.utils.fake_client import FakeClient
+
+from steamship import EmbeddingIndex, File
+from steamship.base import Response
+from steamship.data.embeddings import EmbeddedItem, ListItemsResponse
+
+
+def test_iter_items_follows_page_tokens():
+    requests = []
+
+    def _handler(operation, payload, expect):
+        assert operation == "embedding-index/item/list"
+        requests.append(payload)
+        start = int(payload.page_token or 0)
+        items = [
+            EmbeddedItem(value=str(i)) for i in range(start, min(start + payload.page_size, 7))
+        ]
+        next_token = str(start + payload.page_size) if start + payload.page_size < 7 else None
+        return Response(
+            expect=expect, data_=ListItemsResponse(items=items, next_page_token=next_token)
+        )
+
+    index = EmbeddingIndex(client=FakeClient(_handler), id="index")
+    assert [item.value for item in index.iter_items(page_size=3)] == [str(i) for i in range(7)]
+    assert [req.page_token for req in requests] == [None, "3", "6"]
+
+
+def test_iter_list_without_pagination_support():
+    # An engine which ignores the page fields answers with everything and no next page token.
+    def _handler(operation, payload, expect):
+        return Response(expect=expect, data_=File.ListResponse(files=[File(id="a"), File(id="b")]))
+
+    assert [file.id for file in File.iter_list(FakeClient(_handler))] == ["a", "b"]
@@ -0,0 +1,74 @@
+import json
+from dataclasses import dataclass
+
+import pytest
+from pydantic import BaseModel
+
+from steamship.data.embeddings import QueryResult, QueryResults
+from steamship.data.search import Hit
+
+
+class _Source(BaseModel):
+    url: str
+    page: int = 0
+
+
+@dataclass
+class _Tags:
+    tags: list
+
+
+def _results(*metadata) -> QueryResults:
+    return QueryResults(
+        items=[
+            QueryResult(value=Hit.parse_obj({"value": str(i), "metadata": m}), score=1.0 / (i + 1))
+            for i, m in enumerate(metadata)
+        ]
+    )
+
+
+def test_metadata_is_decoded_lazily():
+    hit = Hit.parse_obj({"value": "a", "metadata": '{"url": "x"}'})
+    assert not hit._metadata_decoded and hit.raw_metadata == '{"url": "x"}'
+    assert hit.metadata == {"url": "x"}
+    assert hit.metadata is hit.metadata
+
+    assert Hit(metadata="not json").metadata == "not json"
+    assert Hit(metadata={"a": 1}).metadata == {"a": 1}
+    assert Hit().metadata is None
+
+    hit.metadata = {"url": "y"}
+    assert hit.metadata == {"url": "y"}
+    assert hit.copy(deep=True).metadata == {"url": "y"}
+    assert Hit.parse_raw(hit.json(by_alias=True)).metadata == {"url": "y"}
+
+
+def test_decode_metadata_with_schema():
+    results = _results('{"url": "a", "page": 2}', None, '{"url": "c"}')
+    sources = results.decode_metadata(_Source)
+    assert sources == [_Source(url="a", page=2), None, _Source(url="c")]
+    assert results.items[0].value.metadata == {"url": "a", "page": 2}
+
+    assert _results('{"tags": [1]}').decode_metadata(_Tags) == [_Tags(tags=[1])]
+    with pytest.raises(TypeError):
+        _results("{}").decode_metadata(dict)
+
+
+def test_serialization_emits_decoded_metadata():
+    hit = Hit.parse_obj({"value": "a", "metadata": '{"url": "x"}'})
+    assert hit.dict()["metadata"] == {"url": "x"} and "raw_metadata" not in hit.dict()
+    assert hit.dict(by_alias=True)["metadata"] == {"url": "x"}
+    assert json.loads(hit.json())["metadata"] == {"url": "x"}
+
+    results = _results('{"url": "a"}')
+    results.decode_metadata(_Source)
+    assert results.dict()["items"][0]["value"]["metadata"] == {"url": "a"}
+    assert json.loads(results.json(by_alias=True))["items"][0]["value"]["metadata"] == {"url": "a"}
+
+
+def test_scores_array():
+    np = pytest.importorskip("numpy")
+    scores = _results(None, None, None).scores
+    assert scores.dtype == np.float32
+    assert np.allclose(scores, [1.0, 0.5, 1 / 3])
+    assert QueryResults(items=[]).scores.shape == (0,)
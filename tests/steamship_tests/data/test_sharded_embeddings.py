@@ -0,0 +1,135 @@
+import threading
+
+from steamship_tests.utils.fake_client import FakeClient
+
+from steamship import EmbeddingIndex
+from steamship.base import Response
+from steamship.data.embeddings import (
+    DeleteItemsResponse,
+    IndexInsertResponse,
+    IndexItemId,
+    ListItemsResponse,
+    QueryResult,
+    QueryResults,
+)
+from steamship.data.search import Hit
+from steamship.data.sharded_embeddings import ShardedEmbeddingIndex
+
+
+class _Engine:
+    """Holds the items of several indexes; an item's score is the closeness of its number to the query's."""
+
+    def __init__(self):
+        self.items = {}  # index id -> {item id: item}
+        self.lock = threading.Lock()
+        self.next_id = 0
+        self.log = []  # The sizes of inserted batches, interleaved by tests with other events
+
+    def handle(self, operation, payload, expect):
+        with self.lock:
+            if operation == "embedding-index/item/create":
+                self.log.append(len(payload.items))
+                ids = []
+                for item in payload.items:
+                    self.next_id += 1
+                    item_id = f"item-{self.next_id}"
+                    self.items[payload.index_id][item_id] = item.copy(update={"id": item_id})
+                    ids.append(IndexItemId(index_id=payload.index_id, id=item_id))
+                return Response(expect=expect, data_=IndexInsertResponse(item_ids=ids))
+            if operation == "embedding-index/search":
+                results = []
+                for query in payload.queries or [payload.query]:
+                    hits = sorted(
+                        (
+                            (-abs(int(item.value) - int(query)), item)
+                            for item in self.items[payload.id].values()
+                        ),
+                        key=lambda hit: hit[0],
+                        reverse=True,
+                    )[: payload.k]
+                    results.extend(
+                        QueryResult(value=Hit(value=item.value, query=query), score=score)
+                        for score, item in hits
+                    )
+                return Response(expect=expect, data_=QueryResults(items=results))
+            if operation == "embedding-index/item/list":
+                items = list(self.items[payload.id].values())
+                return Response(expect=expect, data_=ListItemsResponse(items=items))
+            assert operation == "embedding-index/item/delete"
+            for item_id in payload.item_ids:
+                del self.items[payload.id][item_id]
+            return Response(expect=expect, data_=DeleteItemsResponse(item_ids=payload.item_ids))
+
+    def index(self, index_id: str) -> EmbeddingIndex:
+        self.items[index_id] = {}
+        return EmbeddingIndex(client=FakeClient(self.handle), id=index_id)
+
+
+def _values(engine: _Engine, index_id: str):
+    return {item.value for item in engine.items[index_id].values()}
+
+
+def test_insert_many_routes_by_key_and_search_merges_top_k():
+    engine = _Engine()
+    sharded = ShardedEmbeddingIndex([engine.index(f"shard-{i}") for i in range(3)])
+    values = [str(i) for i in range(60)]
+    res = sharded.insert_many(values)
+
+    ids = [item_id.id for item_id in res.data.item_ids]
+    assert len(ids) == 60
+    by_id = {id_: item.value for items in engine.items.values() for id_, item in items.items()}
+    assert [by_id[id_] for id_ in ids] == values
+    assert all(len(engine.items[f"shard-{i}"]) > 5 for i in range(3))
+    for value in values:
+        assert value in _values(engine, sharded.shard_for(value).id)
+
+    results = sharded.search("30", k=5).data
+    assert results.items[0].value.value == "30"
+    assert sorted(int(item.value.value) for item in results.items) == [28, 29, 30, 31, 32]
+    assert list(results.scores) == sorted(results.scores, reverse=True)
+
+    results = sharded.search(["10", "50"], k=2).data
+    assert [item.value.query for item in results.items] == ["10", "10", "50", "50"]
+    assert results.items[2].value.value == "50"
+    assert results.items[3].value.value in {"49", "51"}
+
+
+def test_insert_many_streams_items_in_batches_per_shard():
+    engine = _Engine()
+    sharded = ShardedEmbeddingIndex(
+        [engine.index(f"shard-{i}") for i in range(3)], max_concurrency=1
+    )
+
+    def _values():
+        for i in range(60):
+            engine.log.append("read")
+            yield str(i)
+
+    reports = []
+    res = sharded.insert_many(_values(), batch_size=5, on_progress=reports.append)
+    assert engine.log.index(5) < 20  # The first batch was sent long before the input was exhausted
+    batch_sizes = [entry for entry in engine.log if entry != "read"]
+    assert all(size <= 5 for size in batch_sizes) and sum(batch_sizes) == 60
+    assert len(reports) == len(batch_sizes) and reports[-1].items_completed == 60
+    by_id = {id_: item.value for items in engine.items.values() for id_, item in items.items()}
+    assert [by_id[item_id.id] for item_id in res.data.item_ids] == [str(i) for i in range(60)]
+
+    engine.log.clear()
+    sharded.insert_many([str(i) for i in range(60)], batch_size=5, resume_from_batch=4)
+    assert sum(engine.log) == 60 - sum(batch_sizes[:4])
+
+
+def test_add_shards_moves_only_the_items_the_new_shard_owns():
+    engine = _Engine()
+    sharded = ShardedEmbeddingIndex([engine.index(f"shard-{i}") for i in range(3)])
+    sharded.insert_many([str(i) for i in range(200)])
+    before = {value: shard for shard in engine.items for value in _values(engine, shard)}
+
+    moved = sharded.add_shards([engine.index("shard-3")])
+    after = {value: shard for shard in engine.items for value in _values(engine, shard)}
+    assert sorted(after) == sorted(before)
+    changed = [value for value in after if after[value] != before[value]]
+    assert moved == len(changed) == len(engine.items["shard-3"]) > 0
+    assert all(after[value] == "shard-3" for value in changed)
+    assert all(sharded.shard_for(value).id == after[value] for value in after)
+    assert sharded.rebalance() == 0
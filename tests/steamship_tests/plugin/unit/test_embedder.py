@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from steamship import Block, File
+from steamship.app import Response
+from steamship.plugin.config import Config
+from steamship.plugin.embedder import Embedder
+from steamship.plugin.inputs.embedder_plugin_input import EmbedderPluginInput
+from steamship.plugin.outputs.embedded_items_plugin_output import EmbeddedItemsPluginOutput
+from steamship.plugin.service import PluginRequest
+from steamship.utils.vectors import EmbeddingEncoding
+
+
+class _LengthEmbedder(Embedder):
+    def config_cls(self):
+        return Config
+
+    def run(self, request):
+        return Response(
+            data=EmbeddedItemsPluginOutput(
+                embeddings=[[float(len(block.text)), 1.0] for block in request.data.file.blocks]
+            )
+        )
+
+
+def _request(encoding=None) -> dict:
+    data = EmbedderPluginInput(
+        file=File(blocks=[Block(text="ab"), Block(text="abcd")]), embedding_encoding=encoding
+    )
+    return json.loads(PluginRequest(data=data).json(by_alias=True))
+
+
+def test_embedder_output_defaults_to_json():
+    res = _LengthEmbedder().run_endpoint(**_request())
+    assert res.dict(by_alias=True)["data"]["embeddings"] == [[2.0, 1.0], [4.0, 1.0]]
+
+
+def test_embedder_output_uses_requested_encoding():
+    res = _LengthEmbedder().run_endpoint(**_request(EmbeddingEncoding.FLOAT32))
+    wire = json.loads(json.dumps(res.dict(by_alias=True)))["data"]
+    assert wire["embeddingEncoding"] == "float32"
+    assert all(isinstance(embedding, str) for embedding in wire["embeddings"])
+
+    parsed = EmbeddedItemsPluginOutput.parse_obj(wire)
+    assert parsed.embeddings == [[2.0, 1.0], [4.0, 1.0]]
+
+
+def test_embedder_output_accepts_numpy():
+    np = pytest.importorskip("numpy")
+    output = EmbeddedItemsPluginOutput(
+        embeddings=np.ones((2, 3), dtype=np.float32), embedding_encoding=EmbeddingEncoding.FLOAT16
+    )
+    wire = output.dict(by_alias=True)
+    parsed = EmbeddedItemsPluginOutput.parse_obj(wire)
+    assert parsed.embeddings == [[1.0, 1.0, 1.0], [1.0, 1.0, 1.0]]
+    assert json.loads(output.json(by_alias=True)) == wire
+
+    as_lists = EmbeddedItemsPluginOutput(embeddings=np.ones((2, 3), dtype=np.float32))
+    assert json.loads(as_lists.json(by_alias=True))["embeddings"] == [[1.0, 1.0, 1.0]] * 2
@@ -0,0 +1,25 @@
+from typing import Any, Callable, Optional
+
+from pydantic import PrivateAttr
+
+from steamship import Steamship
+from steamship.base import Response
+
+Handler = Callable[[str, Any, Optional[type]], Response]
+
+
+class FakeClient(Steamship):
+    """A Steamship client which answers `post` calls with a local handler instead of the network.
+
+    Used by unit tests which exercise client-side logic (batching, caching, merging) without an engine.
+    The handler receives the operation, the payload and the expected response type.
+    """
+
+    _handler: Handler = PrivateAttr()
+
+    def __init__(self, handler: Handler):
+        super().__init__(api_key="fake-api-key")
+        self._handler = handler
+
+    def post(self, operation: str, payload: Any = None, expect: Any = None, **kwargs) -> Response:
+        return self._handler(operation, payload, expect)
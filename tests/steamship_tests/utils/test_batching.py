@@ -0,0 +1,55 @@
+import threading
+import time
+
+import pytest
+
+from steamship.utils.batching import batched, map_concurrently
+
+
+def test_batched_by_count():
+    assert list(batched(range(7), max_items=3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(batched([], max_items=3)) == []
+
+
+def test_batched_by_bytes():
+    words = ["aaaa", "bb", "cc", "dddddddd", "e"]
+    batches = list(batched(words, max_bytes=5, size_of=len))
+    assert batches == [["aaaa"], ["bb", "cc"], ["dddddddd"], ["e"]]
+
+
+def test_batched_is_lazy():
+    def _gen():
+        yield from range(3)
+        raise AssertionError("The generator should not be drained ahead of the consumer")
+
+    batches = batched(_gen(), max_items=2)
+    assert next(batches) == [0, 1]
+
+
+def test_map_concurrently_bounds_in_flight():
+    lock = threading.Lock()
+    in_flight, peak = 0, 0
+
+    def _work(x):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return x * 2
+
+    results = dict(map_concurrently(_work, range(20), max_concurrency=3))
+    assert results == {i: i * 2 for i in range(20)}
+    assert peak <= 3
+
+
+def test_map_concurrently_raises():
+    def _work(x):
+        if x == 4:
+            raise ValueError("boom")
+        return x
+
+    with pytest.raises(ValueError):
+        list(map_concurrently(_work, range(10), max_concurrency=2))
@@ -0,0 +1,40 @@
+from steamship.utils.cache import LRUCache
+
+
+def test_lru_eviction_and_stats():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.entries) == (2, 1, 1, 2)
+    assert stats.hit_rate == 2 / 3
+
+
+def test_ttl_expiry():
+    now = [0.0]
+    cache = LRUCache(ttl_seconds=10, clock=lambda: now[0])
+    cache.put("a", 1)
+    now[0] = 5
+    assert cache.get("a") == 1
+    now[0] = 11
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_byte_budget_and_invalidation():
+    cache = LRUCache(max_bytes=10, size_of=len)
+    cache.put(("x", 1), "aaaa")
+    cache.put(("x", 2), "bbbb")
+    cache.put(("y", 1), "cccc")  # Over budget: evicts ("x", 1)
+    assert cache.stats().bytes == 8
+    cache.put(("y", 2), "d" * 11)  # Larger than the budget by itself: not stored
+    assert cache.get(("y", 2)) is None
+
+    assert cache.invalidate(lambda key: key[0] == "x") == 1
+    assert cache.get(("y", 1)) == "cccc"
+    assert cache.stats().bytes == 4
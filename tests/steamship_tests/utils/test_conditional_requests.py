@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from steamship import File, Space, Steamship
+
+
+class _FakeHttpResponse:
+    def __init__(self, status_code: int, body: dict = None, headers: dict = None):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.content = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """Serves one file and one space; the file's ETag is its handle, the space only has a Last-Modified."""
+    state = {"handle": "v1", "requests": []}
+
+    def _post(url, json=None, headers=None, **kwargs):
+        state["requests"].append((url.rsplit("/", 2)[-2:], headers))
+        if url.endswith("space/get"):
+            if headers.get("If-Modified-Since") == "Mon, 01 Jan 2024 00:00:00 GMT":
+                return _FakeHttpResponse(304)
+            space = {"space": {"id": "space-id", "handle": "default"}}
+            return _FakeHttpResponse(
+                200, {"data": space}, {"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+            )
+        if url.endswith("file/create"):
+            return _FakeHttpResponse(200, {"data": {"file": {"id": "new"}}}, {"ETag": '"x"'})
+        etag = f'"{state["handle"]}"'
+        if headers.get("If-None-Match") == etag:
+            return _FakeHttpResponse(304)
+        file = {"id": json["id"], "handle": state["handle"], "mimeType": "text/plain"}
+        return _FakeHttpResponse(200, {"data": {"file": file}}, {"ETag": etag})
+
+    monkeypatch.setattr("steamship.base.client.requests.post", _post)
+    return state
+
+
+def test_unchanged_responses_are_revalidated_not_transferred(engine):
+    client = Steamship(api_key="fake-api-key")
+    cache = client.enable_conditional_requests(max_entries=10)
+
+    first = File.get(client, "file-id").data
+    second = File.get(client, "file-id").data
+    assert second == first and second is not first and second.handle == "v1"
+    assert "If-None-Match" not in engine["requests"][0][1]
+    assert engine["requests"][1][1]["If-None-Match"] == '"v1"'
+
+    engine["handle"] = "v2"
+    assert File.get(client, "file-id").data.handle == "v2"
+    assert File.get(client, "other-id").data.id == "other-id"  # Keyed by payload
+    assert cache.stats().hits == 2 and len(cache) == 2
+
+    space = Space.get(client).data
+    assert Space.get(client).data.id == space.id
+    assert engine["requests"][-1][1]["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+
+    File.create(client, content="hello")
+    File.create(client, content="hello")
+    assert "If-None-Match" not in engine["requests"][-1][1]  # Only get and list calls are cached
+
+
+def test_cached_responses_are_not_shared(engine):
+    client = Steamship(api_key="fake-api-key")
+    client.enable_conditional_requests()
+
+    first = File.get(client, "file-id").data
+    first.handle = "changed by the caller"
+    second = File.get(client, "file-id").data
+    assert engine["requests"][1][1]["If-None-Match"] == '"v1"'
+    assert second.handle == "v1" and second.client is not None
+
+
+def test_conditional_requests_are_opt_in(engine):
+    client = Steamship(api_key="fake-api-key")
+    File.get(client, "file-id")
+    File.get(client, "file-id")
+    assert "If-None-Match" not in engine["requests"][1][1]
+
+    client.enable_conditional_requests()
+    File.get(client, "file-id")
+    client.disable_conditional_requests()
+    File.get(client, "file-id")
+    assert client.conditional_cache is None
+    assert "If-None-Match" not in engine["requests"][3][1]
@@ -0,0 +1,44 @@
+import pytest
+
+from steamship.utils.dedup import MinHashDeduplicator, SimHashDeduplicator, shingles
+
+pytest.importorskip("numpy")
+
+FOOTER = (
+    "This message and any attachments are confidential and intended solely for the addressee. "
+    "If you have received it in error, please notify the sender and delete it immediately."
+)
+
+
+def test_shingles():
+    assert shingles("The quick, brown fox!", 2) == ["the quick", "quick brown", "brown fox"]
+    assert shingles("Short", 3) == ["short"]
+
+
+@pytest.mark.parametrize(
+    "deduplicator",
+    [SimHashDeduplicator(max_distance=8, shingle_size=1), MinHashDeduplicator(threshold=0.7)],
+)
+def test_near_duplicates_map_to_the_canonical_text(deduplicator):
+    assert deduplicator.canonical("a", FOOTER) == "a"
+    assert deduplicator.canonical("b", FOOTER.upper()) == "a"  # Exact after normalization
+    assert deduplicator.canonical("c", FOOTER + " Thank you.") == "a"
+    assert deduplicator.canonical("d", "Quarterly revenue grew by twelve percent.") == "d"
+    assert deduplicator.duplicates == {"b": "a", "c": "a"}
+    assert deduplicator.stats.duplicates == 2 and deduplicator.stats.seen == 4
+
+
+def test_distinct_texts_are_kept():
+    deduplicator = MinHashDeduplicator(threshold=0.8)
+    texts = [f"Invoice {i} for order {i * 7} shipped to warehouse {i % 5}" for i in range(200)]
+    kept = list(
+        deduplicator.filter(enumerate(texts), text_of=lambda t: t[1], key_of=lambda t: t[0])
+    )
+    assert len(kept) == 200
+
+    texts = [f"{FOOTER} Reference {i}." for i in range(200)]
+    deduplicator = MinHashDeduplicator(threshold=0.8)
+    kept = list(
+        deduplicator.filter(enumerate(texts), text_of=lambda t: t[1], key_of=lambda t: t[0])
+    )
+    assert len(kept) == 1
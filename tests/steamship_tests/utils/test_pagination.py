@@ -0,0 +1,36 @@
+import pytest
+
+from steamship import SteamshipError
+from steamship.utils.pagination import paginate
+
+
+def _pages(pages):
+    requested = []
+
+    def _fetch_page(page_token):
+        requested.append(page_token)
+        position = int(page_token or 0)
+        next_token = str(position + 1) if position + 1 < len(pages) else None
+        return pages[position], next_token
+
+    return _fetch_page, requested
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_paginate_yields_every_page_in_order(prefetch):
+    fetch_page, requested = _pages([[1, 2], [3], [], [4, 5]])
+    assert list(paginate(fetch_page, prefetch=prefetch)) == [1, 2, 3, 4, 5]
+    assert requested == [None, "1", "2", "3"]
+
+
+def test_paginate_is_lazy():
+    fetch_page, requested = _pages([[1, 2], [3, 4], [5, 6], [7, 8]])
+    results = paginate(fetch_page)
+    assert next(results) == 1
+    assert len(requested) <= 2  # The first page, and at most one page ahead
+    results.close()
+
+
+def test_paginate_stops_on_a_repeated_token():
+    with pytest.raises(SteamshipError):
+        list(paginate(lambda page_token: ([1], "same"), prefetch=False))
@@ -0,0 +1,82 @@
+import hashlib
+import os
+
+import pytest
+
+from steamship.plugin.inputs.raw_data_plugin_input import RawDataPluginInput
+from steamship.utils import raw_cache
+from steamship.utils.raw_cache import RawDataCache
+
+
+class _FakeHttpResponse:
+    def __init__(self, status_code: int, content: bytes, etag: str):
+        self.status_code = status_code
+        self.content = content
+        self.text = content.decode("utf-8")
+        self.headers = {"ETag": etag}
+
+
+@pytest.fixture(autouse=True)
+def _no_default_cache(monkeypatch):
+    monkeypatch.setattr(raw_cache, "_default_cache", None)
+
+
+def test_contents_are_stored_once_and_evicted_least_recently_read_first(tmp_path):
+    cache = RawDataCache(tmp_path, max_bytes=10)
+    cache.put("a", "v1", b"12345")
+    cache.put("b", "v1", b"12345")  # Same contents as "a"
+    assert cache.size() == 5
+    assert cache.get("a", "v1") == b"12345"
+    assert cache.get("a", "v2") is None and cache.get("c", "v1") is None
+
+    cache.put("c", "v1", b"abcd")
+    os.utime(cache._blob_path(hashlib.sha256(b"12345").hexdigest()), (0, 0))  # Not read in ages
+    cache.put("d", "v1", b"xyz")
+    assert cache.size() == 7
+    assert cache.get("a", "v1") is None and cache.get("b", "v1") is None
+    assert cache.get("c", "v1") == b"abcd" and cache.get("d", "v1") == b"xyz"
+
+
+def test_the_directory_is_only_scanned_when_the_cache_may_be_full(tmp_path, monkeypatch):
+    cache = RawDataCache(tmp_path, max_bytes=10)
+    scans = []
+    blobs = cache._blobs
+    monkeypatch.setattr(cache, "_blobs", lambda: scans.append(1) or blobs())
+
+    cache.put("a", "v1", b"1234")
+    cache.put("b", "v1", b"5678")
+    cache.put("c", "v1", b"5678")  # Already stored
+    assert len(scans) == 1  # The first write measures the cache
+
+    os.utime(cache._blob_path(hashlib.sha256(b"1234").hexdigest()), (0, 0))
+    cache.put("d", "v1", b"abcd")
+    assert len(scans) == 2 and cache._total_bytes <= 10
+    assert cache.get("a", "v1") is None and cache.get("d", "v1") == b"abcd"
+
+
+def test_store_caches_nothing_unless_read_to_the_end(tmp_path):
+    cache = RawDataCache(tmp_path)
+    chunks = cache.store("a", "v1", [b"one", b"two"])
+    assert next(chunks) == b"one"
+    chunks.close()
+    assert cache.open("a") is None
+    assert list((tmp_path / "blobs").glob("*.tmp")) == []
+
+
+def test_plugin_input_revalidates_cached_url_contents(tmp_path, monkeypatch):
+    requests_made = []
+
+    def _get(url, headers=None):
+        requests_made.append((url, headers))
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return _FakeHttpResponse(304, b"", '"v1"')
+        return _FakeHttpResponse(200, b"file contents", '"v1"')
+
+    monkeypatch.setattr("steamship.utils.signed_urls.requests.get", _get)
+    monkeypatch.setenv(raw_cache.RAW_CACHE_DIR_ENV, str(tmp_path))
+
+    for signature in ["sig1", "sig2"]:
+        url = f"https://bucket.example.com/plugin-data/file?X-Amz-Signature={signature}"
+        assert RawDataPluginInput(url=url).data == b"file contents"
+    assert requests_made[0][1] is None
+    assert requests_made[1][1] == {"If-None-Match": '"v1"'}
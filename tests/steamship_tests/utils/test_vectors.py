@@ -0,0 +1,42 @@
+import pytest
+
+from steamship import SteamshipError
+from steamship.utils.vectors import EmbeddingEncoding, decode_embedding, encode_embedding
+
+VECTOR = [0.5, -1.25, 3.0, 0.0]
+
+
+@pytest.mark.parametrize("encoding", [EmbeddingEncoding.FLOAT32, EmbeddingEncoding.FLOAT16])
+def test_binary_round_trip(encoding):
+    encoded = encode_embedding(VECTOR, encoding)
+    assert isinstance(encoded, str)
+    assert decode_embedding(encoded, encoding) == VECTOR
+
+
+def test_json_is_passthrough():
+    assert encode_embedding(VECTOR) == VECTOR
+    assert encode_embedding(VECTOR, EmbeddingEncoding.JSON) == VECTOR
+    assert decode_embedding(VECTOR, EmbeddingEncoding.FLOAT32) == VECTOR
+    assert encode_embedding(None) is None
+    assert decode_embedding(None) is None
+
+
+def test_float32_is_little_endian():
+    assert encode_embedding([1.0], EmbeddingEncoding.FLOAT32) == "AACAPw=="
+
+
+def test_encoded_without_encoding_fails():
+    with pytest.raises(SteamshipError):
+        decode_embedding("AACAPw==")
+
+
+def test_numpy_round_trip():
+    np = pytest.importorskip("numpy")
+    vector = np.array(VECTOR, dtype=np.float32)
+    for encoding in (EmbeddingEncoding.FLOAT32, EmbeddingEncoding.FLOAT16):
+        decoded = decode_embedding(encode_embedding(vector, encoding), encoding, as_numpy=True)
+        assert decoded.dtype == np.float32
+        assert np.array_equal(decoded, vector)
+        assert decode_embedding(encode_embedding(vector, encoding), encoding) == VECTOR
+    assert encode_embedding(vector) == VECTOR
+    assert decode_embedding(VECTOR, as_numpy=True).dtype == np.float32